@@ -0,0 +1,98 @@
+"""
+Snapshots, version rows and slug rules for ACP documents, shared by the admin
+views, the headless sync and the scheduled publisher.
+
+A snapshot is the JSON-ready dict stored in a version row's ``snapshot_json``
+and in audit ``before_json``/``after_json``.
+"""
+from __future__ import annotations
+
+from django.utils.text import slugify
+
+from acp.models import AcpContentEntryVersion, AcpDashboardVersion, AcpPageVersion, AcpThemeTokenVersion
+from core.utils import clean_text
+from core.versions import create_version
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def page_snapshot(item):
+    return {
+        'slug': item.slug,
+        'title': item.title,
+        'template_id': item.template_id,
+        'locale': item.locale,
+        'status': item.status,
+        'seo_json': item.seo_json or '{}',
+        'blocks_tree': item.blocks_tree or '{}',
+        'theme_override_json': item.theme_override_json or '{}',
+        'scheduled_publish_at': _isoformat(item.scheduled_publish_at),
+        'published_at': _isoformat(item.published_at),
+    }
+
+
+def content_entry_snapshot(item):
+    return {
+        'content_type_id': item.content_type_id,
+        'entry_key': item.entry_key,
+        'title': item.title,
+        'locale': item.locale,
+        'status': item.status,
+        'data_json': item.data_json or '{}',
+        'scheduled_publish_at': _isoformat(item.scheduled_publish_at),
+        'published_at': _isoformat(item.published_at),
+    }
+
+
+def dashboard_snapshot(item):
+    return {
+        'dashboard_id': item.dashboard_id,
+        'title': item.title,
+        'route': item.route,
+        'layout_type': item.layout_type,
+        'status': item.status,
+        'layout_config_json': item.layout_config_json or '{}',
+        'widgets_json': item.widgets_json or '[]',
+        'global_filters_json': item.global_filters_json or '[]',
+        'role_visibility_json': item.role_visibility_json or '{}',
+        'scheduled_publish_at': _isoformat(item.scheduled_publish_at),
+        'published_at': _isoformat(item.published_at),
+    }
+
+
+def theme_snapshot(item):
+    return {
+        'key': item.key,
+        'name': item.name,
+        'status': item.status,
+        'tokens_json': item.tokens_json or '{}',
+        'scheduled_publish_at': _isoformat(item.scheduled_publish_at),
+        'published_at': _isoformat(item.published_at),
+    }
+
+
+def create_page_version(item, user, change_note=''):
+    create_version(AcpPageVersion, 'page_id', page_snapshot, item, user, change_note)
+
+
+def create_content_entry_version(item, user, change_note=''):
+    create_version(AcpContentEntryVersion, 'content_entry_id', content_entry_snapshot, item, user, change_note)
+
+
+def create_dashboard_version(item, user, change_note=''):
+    create_version(AcpDashboardVersion, 'dashboard_document_id', dashboard_snapshot, item, user, change_note)
+
+
+def create_theme_version(item, user, change_note=''):
+    create_version(AcpThemeTokenVersion, 'token_set_id', theme_snapshot, item, user, change_note)
+
+
+def coerce_slug(value):
+    raw = clean_text(value, 200).strip('/')
+    if not raw:
+        return ''
+    if raw != slugify(raw):
+        return slugify(raw)[:200]
+    return raw[:200]
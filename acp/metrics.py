@@ -0,0 +1,557 @@
+"""
+Evaluation of ``AcpMetricDefinition`` rows.
+
+A metric reads one whitelisted dataset (``METRIC_DATASETS``) and is compiled
+into an ORM aggregate; nothing in a definition reaches SQL as text:
+
+* ``default_aggregation``: ``count``, ``sum``, ``avg``, ``min`` or ``max``.
+* ``query_template``: a JSON object, e.g.
+  ``{"field": "attempt_count", "filters": {"status": "failed", "tool": "{tool}"}}``.
+  ``field`` must be one of the dataset's measures (optional for ``count``);
+  ``filters`` keys must be dataset dimensions. A ``"{name}"`` value is bound
+  from the caller's filters and the condition is dropped when it is unbound;
+  a list means ``IN``.
+* ``dimensions_json``: dataset dimensions to group by, plus ``day``/``hour``
+  buckets of the dataset's timestamp.
+* ``formula``: arithmetic over other metrics, e.g.
+  ``{tickets_resolved} / {tickets_total} * 100``. Referenced metrics are
+  evaluated with the formula metric's dimensions; formulas cannot nest.
+
+Caller filters double as template parameters and, where a filter names one
+of a dataset's dimensions, narrow every metric on that dataset.
+
+``evaluate_metrics`` runs one query per (dataset, dimension set) for a whole
+batch: every metric becomes a conditional aggregate, so N dashboard widgets
+on the same dataset and dimensions cost one query, and total-only metrics
+share one plain aggregate. A grouped query that returns more than
+``MAX_GROUP_ROWS`` rows is reported as an error for its metrics rather than
+summed from a partial result. Results are cached per (metric definition,
+filters, time bucket); the bucket length is the cache TTL, so numbers lag by
+at most one bucket.
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import operator
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+from core.utils import utc_now_naive
+
+METRIC_AGGREGATIONS = ('count', 'sum', 'avg', 'min', 'max')
+# window key -> (length or None for all time, bucket seconds)
+METRIC_WINDOWS = {
+    '24h': (timedelta(hours=24), 300),
+    '7d': (timedelta(days=7), 3600),
+    '30d': (timedelta(days=30), 3600),
+    '90d': (timedelta(days=90), 3 * 3600),
+    'all': (None, 900),
+}
+DEFAULT_METRIC_WINDOW = '7d'
+MAX_METRIC_DIMENSIONS = 3
+# Groups one query may return; more is an error, not a truncated sum.
+MAX_GROUP_ROWS = 5000
+MAX_RESULT_GROUPS = 100
+
+_TIME_DIMENSIONS = {'day': TruncDay, 'hour': TruncHour}
+_PLACEHOLDER_RE = re.compile(r'^\{(\w{1,60})\}$')
+_FORMULA_REF_RE = re.compile(r'\{([A-Za-z0-9_.:-]{1,120})\}')
+_FORMULA_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_EPOCH = datetime(1970, 1, 1)
+
+
+class MetricError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class MetricDataset:
+    key: str
+    # 'app_label.ModelName', resolved lazily.
+    model: str
+    label: str
+    # dimension name -> ORM path
+    dimensions: dict
+    measures: tuple = ()
+    time_field: str = 'created_at'
+
+    def queryset(self):
+        return apps.get_model(self.model).objects.all()
+
+    def dimension_path(self, name):
+        return name if name in _TIME_DIMENSIONS else self.dimensions[name]
+
+
+METRIC_DATASETS = {
+    dataset.key: dataset
+    for dataset in (
+        MetricDataset(
+            'support_tickets',
+            'admin_panel.SupportTicket',
+            'Support tickets',
+            {'status': 'status', 'priority': 'priority', 'service': 'service_slug'},
+        ),
+        MetricDataset(
+            'support_ticket_events',
+            'admin_panel.SupportTicketEvent',
+            'Support ticket events',
+            {'event_type': 'event_type', 'status': 'status_to', 'actor_type': 'actor_type'},
+        ),
+        MetricDataset(
+            'contacts',
+            'admin_panel.ContactSubmission',
+            'Contact submissions',
+            {
+                'lead_status': 'lead_status',
+                'is_read': 'is_read',
+                'utm_source': 'utm_source',
+                'utm_medium': 'utm_medium',
+                'utm_campaign': 'utm_campaign',
+            },
+        ),
+        MetricDataset(
+            'security_events',
+            'admin_panel.SecurityEvent',
+            'Security events',
+            {'event_type': 'event_type', 'scope': 'scope', 'method': 'method'},
+        ),
+        MetricDataset(
+            'posts',
+            'public.Post',
+            'Blog posts',
+            {'workflow_status': 'workflow_status', 'category': 'category__name', 'is_published': 'is_published'},
+        ),
+        MetricDataset(
+            'mcp_operations',
+            'acp.AcpMcpOperation',
+            'MCP operations',
+            {
+                'status': 'status',
+                'approval_status': 'approval_status',
+                'tool': 'tool_name',
+                'server': 'server__key',
+            },
+            measures=('attempt_count',),
+        ),
+        MetricDataset(
+            'mcp_audit',
+            'acp.AcpMcpAuditEvent',
+            'MCP audit events',
+            {'action': 'action', 'status': 'status', 'tool': 'tool_name', 'server': 'server__key'},
+        ),
+    )
+}
+
+
+@dataclass
+class MetricResult:
+    key: str
+    value: float | int | None = None
+    # [{'dimensions': {...}, 'label': 'a / b', 'value': ...}], largest first (time buckets in order).
+    groups: list = field(default_factory=list)
+    error: str = ''
+
+    @property
+    def display(self):
+        return format_metric_value(self.value)
+
+
+@dataclass
+class _CompiledMetric:
+    key: str
+    dataset: MetricDataset
+    aggregation: str
+    field: str
+    condition: Q | None
+    dimensions: tuple
+    formula: ast.Expression | None = None
+    refs: tuple = ()
+
+
+def format_metric_value(value):
+    if value is None:
+        return '—'
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    return f'{value:,}'
+
+
+def metric_filter_names():
+    """Every dimension name a caller may filter on."""
+    return sorted({name for dataset in METRIC_DATASETS.values() for name in dataset.dimensions})
+
+
+def _load_json(raw, expected):
+    """*raw* parsed, or None unless it is JSON of type *expected*."""
+    try:
+        data = json.loads(raw or '')
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, expected) else None
+
+
+def metric_allowed(definition, role):
+    roles = _load_json(definition.allowed_roles_json, list)
+    return not roles or role in roles
+
+
+def metric_window(window, now=None):
+    """``(since or None, bucket_start, bucket_seconds)`` for *window*; *since* is aligned to the bucket."""
+    length, bucket_seconds = METRIC_WINDOWS.get(window) or METRIC_WINDOWS[DEFAULT_METRIC_WINDOW]
+    now = now or utc_now_naive()
+    bucket_start = _EPOCH + timedelta(
+        seconds=int((now - _EPOCH).total_seconds()) // bucket_seconds * bucket_seconds
+    )
+    return (bucket_start - length if length is not None else None), bucket_start, bucket_seconds
+
+
+def _compile_formula(formula):
+    refs = []
+
+    def name(match):
+        if match.group(1) not in refs:
+            refs.append(match.group(1))
+        return f'_r{refs.index(match.group(1))}'
+
+    try:
+        tree = ast.parse(_FORMULA_REF_RE.sub(name, formula), mode='eval')
+    except SyntaxError:
+        raise MetricError('Formula is not a valid expression.')
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load)):
+            continue
+        if isinstance(node, ast.BinOp) and type(node.op) in _FORMULA_OPERATORS:
+            continue
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            continue
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            continue
+        if isinstance(node, ast.Name) and re.fullmatch(r'_r\d+', node.id):
+            continue
+        if isinstance(node, (ast.operator, ast.unaryop)):
+            continue
+        raise MetricError('Formulas may only use numbers, {metric} references, + - * / and parentheses.')
+    if not refs:
+        raise MetricError('Formula does not reference any metric.')
+    return tree, tuple(refs)
+
+
+def _eval_formula(node, values):
+    if isinstance(node, ast.Expression):
+        return _eval_formula(node.body, values)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return values[int(node.id[2:])]
+    if isinstance(node, ast.UnaryOp):
+        operand = _eval_formula(node.operand, values)
+        if operand is None:
+            return None
+        return -operand if isinstance(node.op, ast.USub) else operand
+    left = _eval_formula(node.left, values)
+    right = _eval_formula(node.right, values)
+    if left is None or right is None or (isinstance(node.op, ast.Div) and right == 0):
+        return None
+    return _FORMULA_OPERATORS[type(node.op)](left, right)
+
+
+def _bind(value, params):
+    if isinstance(value, str):
+        match = _PLACEHOLDER_RE.match(value.strip())
+        if match:
+            return params.get(match.group(1))
+    return value
+
+
+def _compile(definition, params, dimensions=None):
+    dataset = METRIC_DATASETS.get(str(definition.dataset_key or '').strip())
+    if dataset is None:
+        raise MetricError(f'Unknown dataset "{definition.dataset_key}".')
+    aggregation = str(definition.default_aggregation or 'count').strip().lower()
+    if aggregation not in METRIC_AGGREGATIONS:
+        raise MetricError(f'Aggregation must be one of {", ".join(METRIC_AGGREGATIONS)}.')
+
+    if dimensions is None:
+        dimensions = _load_json(definition.dimensions_json or '[]', list)
+        if dimensions is None:
+            raise MetricError('Dimensions must be a JSON array.')
+    dimensions = tuple(str(name).strip() for name in dimensions if str(name).strip())
+    for name in dimensions:
+        if name not in dataset.dimensions and name not in _TIME_DIMENSIONS:
+            raise MetricError(f'Dataset "{dataset.key}" has no dimension "{name}".')
+    if len(dimensions) > MAX_METRIC_DIMENSIONS:
+        raise MetricError(f'At most {MAX_METRIC_DIMENSIONS} dimensions are allowed.')
+
+    formula = str(definition.formula or '').strip()
+    if formula:
+        tree, refs = _compile_formula(formula)
+        return _CompiledMetric(definition.key, dataset, aggregation, '', None, dimensions, tree, refs)
+
+    template = _load_json(definition.query_template, dict) if str(definition.query_template or '').strip() else {}
+    if template is None:
+        raise MetricError('Query template must be a JSON object.')
+    measure = str(template.get('field') or '').strip()
+    if measure and measure not in dataset.measures:
+        raise MetricError(f'Dataset "{dataset.key}" has no measure "{measure}".')
+    if aggregation != 'count' and not measure:
+        raise MetricError(f'"{aggregation}" needs a "field" in the query template.')
+
+    filters = template.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise MetricError('Query template "filters" must be an object.')
+    condition = None
+    for name, value in filters.items():
+        if name not in dataset.dimensions:
+            raise MetricError(f'Dataset "{dataset.key}" cannot be filtered on "{name}".')
+        value = _bind(value, params)
+        if value is None or value == '':
+            continue
+        path = dataset.dimensions[name]
+        if isinstance(value, list):
+            values = [item for item in (_bind(item, params) for item in value) if item not in (None, '')]
+            if not values:
+                continue
+            clause = Q(**{f'{path}__in': values})
+        elif isinstance(value, dict):
+            raise MetricError(f'Filter "{name}" must be a value or a list.')
+        else:
+            clause = Q(**{path: value})
+        condition = clause if condition is None else condition & clause
+    return _CompiledMetric(definition.key, dataset, aggregation, measure, condition, dimensions)
+
+
+def _annotations(metric, alias):
+    target = metric.field or 'id'
+    extra = {'filter': metric.condition} if metric.condition is not None else {}
+    if metric.aggregation == 'count':
+        return {alias: Count(target, **extra)}
+    if metric.aggregation == 'avg':
+        return {alias: Sum(target, **extra), f'{alias}_n': Count(target, **extra)}
+    function = {'sum': Sum, 'min': Min, 'max': Max}[metric.aggregation]
+    return {alias: function(target, **extra)}
+
+
+def _query_rows(dataset, aliased, group_by, where, since):
+    """Run the single grouped query for every ``(alias, metric)`` in *aliased* over *dataset*."""
+    query = dataset.queryset()
+    if since is not None:
+        query = query.filter(**{f'{dataset.time_field}__gte': since})
+    for name, value in where.items():
+        if name in dataset.dimensions:
+            query = query.filter(**{dataset.dimensions[name]: value})
+    annotations = {}
+    for alias, metric in aliased:
+        annotations.update(_annotations(metric, alias))
+    if not group_by:
+        return [query.aggregate(**annotations)]
+    for name in group_by:
+        if name in _TIME_DIMENSIONS:
+            query = query.annotate(**{name: _TIME_DIMENSIONS[name](dataset.time_field)})
+    paths = [dataset.dimension_path(name) for name in group_by]
+    return list(query.values(*paths).annotate(**annotations).order_by()[: MAX_GROUP_ROWS + 1])
+
+
+def _number(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _merge(aggregation, current, row, alias):
+    value = _number(row.get(alias))
+    if aggregation == 'count':
+        return (current or 0) + (value or 0)
+    if aggregation == 'avg':
+        total, seen = current or (0, 0)
+        return total + (value or 0), seen + (row.get(f'{alias}_n') or 0)
+    if value is None:
+        return current
+    if current is None:
+        return value
+    if aggregation == 'sum':
+        return current + value
+    return min(current, value) if aggregation == 'min' else max(current, value)
+
+
+def _finish(aggregation, partial):
+    if aggregation == 'avg':
+        total, seen = partial or (0, 0)
+        return total / seen if seen else None
+    if aggregation == 'count':
+        return partial or 0
+    return partial
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _reduce(alias, metric, rows, paths):
+    """``(total, {dimension values: value})`` of *metric* from the batch's grouped rows."""
+    aggregation = metric.aggregation
+    total, groups = None, {}
+    for row in rows:
+        total = _merge(aggregation, total, row, alias)
+        if metric.dimensions:
+            key = tuple(_json_value(row.get(paths[name])) for name in metric.dimensions)
+            groups[key] = _merge(aggregation, groups.get(key), row, alias)
+    return _finish(aggregation, total), {key: _finish(aggregation, value) for key, value in groups.items()}
+
+
+def _result(key, dimensions, total, groups):
+    ordered = sorted(groups.items(), key=lambda item: tuple('' if part is None else str(part) for part in item[0]))
+    if not any(name in _TIME_DIMENSIONS for name in dimensions):
+        ordered.sort(key=lambda item: (item[1] is None, -(item[1] or 0)))
+    return MetricResult(
+        key,
+        value=total,
+        groups=[
+            {
+                'dimensions': dict(zip(dimensions, values)),
+                'label': ' / '.join('—' if part is None else str(part) for part in values),
+                'value': value,
+                'display': format_metric_value(value),
+            }
+            for values, value in ordered[:MAX_RESULT_GROUPS]
+        ],
+    )
+
+
+def _reference_definitions(keys):
+    if not keys:
+        return {}
+    from acp.models import AcpMetricDefinition
+
+    try:
+        return {row.key: row for row in AcpMetricDefinition.objects.filter(key__in=sorted(keys), is_enabled=True)}
+    except Exception:
+        return {}
+
+
+def _compute(definitions, filters, since):
+    results = {}
+    compiled = {}
+    for definition in definitions:
+        try:
+            compiled[definition.key] = _compile(definition, filters)
+        except MetricError as exc:
+            results[definition.key] = MetricResult(definition.key, error=str(exc))
+
+    known = {definition.key: definition for definition in definitions}
+    wanted = {ref for metric in compiled.values() for ref in metric.refs}
+    known.update(_reference_definitions(wanted - set(known)))
+
+    # (owner, reference or None, compiled metric), grouped by dataset below.
+    parts = []
+    for metric in list(compiled.values()):
+        if metric.formula is None:
+            parts.append((metric.key, None, metric))
+            continue
+        try:
+            references = []
+            for ref in metric.refs:
+                if ref not in known:
+                    raise MetricError(f'Formula references unknown metric "{ref}".')
+                referenced = _compile(known[ref], filters, dimensions=metric.dimensions)
+                if referenced.formula is not None:
+                    raise MetricError(f'Formula references another formula ("{ref}").')
+                references.append((metric.key, ref, referenced))
+            parts.extend(references)
+        except MetricError as exc:
+            del compiled[metric.key]
+            results[metric.key] = MetricResult(metric.key, error=str(exc))
+
+    batches = {}
+    for part in parts:
+        batches.setdefault((part[2].dataset.key, tuple(sorted(part[2].dimensions))), []).append(part)
+    reduced = {}
+    for (dataset_key, group_by), batch in batches.items():
+        dataset = METRIC_DATASETS[dataset_key]
+        aliased = [(f'm{index}', part[2]) for index, part in enumerate(batch)]
+        paths = {name: dataset.dimension_path(name) for name in group_by}
+        error = ''
+        try:
+            rows = _query_rows(dataset, aliased, list(group_by), filters, since)
+            if len(rows) > MAX_GROUP_ROWS:
+                error = f'More than {MAX_GROUP_ROWS} groups; narrow the window, filters or dimensions.'
+        except Exception:
+            error = f'Could not query dataset "{dataset_key}".'
+        if error:
+            for owner, _, _ in batch:
+                compiled.pop(owner, None)
+                results[owner] = MetricResult(owner, error=error)
+            continue
+        for (owner, ref, _), (alias, metric) in zip(batch, aliased):
+            reduced[(owner, ref)] = _reduce(alias, metric, rows, paths)
+
+    for key, metric in compiled.items():
+        if metric.formula is None:
+            results[key] = _result(key, metric.dimensions, *reduced[(key, None)])
+            continue
+        operands = [reduced[(key, ref)] for ref in metric.refs]
+        total = _eval_formula(metric.formula, [operand[0] for operand in operands])
+        group_keys = set().union(*(operand[1] for operand in operands))
+        groups = {
+            group: _eval_formula(metric.formula, [operand[1].get(group) for operand in operands])
+            for group in group_keys
+        }
+        results[key] = _result(key, metric.dimensions, total, groups)
+    return results
+
+
+def _cache_key(definition, filters, window, bucket_start):
+    fingerprint = json.dumps(
+        [
+            definition.key,
+            definition.dataset_key,
+            definition.query_template,
+            definition.formula,
+            definition.dimensions_json,
+            definition.default_aggregation,
+            str(getattr(definition, 'updated_at', '') or ''),
+            filters,
+            window,
+            bucket_start.isoformat(),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return f'acp-metric:{hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()}'
+
+
+def evaluate_metrics(definitions, *, filters=None, window=DEFAULT_METRIC_WINDOW, now=None):
+    """``{metric key: MetricResult}`` for *definitions*, one query per dataset for whatever is not cached."""
+    window = window if window in METRIC_WINDOWS else DEFAULT_METRIC_WINDOW
+    filters = {str(name): value for name, value in (filters or {}).items() if value not in (None, '')}
+    since, bucket_start, bucket_seconds = metric_window(window, now)
+    definitions = list({definition.key: definition for definition in definitions}.values())
+    keys = {definition.key: _cache_key(definition, filters, window, bucket_start) for definition in definitions}
+
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception:
+        cached = {}
+    results = {key: cached[cache_key] for key, cache_key in keys.items() if cache_key in cached}
+    pending = [definition for definition in definitions if definition.key not in results]
+    if pending:
+        computed = _compute(pending, filters, since)
+        results.update(computed)
+        try:
+            cache.set_many(
+                {keys[key]: result for key, result in computed.items() if not result.error}, bucket_seconds
+            )
+        except Exception:
+            pass
+    return results
@@ -0,0 +1,63 @@
+"""
+Validation of content entry data against ``AcpContentType.schema_json``.
+
+Content types describe their data with a small JSON Schema subset: ``type``,
+``properties``, ``required``, ``additionalProperties: false``, ``items``,
+``enum``, ``minLength``/``maxLength`` and ``minimum``/``maximum``. Anything
+else in the schema is ignored rather than rejected.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+_TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'boolean': lambda value: isinstance(value, bool),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'null': lambda value: value is None,
+}
+
+
+def schema_errors(value: Any, schema: Any, path: str = '$') -> list[str]:
+    """Return human-readable errors for *value* against *schema*; empty when it is valid."""
+    if not isinstance(schema, dict) or not schema:
+        return []
+
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        checks = [_TYPE_CHECKS[name] for name in types if name in _TYPE_CHECKS]
+        if checks and not any(check(value) for check in checks):
+            return [f'{path}: expected {" or ".join(types)}.']
+
+    errors = []
+    if 'enum' in schema and isinstance(schema['enum'], list) and value not in schema['enum']:
+        errors.append(f'{path}: must be one of {schema["enum"]}.')
+    if isinstance(value, str):
+        if isinstance(schema.get('minLength'), int) and len(value) < schema['minLength']:
+            errors.append(f'{path}: shorter than {schema["minLength"]} characters.')
+        if isinstance(schema.get('maxLength'), int) and len(value) > schema['maxLength']:
+            errors.append(f'{path}: longer than {schema["maxLength"]} characters.')
+    if _TYPE_CHECKS['number'](value):
+        if isinstance(schema.get('minimum'), (int, float)) and value < schema['minimum']:
+            errors.append(f'{path}: below minimum {schema["minimum"]}.')
+        if isinstance(schema.get('maximum'), (int, float)) and value > schema['maximum']:
+            errors.append(f'{path}: above maximum {schema["maximum"]}.')
+
+    if isinstance(value, dict):
+        properties = schema.get('properties') if isinstance(schema.get('properties'), dict) else {}
+        for name in schema.get('required') or ():
+            if name not in value:
+                errors.append(f'{path}.{name}: is required.')
+        for name, item in value.items():
+            if name in properties:
+                errors.extend(schema_errors(item, properties[name], f'{path}.{name}'))
+            elif schema.get('additionalProperties') is False:
+                errors.append(f'{path}.{name}: is not allowed.')
+    elif isinstance(value, list) and isinstance(schema.get('items'), dict):
+        for index, item in enumerate(value):
+            errors.extend(schema_errors(item, schema['items'], f'{path}[{index}]'))
+    return errors
@@ -7,7 +7,8 @@ from typing import Any
 from django.contrib import messages
 
 from acp.models import AcpAuditEvent
-from admin_panel.views.content import format_datetime_local, workflow_status_badge, workflow_status_label
+from admin_panel.documents import format_datetime_local
+from admin_panel.views.content import workflow_status_badge, workflow_status_label
 from core.constants import USER_ROLE_CHOICES, USER_ROLE_LABELS, WORKFLOW_DRAFT, WORKFLOW_STATUSES, normalize_workflow_status
 from core.utils import clean_text, get_request_ip, utc_now_naive
 
@@ -6,6 +6,7 @@ from django.contrib import messages
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
+from acp.documents import content_entry_snapshot, create_content_entry_version
 from acp.models import (
     AcpContentEntry,
     AcpContentEntryVersion,
@@ -24,6 +25,8 @@ from acp.views.common import (
 from admin_panel.decorators import permission_required
 from core.constants import WORKFLOW_DRAFT
 from core.utils import clean_text, utc_now_naive
+from core.versions import create_version
+from headless.delivery_cache import invalidate_delivery_cache, refresh_delivery_documents
 
 
 def _content_type_payload(item):
@@ -36,49 +39,8 @@ def _content_type_payload(item):
     }
 
 
-def _content_entry_payload(item):
-    return {
-        'content_type_id': item.content_type_id,
-        'entry_key': item.entry_key,
-        'title': item.title,
-        'locale': item.locale,
-        'status': item.status,
-        'data_json': item.data_json or '{}',
-        'scheduled_publish_at': item.scheduled_publish_at.isoformat() if item.scheduled_publish_at else None,
-        'published_at': item.published_at.isoformat() if item.published_at else None,
-    }
-
-
 def _create_content_type_version(item, user, change_note=''):
-    try:
-        latest = AcpContentTypeVersion.objects.filter(content_type_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        AcpContentTypeVersion.objects.create(
-            content_type_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_content_type_payload(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
-
-
-def _create_content_entry_version(item, user, change_note=''):
-    try:
-        latest = AcpContentEntryVersion.objects.filter(content_entry_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        AcpContentEntryVersion.objects.create(
-            content_entry_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_content_entry_payload(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
+    create_version(AcpContentTypeVersion, 'content_type_id', _content_type_payload, item, user, change_note)
 
 
 def _save_content_type(request, item=None):
@@ -117,6 +79,8 @@ def _save_content_type(request, item=None):
     try:
         target.save()
         _create_content_type_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        # Entries are delivered under the type key; a rename or disable affects all of them.
+        invalidate_delivery_cache()
         return target, target, ''
     except Exception:
         return None, target, 'Could not save content type.'
@@ -124,6 +88,10 @@ def _save_content_type(request, item=None):
 
 def _save_content_entry(request, item=None):
     target = item if item is not None else AcpContentEntry()
+    previous_key = None
+    if getattr(target, 'id', None):
+        previous_type_key = AcpContentType.objects.filter(id=target.content_type_id).values_list('key', flat=True).first()
+        previous_key = (previous_type_key or '', target.entry_key)
     content_type_id = safe_int(request.POST.get('content_type_id'), default=0, min_value=0)
     title = clean_text(request.POST.get('title', ''), 220)
     entry_key = clean_text(request.POST.get('entry_key', ''), 140)
@@ -161,7 +129,8 @@ def _save_content_entry(request, item=None):
 
     try:
         target.save()
-        _create_content_entry_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        create_content_entry_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        refresh_delivery_documents('content', previous_key, (content_type.key, target.entry_key))
         return target, target, ''
     except Exception:
         return None, target, 'Could not save content entry.'
@@ -290,7 +259,7 @@ def content_entry_add(request):
                 action='create_entry',
                 entity_type='content_entry',
                 entity_id=saved.id,
-                after_json=json.dumps(_content_entry_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(content_entry_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Content entry created.')
             return redirect('acp:content_entry_edit', id=saved.id)
@@ -322,7 +291,7 @@ def content_entry_add(request):
 def content_entry_edit(request, id):
     item = get_object_or_404(AcpContentEntry, id=id)
     if request.method == 'POST':
-        before = json.dumps(_content_entry_payload(item), ensure_ascii=False)
+        before = json.dumps(content_entry_snapshot(item), ensure_ascii=False)
         saved, preview, error = _save_content_entry(request, item=item)
         if saved:
             write_audit(
@@ -332,7 +301,7 @@ def content_entry_edit(request, id):
                 entity_type='content_entry',
                 entity_id=saved.id,
                 before_json=before,
-                after_json=json.dumps(_content_entry_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(content_entry_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Content entry updated.')
             return redirect('acp:content_entry_edit', id=saved.id)
@@ -6,7 +6,9 @@ from django.contrib import messages
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
-from acp.models import AcpDashboardDocument, AcpDashboardVersion, AcpWidgetDefinition
+from acp.documents import create_dashboard_version, dashboard_snapshot
+from acp.metrics import DEFAULT_METRIC_WINDOW, evaluate_metrics, metric_allowed
+from acp.models import AcpDashboardDocument, AcpDashboardVersion, AcpMetricDefinition, AcpWidgetDefinition
 from acp.views.common import (
     load_json,
     maybe_mark_published,
@@ -20,42 +22,12 @@ from acp.views.common import (
 from admin_panel.decorators import permission_required
 from core.constants import WORKFLOW_DRAFT
 from core.utils import clean_text, utc_now_naive
-
-
-def _dashboard_payload(item):
-    return {
-        'dashboard_id': item.dashboard_id,
-        'title': item.title,
-        'route': item.route,
-        'layout_type': item.layout_type,
-        'status': item.status,
-        'layout_config_json': item.layout_config_json or '{}',
-        'widgets_json': item.widgets_json or '[]',
-        'global_filters_json': item.global_filters_json or '[]',
-        'role_visibility_json': item.role_visibility_json or '{}',
-        'scheduled_publish_at': item.scheduled_publish_at.isoformat() if item.scheduled_publish_at else None,
-        'published_at': item.published_at.isoformat() if item.published_at else None,
-    }
-
-
-def _create_dashboard_version(item, user, change_note=''):
-    try:
-        latest = AcpDashboardVersion.objects.filter(dashboard_document_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        AcpDashboardVersion.objects.create(
-            dashboard_document_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_dashboard_payload(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
+from headless.delivery_cache import refresh_delivery_documents
 
 
 def _save_dashboard(request, item=None):
     target = item if item is not None else AcpDashboardDocument()
+    previous_dashboard_id = getattr(target, 'dashboard_id', '')
     title = clean_text(request.POST.get('title', ''), 220)
     dashboard_id = clean_text(request.POST.get('dashboard_id', ''), 120)
     route = clean_text(request.POST.get('route', ''), 220)
@@ -114,7 +86,8 @@ def _save_dashboard(request, item=None):
 
     try:
         target.save()
-        _create_dashboard_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        create_dashboard_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        refresh_delivery_documents('dashboard', previous_dashboard_id, target.dashboard_id)
         return target, target, ''
     except Exception:
         return None, target, 'Could not save dashboard document.'
@@ -168,6 +141,23 @@ def _widget_registry():
     return registry
 
 
+def _widget_results(widgets, role, window):
+    """Metric results for *widgets*, evaluated as one batch (one query per dataset)."""
+    keys = {str(widget.get('metric', '')).strip() for widget in widgets if isinstance(widget, dict)}
+    keys.discard('')
+    if not keys:
+        return {}
+    try:
+        definitions = [
+            row
+            for row in AcpMetricDefinition.objects.filter(key__in=sorted(keys), is_enabled=True)
+            if metric_allowed(row, role)
+        ]
+        return evaluate_metrics(definitions, window=clean_text(window, 10) or DEFAULT_METRIC_WINDOW)
+    except Exception:
+        return {}
+
+
 @permission_required('acp:dashboards:manage')
 def dashboards(request):
     q = clean_text(request.GET.get('q', ''), 120)
@@ -202,7 +192,7 @@ def dashboard_add(request):
                 action='create',
                 entity_type='dashboard',
                 entity_id=saved.id,
-                after_json=json.dumps(_dashboard_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(dashboard_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Dashboard created.')
             return redirect('acp:dashboard_edit', id=saved.id)
@@ -225,7 +215,7 @@ def dashboard_add(request):
 def dashboard_edit(request, id):
     item = get_object_or_404(AcpDashboardDocument, id=id)
     if request.method == 'POST':
-        before = json.dumps(_dashboard_payload(item), ensure_ascii=False)
+        before = json.dumps(dashboard_snapshot(item), ensure_ascii=False)
         saved, preview, error = _save_dashboard(request, item=item)
         if saved:
             write_audit(
@@ -235,7 +225,7 @@ def dashboard_edit(request, id):
                 entity_type='dashboard',
                 entity_id=saved.id,
                 before_json=before,
-                after_json=json.dumps(_dashboard_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(dashboard_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Dashboard updated.')
             return redirect('acp:dashboard_edit', id=saved.id)
@@ -269,6 +259,7 @@ def dashboard_preview(request, id):
         'item': item,
         'role': role,
         'visible_widgets': visible_widgets,
+        'widget_results': _widget_results(visible_widgets, role, request.GET.get('window', '')),
         'hidden_count': hidden_count,
         'role_rule': role_rule if isinstance(role_rule, dict) else {},
         'global_filters': load_json(item.global_filters_json, []),
@@ -283,7 +274,7 @@ def dashboard_publish(request, id):
     if request.method != 'POST':
         return redirect('acp:dashboard_edit', id=id)
     item = get_object_or_404(AcpDashboardDocument, id=id)
-    before = json.dumps(_dashboard_payload(item), ensure_ascii=False)
+    before = json.dumps(dashboard_snapshot(item), ensure_ascii=False)
 
     status = normalize_status(request.POST.get('workflow_status', item.status))
     scheduled_publish_at = parse_datetime_local(request.POST.get('scheduled_publish_at'))
@@ -294,7 +285,8 @@ def dashboard_publish(request, id):
     maybe_mark_published(item, status, scheduled_publish_at)
     try:
         item.save(update_fields=['status', 'scheduled_publish_at', 'published_at', 'updated_by_id', 'updated_at'])
-        _create_dashboard_version(item, request.user, change_note=request.POST.get('change_note', 'workflow update'))
+        create_dashboard_version(item, request.user, change_note=request.POST.get('change_note', 'workflow update'))
+        refresh_delivery_documents('dashboard', item.dashboard_id)
         write_audit(
             request,
             domain='dashboards',
@@ -302,7 +294,7 @@ def dashboard_publish(request, id):
             entity_type='dashboard',
             entity_id=item.id,
             before_json=before,
-            after_json=json.dumps(_dashboard_payload(item), ensure_ascii=False),
+            after_json=json.dumps(dashboard_snapshot(item), ensure_ascii=False),
         )
         messages.success(request, 'Dashboard workflow updated.')
     except Exception:
@@ -315,14 +307,14 @@ def dashboard_snapshot(request, id):
     if request.method != 'POST':
         return redirect('acp:dashboard_edit', id=id)
     item = get_object_or_404(AcpDashboardDocument, id=id)
-    _create_dashboard_version(item, request.user, change_note=request.POST.get('change_note', 'manual snapshot'))
+    create_dashboard_version(item, request.user, change_note=request.POST.get('change_note', 'manual snapshot'))
     write_audit(
         request,
         domain='dashboards',
         action='snapshot',
         entity_type='dashboard',
         entity_id=item.id,
-        after_json=json.dumps(_dashboard_payload(item), ensure_ascii=False),
+        after_json=json.dumps(dashboard_snapshot(item), ensure_ascii=False),
     )
     messages.success(request, 'Snapshot created.')
     return redirect('acp:dashboard_edit', id=id)
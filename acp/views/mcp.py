@@ -5,7 +5,7 @@ from datetime import timedelta
 from uuid import uuid4
 
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404, redirect, render
 
 from acp.models import AcpMcpAuditEvent, AcpMcpOperation, AcpMcpServer
@@ -25,6 +25,7 @@ from core.constants import (
     MCP_OPERATION_STATUS_RUNNING,
     MCP_OPERATION_STATUS_SUCCEEDED,
 )
+from core.metric_rollups import windowed_count
 from core.utils import clean_text, utc_now_naive
 
 
@@ -250,20 +251,16 @@ def mcp_operations(request):
     except Exception:
         items = []
 
-    now = utc_now_naive()
-    day_ago = now - timedelta(hours=24)
+    day_ago = utc_now_naive() - timedelta(hours=24)
     try:
-        summary = {
-            'pending_approval': AcpMcpOperation.objects.filter(status=MCP_OPERATION_STATUS_PENDING_APPROVAL).count(),
-            'queued': AcpMcpOperation.objects.filter(status=MCP_OPERATION_STATUS_QUEUED).count(),
-            'running': AcpMcpOperation.objects.filter(status=MCP_OPERATION_STATUS_RUNNING).count(),
-            'failed': AcpMcpOperation.objects.filter(status=MCP_OPERATION_STATUS_FAILED).count(),
-            'succeeded_24h': AcpMcpOperation.objects.filter(
-                status=MCP_OPERATION_STATUS_SUCCEEDED,
-            ).filter(
-                Q(updated_at__gte=day_ago) | Q(created_at__gte=day_ago)
-            ).count(),
-        }
+        summary = AcpMcpOperation.objects.aggregate(
+            pending_approval=Count('id', filter=Q(status=MCP_OPERATION_STATUS_PENDING_APPROVAL)),
+            queued=Count('id', filter=Q(status=MCP_OPERATION_STATUS_QUEUED)),
+            running=Count('id', filter=Q(status=MCP_OPERATION_STATUS_RUNNING)),
+            failed=Count('id', filter=Q(status=MCP_OPERATION_STATUS_FAILED)),
+        )
+        # Each successful run writes one 'ok' execute audit event, which the rollups count.
+        summary['succeeded_24h'] = windowed_count('mcp_executions', day_ago, dimensions=['ok'])
     except Exception:
         summary = {'pending_approval': 0, 'queued': 0, 'running': 0, 'failed': 0, 'succeeded_24h': 0}
 
@@ -7,8 +7,8 @@ from django.contrib import messages
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import URLPattern, URLResolver, get_resolver
-from django.utils.text import slugify
 
+from acp.documents import coerce_slug, create_page_version, page_snapshot
 from acp.models import AcpComponentDefinition, AcpPageDocument, AcpPageRouteBinding, AcpPageVersion
 from acp.views.common import (
     maybe_mark_published,
@@ -22,46 +22,7 @@ from acp.views.common import (
 from admin_panel.decorators import permission_required
 from core.constants import WORKFLOW_DRAFT
 from core.utils import clean_text, utc_now_naive
-
-
-def _page_payload(item):
-    return {
-        'slug': item.slug,
-        'title': item.title,
-        'template_id': item.template_id,
-        'locale': item.locale,
-        'status': item.status,
-        'seo_json': item.seo_json or '{}',
-        'blocks_tree': item.blocks_tree or '{}',
-        'theme_override_json': item.theme_override_json or '{}',
-        'scheduled_publish_at': item.scheduled_publish_at.isoformat() if item.scheduled_publish_at else None,
-        'published_at': item.published_at.isoformat() if item.published_at else None,
-    }
-
-
-def _create_page_version(item, user, change_note=''):
-    try:
-        latest = AcpPageVersion.objects.filter(page_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        AcpPageVersion.objects.create(
-            page_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_page_payload(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
-
-
-def _coerce_slug(value):
-    raw = clean_text(value, 200).strip('/')
-    if not raw:
-        return ''
-    if raw != slugify(raw):
-        return slugify(raw)[:200]
-    return raw[:200]
+from headless.delivery_cache import refresh_delivery_documents
 
 
 def _component_registry():
@@ -94,9 +55,10 @@ def _component_registry():
 
 def _save_page(request, item=None):
     target = item if item is not None else AcpPageDocument()
+    previous_slug = getattr(target, 'slug', '')
 
     title = clean_text(request.POST.get('title', ''), 220)
-    slug = _coerce_slug(request.POST.get('slug', ''))
+    slug = coerce_slug(request.POST.get('slug', ''))
     template_id = clean_text(request.POST.get('template_id', 'default-page'), 120) or 'default-page'
     locale = clean_text(request.POST.get('locale', 'en-US'), 20) or 'en-US'
     status = normalize_status(request.POST.get('workflow_status', WORKFLOW_DRAFT))
@@ -144,7 +106,8 @@ def _save_page(request, item=None):
 
     try:
         target.save()
-        _create_page_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        create_page_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        refresh_delivery_documents('page', previous_slug, target.slug)
         return target, target, ''
     except Exception:
         return None, target, 'Could not save page document.'
@@ -183,7 +146,7 @@ def page_add(request):
                 action='create',
                 entity_type='page',
                 entity_id=saved.id,
-                after_json=json.dumps(_page_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(page_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Page created.')
             return redirect('acp:page_edit', id=saved.id)
@@ -204,7 +167,7 @@ def page_add(request):
 def page_edit(request, id):
     item = get_object_or_404(AcpPageDocument, id=id)
     if request.method == 'POST':
-        before = json.dumps(_page_payload(item), ensure_ascii=False)
+        before = json.dumps(page_snapshot(item), ensure_ascii=False)
         saved, preview, error = _save_page(request, item=item)
         if saved:
             write_audit(
@@ -214,7 +177,7 @@ def page_edit(request, id):
                 entity_type='page',
                 entity_id=saved.id,
                 before_json=before,
-                after_json=json.dumps(_page_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(page_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Page updated.')
             return redirect('acp:page_edit', id=saved.id)
@@ -240,7 +203,7 @@ def page_publish(request, id):
     if request.method != 'POST':
         return redirect('acp:page_edit', id=id)
     item = get_object_or_404(AcpPageDocument, id=id)
-    before = json.dumps(_page_payload(item), ensure_ascii=False)
+    before = json.dumps(page_snapshot(item), ensure_ascii=False)
 
     status = normalize_status(request.POST.get('workflow_status'))
     scheduled_publish_at = parse_datetime_local(request.POST.get('scheduled_publish_at'))
@@ -251,7 +214,8 @@ def page_publish(request, id):
     maybe_mark_published(item, status, scheduled_publish_at)
     try:
         item.save(update_fields=['status', 'scheduled_publish_at', 'published_at', 'updated_by_id', 'updated_at'])
-        _create_page_version(item, request.user, change_note=request.POST.get('change_note', 'workflow update'))
+        create_page_version(item, request.user, change_note=request.POST.get('change_note', 'workflow update'))
+        refresh_delivery_documents('page', item.slug)
         write_audit(
             request,
             domain='pages',
@@ -259,7 +223,7 @@ def page_publish(request, id):
             entity_type='page',
             entity_id=item.id,
             before_json=before,
-            after_json=json.dumps(_page_payload(item), ensure_ascii=False),
+            after_json=json.dumps(page_snapshot(item), ensure_ascii=False),
         )
         messages.success(request, 'Page workflow updated.')
     except Exception:
@@ -272,14 +236,14 @@ def page_snapshot(request, id):
     if request.method != 'POST':
         return redirect('acp:page_edit', id=id)
     item = get_object_or_404(AcpPageDocument, id=id)
-    _create_page_version(item, request.user, change_note=request.POST.get('change_note', 'manual snapshot'))
+    create_page_version(item, request.user, change_note=request.POST.get('change_note', 'manual snapshot'))
     write_audit(
         request,
         domain='pages',
         action='snapshot',
         entity_type='page',
         entity_id=item.id,
-        after_json=json.dumps(_page_payload(item), ensure_ascii=False),
+        after_json=json.dumps(page_snapshot(item), ensure_ascii=False),
     )
     messages.success(request, 'Snapshot created.')
     return redirect('acp:page_edit', id=id)
@@ -428,7 +392,7 @@ def _persist_sync(rows, *, auto_register=False, user=None):
                     created_at=now,
                     updated_at=now,
                 )
-                _create_page_version(page, user, change_note='auto-register from route sync')
+                create_page_version(page, user, change_note='auto-register from route sync')
                 page_by_slug[expected_slug] = page
                 row['sync_status'] = 'unpublished_page_document'
                 row['page_id'] = page.id
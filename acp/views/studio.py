@@ -24,6 +24,14 @@ from acp.models import (
     AcpThemeTokenVersion,
     AcpWidgetDefinition,
 )
+from acp.metrics import (
+    DEFAULT_METRIC_WINDOW,
+    METRIC_DATASETS,
+    METRIC_WINDOWS,
+    evaluate_metrics,
+    metric_allowed,
+    metric_filter_names,
+)
 from acp.views.common import safe_int, write_audit
 from admin_panel.decorators import permission_required
 from core.constants import (
@@ -31,6 +39,7 @@ from core.constants import (
     MCP_OPERATION_STATUS_QUEUED,
     WORKFLOW_PUBLISHED,
 )
+from core.keyset import CursorPage, keyset_page
 from core.utils import clean_text, utc_now_naive
 
 
@@ -91,11 +100,38 @@ def studio(request):
 
 @permission_required('acp:metrics:manage')
 def metrics(request):
+    window = clean_text(request.GET.get('window', ''), 10) or DEFAULT_METRIC_WINDOW
+    if window not in METRIC_WINDOWS:
+        window = DEFAULT_METRIC_WINDOW
+    filters = {}
+    for name in metric_filter_names():
+        value = clean_text(request.GET.get(name, ''), 120)
+        if value:
+            filters[name] = value
+
     try:
         items = list(AcpMetricDefinition.objects.order_by('-is_enabled', 'dataset_key', 'key', 'id'))
     except Exception:
         items = []
-    return render(request, 'admin/acp/metrics.html', {'metrics': items})
+    role = clean_text(getattr(request.user, 'role_key', ''), 30)
+    evaluated = [item for item in items if item.is_enabled and metric_allowed(item, role)]
+    try:
+        results = evaluate_metrics(evaluated, filters=filters, window=window)
+    except Exception:
+        results = {}
+
+    return render(
+        request,
+        'admin/acp/metrics.html',
+        {
+            'metrics': items,
+            'results': results,
+            'datasets': METRIC_DATASETS,
+            'window': window,
+            'window_options': list(METRIC_WINDOWS),
+            'filters': filters,
+        },
+    )
 
 
 @permission_required('acp:audit:view')
@@ -105,22 +141,25 @@ def audit(request):
     environment = clean_text(request.GET.get('environment', ''), 40)
 
     try:
-        query = AcpAuditEvent.objects.order_by('-created_at', '-id')
+        query = AcpAuditEvent.objects.all()
         if domain:
             query = query.filter(domain__icontains=domain)
         if action:
             query = query.filter(action__icontains=action)
         if environment:
             query = query.filter(environment__icontains=environment)
-        items = list(query[:200])
+        pager = keyset_page(query, request.GET.get('cursor', ''), per_page=100, field='created_at', with_total=True)
     except Exception:
-        items = []
+        pager = CursorPage([])
 
     return render(
         request,
         'admin/acp/audit.html',
         {
-            'items': items,
+            'items': pager.items,
+            'pager': pager,
+            'pager_endpoint': 'admin.acp_audit',
+            'pager_params': {'domain': domain or None, 'action': action or None, 'environment': environment or None},
             'domain': domain,
             'action': action,
             'environment': environment,
@@ -6,6 +6,7 @@ from django.contrib import messages
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
+from acp.documents import create_theme_version, theme_snapshot
 from acp.models import AcpThemeTokenSet, AcpThemeTokenVersion
 from acp.views.common import (
     maybe_mark_published,
@@ -18,37 +19,12 @@ from acp.views.common import (
 from admin_panel.decorators import permission_required
 from core.constants import WORKFLOW_DRAFT
 from core.utils import clean_text, utc_now_naive
-
-
-def _theme_payload(item):
-    return {
-        'key': item.key,
-        'name': item.name,
-        'status': item.status,
-        'tokens_json': item.tokens_json or '{}',
-        'scheduled_publish_at': item.scheduled_publish_at.isoformat() if item.scheduled_publish_at else None,
-        'published_at': item.published_at.isoformat() if item.published_at else None,
-    }
-
-
-def _create_theme_version(item, user, change_note=''):
-    try:
-        latest = AcpThemeTokenVersion.objects.filter(token_set_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        AcpThemeTokenVersion.objects.create(
-            token_set_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_theme_payload(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
+from headless.delivery_cache import refresh_delivery_documents
 
 
 def _save_theme_tokens(request, item=None):
     target = item if item is not None else AcpThemeTokenSet()
+    previous_key = getattr(target, 'key', '')
     name = clean_text(request.POST.get('name', ''), 180)
     key = clean_text(request.POST.get('key', 'default'), 80).lower()
     status = normalize_status(request.POST.get('workflow_status', WORKFLOW_DRAFT))
@@ -85,7 +61,8 @@ def _save_theme_tokens(request, item=None):
 
     try:
         target.save()
-        _create_theme_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        create_theme_version(target, request.user, change_note=request.POST.get('change_note', ''))
+        refresh_delivery_documents('theme', previous_key, target.key)
         return target, target, ''
     except Exception:
         return None, target, 'Could not save theme token set.'
@@ -122,7 +99,7 @@ def theme_token_add(request):
                 action='create',
                 entity_type='theme_token_set',
                 entity_id=saved.id,
-                after_json=json.dumps(_theme_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(theme_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Theme token set created.')
             return redirect('acp:theme_token_edit', id=saved.id)
@@ -141,7 +118,7 @@ def theme_token_add(request):
 def theme_token_edit(request, id):
     item = get_object_or_404(AcpThemeTokenSet, id=id)
     if request.method == 'POST':
-        before = json.dumps(_theme_payload(item), ensure_ascii=False)
+        before = json.dumps(theme_snapshot(item), ensure_ascii=False)
         saved, preview, error = _save_theme_tokens(request, item=item)
         if saved:
             write_audit(
@@ -151,7 +128,7 @@ def theme_token_edit(request, id):
                 entity_type='theme_token_set',
                 entity_id=saved.id,
                 before_json=before,
-                after_json=json.dumps(_theme_payload(saved), ensure_ascii=False),
+                after_json=json.dumps(theme_snapshot(saved), ensure_ascii=False),
             )
             messages.success(request, 'Theme token set updated.')
             return redirect('acp:theme_token_edit', id=saved.id)
@@ -0,0 +1,100 @@
+"""
+Snapshots, version rows and cache purges for services, posts and industries,
+shared by the admin content views and the scheduled publisher.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from core.cache_namespaces import NAMESPACE_ADMIN_STATS, NAMESPACE_SITEMAP, bump_namespaces
+from core.constants import WORKFLOW_DRAFT
+from core.page_cache import purge_tags
+from core.versions import create_version
+from public.models import IndustryVersion, PostVersion, ServiceVersion
+from public.related_content import invalidate_related_posts, invalidate_related_services
+from public.slug_index import invalidate_slug_index
+
+
+def format_datetime_local(value):
+    if not isinstance(value, datetime):
+        return ''
+    return value.strftime('%Y-%m-%dT%H:%M')
+
+
+def purge_public_content(*tags):
+    purge_tags(*tags)
+    invalidate_slug_index()
+    invalidate_related_services()
+    bump_namespaces(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
+
+
+def purge_posts(*tags):
+    purge_tags('posts', *tags)
+    invalidate_related_posts()
+    bump_namespaces(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
+
+
+def service_snapshot(item):
+    return {
+        'title': item.title,
+        'slug': item.slug,
+        'description': item.description,
+        'icon_class': item.icon_class or '',
+        'image': item.image or '',
+        'service_type': item.service_type or 'professional',
+        'is_featured': bool(item.is_featured),
+        'sort_order': int(item.sort_order or 0),
+        'profile_json': item.profile_json or '',
+        'seo_title': item.seo_title or '',
+        'seo_description': item.seo_description or '',
+        'og_image': item.og_image or '',
+        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
+        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
+    }
+
+
+def post_snapshot(item):
+    return {
+        'title': item.title,
+        'slug': item.slug,
+        'excerpt': item.excerpt or '',
+        'content': item.content,
+        'featured_image': item.featured_image or '',
+        'category_id': item.category_id,
+        'seo_title': item.seo_title or '',
+        'seo_description': item.seo_description or '',
+        'og_image': item.og_image or '',
+        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
+        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
+    }
+
+
+def industry_snapshot(item):
+    return {
+        'title': item.title,
+        'slug': item.slug,
+        'description': item.description,
+        'icon_class': item.icon_class or '',
+        'hero_description': item.hero_description or '',
+        'challenges': item.challenges or '',
+        'solutions': item.solutions or '',
+        'stats': item.stats or '',
+        'sort_order': int(item.sort_order or 0),
+        'seo_title': item.seo_title or '',
+        'seo_description': item.seo_description or '',
+        'og_image': item.og_image or '',
+        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
+        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
+    }
+
+
+def create_service_version(item, user, change_note=''):
+    create_version(ServiceVersion, 'service_id', service_snapshot, item, user, change_note)
+
+
+def create_post_version(item, user, change_note=''):
+    create_version(PostVersion, 'post_id', post_snapshot, item, user, change_note)
+
+
+def create_industry_version(item, user, change_note=''):
+    create_version(IndustryVersion, 'industry_id', industry_snapshot, item, user, change_note)
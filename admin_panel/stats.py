@@ -0,0 +1,145 @@
+"""
+Cached counters shared by the admin dashboard, control center and headless hub.
+
+Every counter comes from one conditional-aggregate query per table
+(``Count('id', filter=Q(...))``), roughly a dozen queries in total instead
+of one ``COUNT(*)`` per number. The result is cached as a single snapshot
+for ``ADMIN_STATS_TTL`` seconds and dropped early (``invalidate_admin_stats``)
+when contacts, tickets or site content change. The rolling 24h event counts
+come from the hourly/daily rollups (``core.metric_rollups``); they and the
+ACP document counts may lag by up to the TTL.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db.models import Count, Q
+
+from core.cache_build import get_or_build
+from core.cache_namespaces import NAMESPACE_ADMIN_STATS, bump_namespaces, namespaced_key
+from core.constants import (
+    SUPPORT_TICKET_STATUS_IN_PROGRESS,
+    SUPPORT_TICKET_STATUS_OPEN,
+    SUPPORT_TICKET_STATUS_RESOLVED,
+    SUPPORT_TICKET_STATUS_WAITING_CUSTOMER,
+    WORKFLOW_PUBLISHED,
+)
+from core.metric_rollups import windowed_count, windowed_counts
+from core.utils import utc_now_naive
+
+ADMIN_STATS_TTL = 60
+OPEN_TICKET_STATUSES = (
+    SUPPORT_TICKET_STATUS_OPEN,
+    SUPPORT_TICKET_STATUS_IN_PROGRESS,
+    SUPPORT_TICKET_STATUS_WAITING_CUSTOMER,
+)
+SECURITY_WATCH_EVENTS = ('turnstile_failed', 'rate_limited')
+
+_NOT_TRASHED = Q(is_trashed=False) | Q(is_trashed__isnull=True)
+
+
+def _blank(field):
+    return Q(**{f'{field}__isnull': True}) | Q(**{field: ''})
+
+
+def _count(condition=None):
+    return Count('id', filter=condition) if condition is not None else Count('id')
+
+
+def _aggregate(query, **counts):
+    try:
+        return {name: value or 0 for name, value in query.aggregate(**counts).items()}
+    except Exception:
+        return dict.fromkeys(counts, 0)
+
+
+def _windowed(name, since):
+    try:
+        return windowed_count(name, since)
+    except Exception:
+        return 0
+
+
+def _build_admin_stats():
+    from acp.models import AcpDashboardDocument, AcpPageDocument
+    from admin_panel.models import AuthRateLimitBucket, ContactSubmission, SupportTicket
+    from public.models import CmsArticle, CmsPage, ContentBlock, Industry, Post, Service
+
+    now = utc_now_naive()
+    last_24h = now - timedelta(hours=24)
+    last_7d = now - timedelta(days=7)
+    published = Q(workflow_status=WORKFLOW_PUBLISHED) & _NOT_TRASHED
+    open_tickets = Q(status__in=OPEN_TICKET_STATUSES)
+
+    stats = {'generated_at': now}
+    stats.update(
+        _aggregate(
+            Service.objects.all(),
+            services=_count(),
+            services_published=_count(published),
+            services_missing_profile=_count(_blank('profile_json')),
+        )
+    )
+    stats.update(
+        _aggregate(
+            Industry.objects.all(),
+            industries=_count(),
+            industries_published=_count(published),
+            industries_incomplete=_count(_blank('hero_description') | _blank('challenges') | _blank('solutions')),
+        )
+    )
+    stats.update(
+        _aggregate(
+            Post.objects.all(),
+            posts=_count(),
+            posts_published=_count(published),
+            published_posts_missing_excerpt=_count(Q(workflow_status=WORKFLOW_PUBLISHED) & _blank('excerpt')),
+        )
+    )
+    stats.update(_aggregate(ContactSubmission.objects.all(), contacts=_count(Q(is_read=False))))
+    stats['contacts_24h'] = _windowed('contacts_created', last_24h)
+    stats.update(
+        _aggregate(
+            SupportTicket.objects.all(),
+            tickets_total=_count(),
+            support_tickets=_count(open_tickets),
+            support_waiting=_count(Q(status=SUPPORT_TICKET_STATUS_WAITING_CUSTOMER)),
+            resolved_7d=_count(Q(status=SUPPORT_TICKET_STATUS_RESOLVED, updated_at__gte=last_7d)),
+            critical_open_tickets=_count(open_tickets & Q(priority__in=['high', 'critical'])),
+        )
+    )
+    stats['tickets_24h'] = _windowed('tickets_created', last_24h)
+    try:
+        security = windowed_counts('security_events', last_24h)
+    except Exception:
+        security = {}
+    stats['security_events_all_24h'] = sum(security.values())
+    stats['security_events_24h'] = sum(security.get(event_type, 0) for event_type in SECURITY_WATCH_EVENTS)
+    stats.update(
+        _aggregate(
+            AuthRateLimitBucket.objects.filter(scope='admin_login', count__gt=0, reset_at__gt=now),
+            active_admin_buckets=_count(),
+        )
+    )
+    stats.update(_aggregate(CmsPage.objects.all(), cms_pages_published=_count(Q(is_published=True))))
+    stats.update(_aggregate(CmsArticle.objects.all(), cms_articles_published=_count(Q(is_published=True))))
+    stats.update(_aggregate(ContentBlock.objects.all(), content_blocks=_count()))
+    stats.update(_aggregate(AcpPageDocument.objects.all(), acp_pages_published=_count(Q(status=WORKFLOW_PUBLISHED))))
+    stats.update(
+        _aggregate(AcpDashboardDocument.objects.all(), acp_dashboards_published=_count(Q(status=WORKFLOW_PUBLISHED)))
+    )
+    return stats
+
+
+def admin_stats():
+    """The current counters snapshot (a dict), rebuilt at most every ``ADMIN_STATS_TTL`` seconds."""
+    return get_or_build(
+        namespaced_key(NAMESPACE_ADMIN_STATS, 'snapshot'), _build_admin_stats, ADMIN_STATS_TTL, name='admin-stats'
+    )
+
+
+def invalidate_admin_stats():
+    try:
+        bump_namespaces(NAMESPACE_ADMIN_STATS)
+    except Exception:
+        pass
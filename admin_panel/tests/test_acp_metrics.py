@@ -0,0 +1,100 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from acp import metrics
+
+
+def _definition(key, dataset_key='support_tickets', aggregation='count', template='', formula='', dimensions='[]'):
+    return SimpleNamespace(
+        key=key,
+        dataset_key=dataset_key,
+        default_aggregation=aggregation,
+        query_template=template,
+        formula=formula,
+        dimensions_json=dimensions,
+        allowed_roles_json='[]',
+        updated_at=None,
+    )
+
+
+class CompileTests(SimpleTestCase):
+    def test_definitions_outside_the_whitelist_are_rejected(self):
+        cases = (
+            _definition('a', dataset_key='auth_user'),
+            _definition('b', aggregation='stddev'),
+            _definition('c', dimensions='["password"]'),
+            _definition('d', template='{"filters": {"client__email": "x"}}'),
+            _definition('e', aggregation='sum', template='{"field": "subject"}'),
+            _definition('f', formula='__import__("os").system("true")'),
+            _definition('g', formula='{a} ** 100'),
+        )
+        for definition in cases:
+            with self.assertRaises(metrics.MetricError, msg=definition.key):
+                metrics._compile(definition, {})
+
+    def test_placeholders_bind_caller_filters(self):
+        definition = _definition('open', template='{"filters": {"status": "open", "priority": "{priority}"}}')
+
+        bound = metrics._compile(definition, {'priority': 'high'})
+        unbound = metrics._compile(definition, {})
+
+        self.assertIn(('priority', 'high'), bound.condition.children)
+        self.assertEqual(unbound.condition.children, [('status', 'open')])
+
+
+class EvaluateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('acp.metrics._query_rows')
+    def test_widgets_sharing_dataset_and_dimensions_share_one_query_and_the_cache(self, query_rows):
+        def rows(dataset, aliased, group_by, where, since):
+            if group_by == ['status']:
+                return [{'status': 'open', 'm0': 2}, {'status': 'resolved', 'm0': 3}]
+            # total, resolved, then resolved_pct's two references.
+            return [{'m0': 5, 'm1': 3, 'm2': 3, 'm3': 5}]
+
+        query_rows.side_effect = rows
+        definitions = [
+            _definition('total'),
+            _definition('by_status', dimensions='["status"]'),
+            _definition('resolved', template='{"filters": {"status": "resolved"}}'),
+            _definition('resolved_pct', formula='{resolved} / {total} * 100'),
+        ]
+        now = datetime(2026, 3, 1, 12, 30)
+
+        first = metrics.evaluate_metrics(definitions, window='24h', now=now)
+        second = metrics.evaluate_metrics(definitions, window='24h', now=now)
+
+        self.assertEqual(query_rows.call_count, 2)
+        self.assertEqual(first['total'].value, 5)
+        self.assertEqual([(g['label'], g['value']) for g in first['by_status'].groups], [('resolved', 3), ('open', 2)])
+        self.assertEqual(first['resolved'].value, 3)
+        self.assertEqual(first['resolved_pct'].value, 60.0)
+        self.assertEqual(second['resolved_pct'].value, 60.0)
+
+    @patch('acp.metrics._query_rows')
+    def test_too_many_groups_is_an_error_not_a_partial_total(self, query_rows):
+        query_rows.side_effect = lambda dataset, aliased, group_by, where, since: (
+            [{'hour': index, 'm0': 1} for index in range(metrics.MAX_GROUP_ROWS + 1)] if group_by else [{'m0': 9000}]
+        )
+        definitions = [_definition('total'), _definition('hourly', dimensions='["hour"]')]
+
+        first = metrics.evaluate_metrics(definitions, window='90d')
+        second = metrics.evaluate_metrics(definitions, window='90d')
+
+        self.assertEqual(first['total'].value, 9000)
+        self.assertIn('More than', first['hourly'].error)
+        self.assertIsNone(first['hourly'].value)
+        # The failed metric is not cached; the total is.
+        self.assertEqual(query_rows.call_count, 3)
+        self.assertIn('More than', second['hourly'].error)
+
+    def test_windows_align_to_their_cache_bucket(self):
+        since, bucket_start, seconds = metrics.metric_window('24h', datetime(2026, 3, 1, 12, 34, 56))
+
+        self.assertEqual((since, bucket_start, seconds), (datetime(2026, 2, 28, 12, 30), datetime(2026, 3, 1, 12, 30), 300))
@@ -0,0 +1,39 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from admin_panel import stats
+
+
+class AdminStatsTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('admin_panel.stats._build_admin_stats')
+    def test_snapshot_is_shared_until_invalidated(self, build):
+        build.side_effect = [{'services': 3}, {'services': 4}]
+
+        first = stats.admin_stats()
+        second = stats.admin_stats()
+        stats.invalidate_admin_stats()
+        third = stats.admin_stats()
+
+        self.assertEqual((first, second, third), ({'services': 3}, {'services': 3}, {'services': 4}))
+        self.assertEqual(build.call_count, 2)
+
+    def test_counts_for_one_table_come_from_a_single_aggregate(self):
+        query = MagicMock()
+        query.aggregate.return_value = {'tickets_total': 7, 'resolved_7d': None}
+
+        result = stats._aggregate(query, tickets_total=stats._count(), resolved_7d=stats._count())
+
+        query.aggregate.assert_called_once()
+        self.assertEqual(result, {'tickets_total': 7, 'resolved_7d': 0})
+
+    def test_failed_aggregate_reports_zeros(self):
+        query = MagicMock()
+        query.aggregate.side_effect = DatabaseError('no such table')
+
+        self.assertEqual(stats._aggregate(query, posts=stats._count()), {'posts': 0})
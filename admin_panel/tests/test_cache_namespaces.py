@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from admin_panel.views.management import _clear_site_cache
+from core.cache_namespaces import (
+    NAMESPACE_RATE_LIMIT,
+    NAMESPACE_SEO,
+    NAMESPACE_SITE_CONTEXT,
+    namespaced_key,
+)
+from core.local_cache import LocalCache
+from core.rate_limit import check_rate_limit
+
+
+class CacheNamespaceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_settings_save_only_retires_affected_namespaces(self):
+        site_key = namespaced_key(NAMESPACE_SITE_CONTEXT, 'v1:site_settings')
+        seo_key = namespaced_key(NAMESPACE_SEO, 'v1:sitemap:http:example.com')
+        cache.set(site_key, {'company_name': 'Old'})
+        cache.set(seo_key, '<urlset/>')
+        for _ in range(3):
+            check_rate_limit('login:203.0.113.9', max_attempts=3)
+
+        _clear_site_cache(NAMESPACE_SITE_CONTEXT)
+
+        self.assertNotEqual(namespaced_key(NAMESPACE_SITE_CONTEXT, 'v1:site_settings'), site_key)
+        self.assertEqual(namespaced_key(NAMESPACE_SEO, 'v1:sitemap:http:example.com'), seo_key)
+        self.assertEqual(cache.get(seo_key), '<urlset/>')
+        self.assertTrue(check_rate_limit('login:203.0.113.9', max_attempts=3))
+
+    def test_unknown_namespace_is_rejected(self):
+        with self.assertRaises(ValueError):
+            namespaced_key('not-registered', 'key')
+        self.assertIn(NAMESPACE_RATE_LIMIT, namespaced_key(NAMESPACE_RATE_LIMIT, 'x'))
+
+    def test_local_cache_serves_from_memory_until_namespace_bump(self):
+        local = LocalCache(NAMESPACE_SITE_CONTEXT, ttl=60, max_entries=2, version_check_seconds=60)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return {'loads': len(loads)}
+
+        self.assertEqual(local.get('site_settings', loader), {'loads': 1})
+        cache.clear()
+        self.assertEqual(local.get('site_settings', loader), {'loads': 1})
+
+        _clear_site_cache(NAMESPACE_SITE_CONTEXT)
+        self.assertEqual(local.get('site_settings', loader), {'loads': 2})
+
+        local.get('navigation', loader)
+        local.get('footer_content', loader)
+        self.assertEqual(local.get('site_settings', loader), {'loads': 5})
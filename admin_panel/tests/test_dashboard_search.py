@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from admin_panel.views import dashboard
+
+
+class DashboardSearchTests(SimpleTestCase):
+    @patch('admin_panel.views.dashboard.search')
+    def test_slug_matches_come_first_and_are_not_repeated(self, search_mock):
+        queryset = MagicMock()
+        queryset.filter.return_value.order_by.return_value = [SimpleNamespace(id=7, slug='iphone-screen-repair')]
+        search_mock.return_value = [SimpleNamespace(id=3, slug='phone-repair'), SimpleNamespace(id=7, slug='iphone-screen-repair')]
+
+        items = dashboard._search_with_slug(queryset, 'screen-repair', limit=6)
+
+        queryset.filter.assert_called_once_with(slug__icontains='screen-repair')
+        self.assertEqual([item.id for item in items], [7, 3])
+
+    @patch('admin_panel.views.dashboard.search')
+    def test_full_slug_page_skips_the_ranked_search(self, search_mock):
+        queryset = MagicMock()
+        queryset.filter.return_value.order_by.return_value = [SimpleNamespace(id=index) for index in range(2)]
+
+        self.assertEqual(len(dashboard._search_with_slug(queryset, 'repair', limit=2)), 2)
+        search_mock.assert_not_called()
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase
+
+from admin_panel.views.management import headless_hub
+
+
+@patch('admin_panel.views.management.messages')
+@patch('admin_panel.views.management._clear_site_cache')
+@patch('admin_panel.views.management._set_setting')
+class HeadlessHubTests(SimpleTestCase):
+    def _post(self, data):
+        request = RequestFactory().post('/admin/headless', data)
+        request.user = SimpleNamespace(is_authenticated=True, has_permission=lambda permission: True)
+        return headless_hub(request)
+
+    def test_invalid_named_tokens_save_nothing(self, set_setting, clear_cache, messages):
+        response = self._post({'headless_delivery_token': 'rotated', 'headless_delivery_tokens': '{not json'})
+
+        self.assertEqual(response.status_code, 302)
+        set_setting.assert_not_called()
+        clear_cache.assert_not_called()
+        messages.error.assert_called_once()
+
+    def test_valid_save_bumps_the_settings_namespace(self, set_setting, clear_cache, messages):
+        self._post({
+            'headless_delivery_token': 'rotated',
+            'headless_delivery_tokens': '[{"name": "edge", "token": "edge-secret", "scopes": ["theme"]}]',
+        })
+
+        saved = {call.args[0]: call.args[1] for call in set_setting.call_args_list}
+        self.assertEqual(saved['headless_delivery_token'], 'rotated')
+        self.assertEqual(saved['headless_delivery_tokens'], '[{"name": "edge", "token": "edge-secret", "scopes": ["theme"]}]')
+        clear_cache.assert_called_once()
@@ -0,0 +1,122 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from admin_panel.models import SecurityEvent, SupportClient, SupportTicket, SupportTicketEvent, User
+from core import metric_rollups
+from core.models import MetricRollup, MetricRollupCursor
+
+
+class BucketTests(SimpleTestCase):
+    def test_windows_start_at_the_next_whole_hour_and_day(self):
+        since = datetime(2026, 3, 1, 12, 30, 15)
+
+        self.assertEqual(metric_rollups.floor_hour(since), datetime(2026, 3, 1, 12))
+        self.assertEqual(metric_rollups._ceil(since, metric_rollups.floor_hour, timedelta(hours=1)), datetime(2026, 3, 1, 13))
+        self.assertEqual(metric_rollups._ceil(since, metric_rollups.floor_day, timedelta(days=1)), datetime(2026, 3, 2))
+        self.assertEqual(
+            metric_rollups._ceil(datetime(2026, 3, 2), metric_rollups.floor_day, timedelta(days=1)), datetime(2026, 3, 2)
+        )
+
+
+class WindowedCountTests(SimpleTestCase):
+    @patch('core.metric_rollups._grouped')
+    @patch('core.metric_rollups._rolled_through', return_value=None)
+    def test_counts_live_until_the_first_rollup(self, _rolled_through, grouped):
+        grouped.return_value = Counter({(None, 'turnstile_failed'): 3, (None, 'rate_limited'): 2})
+        since = datetime(2026, 3, 1, 12, 30)
+
+        self.assertEqual(
+            metric_rollups.windowed_counts('security_events', since), {'turnstile_failed': 3, 'rate_limited': 2}
+        )
+        self.assertEqual(metric_rollups.windowed_count('security_events', since, dimensions=['rate_limited']), 2)
+        self.assertEqual(metric_rollups.windowed_count('security_events', since), 5)
+        self.assertEqual(grouped.call_count, 3)
+
+
+class RollupTests(TransactionTestCase):
+    # The tables are unmanaged, so they are created for each test and dropped afterwards.
+    models = (User, SupportClient, SupportTicket, SupportTicketEvent, SecurityEvent, MetricRollup, MetricRollupCursor)
+    now = datetime(2026, 3, 10, 12, 20)
+
+    def setUp(self):
+        with connection.schema_editor() as editor:
+            for model in self.models:
+                editor.create_model(model)
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in reversed(self.models):
+                editor.delete_model(model)
+
+    def _security_events(self):
+        start = self.now - timedelta(days=3)
+        events = []
+        for minute in range(0, 3 * 24 * 60, 37):
+            event_type = ('turnstile_failed', 'rate_limited', 'login_failed')[minute % 3]
+            events.append(
+                SecurityEvent(
+                    event_type=event_type, scope='admin', ip='1.1.1.1', path='/', method='POST',
+                    created_at=start + timedelta(minutes=minute),
+                )
+            )
+        SecurityEvent.objects.bulk_create(events)
+
+    def _live(self, since):
+        counts = Counter(
+            SecurityEvent.objects.filter(created_at__gte=since).values_list('event_type', flat=True)
+        )
+        return dict(counts)
+
+    def test_rolled_up_windows_match_live_counts(self):
+        self._security_events()
+
+        hours = metric_rollups.roll_up('security_events', now=self.now, backfill_days=5)
+
+        cursor = MetricRollupCursor.objects.get(metric='security_events')
+        self.assertEqual(cursor.rolled_through, datetime(2026, 3, 10, 12))
+        self.assertEqual(hours, 5 * 24 + 12)
+        self.assertTrue(MetricRollup.objects.filter(granularity=metric_rollups.ROLLUP_DAY).exists())
+        for since in (self.now - timedelta(hours=24), self.now - timedelta(days=2, minutes=13), self.now - timedelta(minutes=20)):
+            self.assertEqual(metric_rollups.windowed_counts('security_events', since), self._live(since), since)
+
+        # Re-running with nothing new is a no-op.
+        self.assertEqual(metric_rollups.roll_up('security_events', now=self.now), 0)
+
+    def test_ticket_status_changes_count_only_real_transitions(self):
+        client = SupportClient.objects.create(full_name='Client', email='c@example.com', password_hash='x')
+        ticket = SupportTicket.objects.create(
+            ticket_number='RR-1', client=client, subject='Help', priority='low', status='resolved',
+        )
+        stamp = self.now - timedelta(hours=5)
+        for status_from, status_to in (('open', 'resolved'), ('resolved', 'resolved'), ('resolved', 'resolved'), (None, 'open')):
+            SupportTicketEvent.objects.create(
+                ticket=ticket, event_type='status', actor_type='admin', actor_name='Staff',
+                status_from=status_from, status_to=status_to, created_at=stamp,
+            )
+
+        metric_rollups.roll_up('ticket_status_changes', now=self.now, backfill_days=1)
+
+        self.assertEqual(
+            metric_rollups.windowed_counts('ticket_status_changes', self.now - timedelta(days=1)),
+            {'resolved': 1, 'open': 1},
+        )
+
+
+class RollupSetupTests(TransactionTestCase):
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in (MetricRollup, MetricRollupCursor):
+                editor.delete_model(model)
+
+    def test_setup_creates_the_tables_and_unique_index_once(self):
+        self.assertEqual(metric_rollups.setup_rollup_tables(), ['metric_rollup', 'metric_rollup_cursor'])
+        self.assertEqual(metric_rollups.setup_rollup_tables(), [])
+
+        with connection.cursor() as cursor:
+            index = connection.introspection.get_constraints(cursor, 'metric_rollup')[metric_rollups.ROLLUP_UNIQUE_INDEX]
+        self.assertTrue(index['unique'])
+        self.assertEqual(index['columns'], ['metric', 'granularity', 'bucket_start', 'dimension'])
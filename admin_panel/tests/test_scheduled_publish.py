@@ -0,0 +1,151 @@
+from datetime import datetime
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from acp.models import AcpAuditEvent
+from admin_panel.documents import create_service_version
+from admin_panel.models import User
+from core import scheduled_publish
+from public.models import Category, Post, PostVersion, Service
+
+
+def _target(model, invalidate):
+    return scheduled_publish.ScheduledTarget(
+        name='page',
+        model=model,
+        status_field='status',
+        snapshot=lambda row: {'status': row.status},
+        create_version=MagicMock(),
+        invalidate=invalidate,
+        audit_domain='pages',
+    )
+
+
+@patch('core.scheduled_publish.transaction.atomic', MagicMock())
+@patch('core.scheduled_publish.connection', SimpleNamespace(features=SimpleNamespace(has_select_for_update_skip_locked=False)))
+class ScheduledPublishTests(SimpleTestCase):
+    @patch('acp.models.AcpAuditEvent.objects.bulk_create')
+    def test_rows_claimed_elsewhere_are_skipped(self, audit_create):
+        now = datetime(2026, 3, 1, 9, 0)
+        due = [
+            SimpleNamespace(id=1, status='approved', scheduled_publish_at=datetime(2026, 3, 1, 8, 0)),
+            SimpleNamespace(id=2, status='published', scheduled_publish_at=datetime(2026, 3, 1, 8, 30)),
+        ]
+        model = MagicMock()
+        model.objects.filter.return_value.order_by.return_value.__getitem__.return_value = due
+        # Row 2 was published by another worker between the read and the conditional update.
+        claims = {1: 1, 2: 0}
+        model.objects.filter.side_effect = lambda *args, **kwargs: (
+            SimpleNamespace(update=lambda **updates: claims[kwargs['id']])
+            if 'id' in kwargs
+            else model.objects.filter.return_value
+        )
+        invalidate = MagicMock()
+        target = _target(model, invalidate)
+
+        self.assertEqual(scheduled_publish.publish_due_batch(target, now=now, batch_size=10), 1)
+        self.assertEqual((due[0].status, due[0].published_at, due[0].scheduled_publish_at), ('published', now, None))
+        target.create_version.assert_called_once_with(due[0], None, change_note='Scheduled publish')
+        audit = audit_create.call_args.args[0]
+        self.assertEqual(
+            [(row.entity_id, row.before_json, row.actor_username) for row in audit],
+            [('1', '{"status": "approved"}', 'scheduler')],
+        )
+        invalidate.assert_called_once_with([due[0]])
+
+    def test_nothing_due_writes_nothing(self):
+        model = MagicMock()
+        model.objects.filter.return_value.order_by.return_value.__getitem__.return_value = []
+        invalidate = MagicMock()
+        self.assertEqual(scheduled_publish.publish_due_batch(_target(model, invalidate)), 0)
+        invalidate.assert_not_called()
+
+
+
+@patch('core.management.commands.publish_scheduled.publish_due', return_value={'post': 2})
+class PublishCommandTests(SimpleTestCase):
+    def test_refuses_a_process_local_cache(self, publish_due):
+        with self.assertRaisesMessage(CommandError, 'process-local'):
+            call_command('publish_scheduled')
+        publish_due.assert_not_called()
+
+        call_command('publish_scheduled', '--allow-local-cache', stdout=StringIO())
+        publish_due.assert_called_once()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}})
+    def test_runs_with_a_shared_cache(self, publish_due):
+        out = StringIO()
+        call_command('publish_scheduled', stdout=out)
+        self.assertIn('post=2', out.getvalue())
+
+class ScheduledIndexTests(TransactionTestCase):
+    def setUp(self):
+        self.models = [target.model for target in scheduled_publish._targets()]
+        with connection.schema_editor() as editor:
+            for model in self.models:
+                editor.create_model(model)
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in self.models:
+                editor.delete_model(model)
+
+    def test_setup_creates_a_partial_index_per_target_and_is_idempotent(self):
+        tables = scheduled_publish.setup_scheduled_indexes()
+
+        self.assertEqual(tables, tuple(model._meta.db_table for model in self.models))
+        self.assertEqual(scheduled_publish.setup_scheduled_indexes(), tables)
+        with connection.cursor() as cursor:
+            for table in tables:
+                constraints = connection.introspection.get_constraints(cursor, table)
+                self.assertEqual(constraints[f'{table}_scheduled_publish_idx']['columns'], ['scheduled_publish_at'])
+
+    def test_failed_version_write_leaves_the_transaction_usable(self):
+        # There is no service_versions table, so the insert fails inside its own savepoint.
+        with transaction.atomic():
+            service = Service.objects.create(title='Repair', slug='repair', description='', workflow_status='draft')
+            create_service_version(service, None, change_note='Scheduled publish')
+            self.assertEqual(Service.objects.filter(id=service.id).count(), 1)
+
+
+class ScheduledPostTests(TransactionTestCase):
+    models = (User, Category, Post, PostVersion, AcpAuditEvent)
+    now = datetime(2026, 3, 1, 9, 0)
+
+    def setUp(self):
+        with connection.schema_editor() as editor:
+            for model in self.models:
+                editor.create_model(model)
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in reversed(self.models):
+                editor.delete_model(model)
+
+    def _post(self, slug, status, published_at):
+        return Post.objects.create(
+            title=slug, slug=slug, content='', workflow_status=status, is_published=status == 'published',
+            scheduled_publish_at=datetime(2026, 3, 1, 8, 0), published_at=published_at, updated_at=datetime(2026, 2, 1),
+        )
+
+    def test_already_published_rows_only_lose_their_passed_schedule(self):
+        live = self._post('live', 'published', datetime(2026, 1, 10, 12, 0))
+        due = self._post('due', 'approved', None)
+        target = next(target for target in scheduled_publish._targets() if target.name == 'post')
+
+        self.assertEqual(scheduled_publish.publish_due_batch(target, now=self.now), 1)
+
+        live.refresh_from_db()
+        due.refresh_from_db()
+        self.assertEqual(
+            (live.published_at, live.updated_at, live.scheduled_publish_at),
+            (datetime(2026, 1, 10, 12, 0), datetime(2026, 2, 1), None),
+        )
+        self.assertEqual((due.workflow_status, due.is_published, due.published_at), ('published', True, self.now))
+        self.assertEqual(list(PostVersion.objects.values_list('post_id', flat=True)), [due.id])
+        self.assertEqual(list(AcpAuditEvent.objects.values_list('entity_id', flat=True)), [str(due.id)])
@@ -13,6 +13,14 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.text import slugify
 
 from admin_panel.decorators import permission_required
+from admin_panel.documents import (
+    create_industry_version,
+    create_post_version,
+    create_service_version,
+    format_datetime_local,
+    purge_posts,
+    purge_public_content,
+)
 from core.constants import (
     WORKFLOW_DRAFT,
     WORKFLOW_PUBLISHED,
@@ -21,6 +29,7 @@ from core.constants import (
     normalize_workflow_status,
 )
 from core.content_schemas import CONTENT_SCHEMAS
+from core.page_cache import purge_tags
 from core.utils import clean_text, utc_now_naive
 from public.models import (
     Category,
@@ -32,6 +41,7 @@ from public.models import (
     Service,
     ServiceVersion,
 )
+from public.service_profiles import refresh_service_profile
 
 
 def workflow_status_label(status):
@@ -50,12 +60,6 @@ def workflow_status_badge(status):
     return 'bg-secondary'
 
 
-def format_datetime_local(value):
-    if not isinstance(value, datetime):
-        return ''
-    return value.strftime('%Y-%m-%dT%H:%M')
-
-
 def _parse_datetime_local(value):
     raw = (value or '').strip()
     if not raw:
@@ -205,6 +209,7 @@ def content_edit(request, page, section):
                     content=json.dumps(payload, ensure_ascii=False),
                     updated_at=now,
                 )
+            purge_tags(f'content_block:{page}')
             messages.success(request, f'Updated content block: {page} / {section}.')
             return redirect('admin:content_edit', page=page, section=section)
         except Exception:
@@ -221,41 +226,6 @@ def content_edit(request, page, section):
     )
 
 
-def _service_snapshot(item):
-    return {
-        'title': item.title,
-        'slug': item.slug,
-        'description': item.description,
-        'icon_class': item.icon_class or '',
-        'image': item.image or '',
-        'service_type': item.service_type or 'professional',
-        'is_featured': bool(item.is_featured),
-        'sort_order': int(item.sort_order or 0),
-        'profile_json': item.profile_json or '',
-        'seo_title': item.seo_title or '',
-        'seo_description': item.seo_description or '',
-        'og_image': item.og_image or '',
-        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
-        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
-    }
-
-
-def _create_service_version(item, user, change_note=''):
-    try:
-        latest = ServiceVersion.objects.filter(service_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        ServiceVersion.objects.create(
-            service_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_service_snapshot(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
-
-
 def _service_preview_from_post(request, item=None):
     target = item if item is not None else Service()
     target.title = clean_text(request.POST.get('title', ''), 200)
@@ -329,7 +299,9 @@ def _save_service(request, item=None):
         target.image = _uploaded_path(upload, folder='services')
 
     target.save()
-    _create_service_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    create_service_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    refresh_service_profile(target)
+    purge_public_content('services', f'service:{target.id}')
     return target, target, ''
 
 
@@ -408,7 +380,8 @@ def service_clone(request, id):
         updated_at=now,
     )
     cloned.save()
-    _create_service_version(cloned, request.user, change_note='Cloned from existing service')
+    create_service_version(cloned, request.user, change_note='Cloned from existing service')
+    purge_public_content('services')
     messages.success(request, 'Service duplicated.')
     return redirect('admin:service_edit', id=cloned.id)
 
@@ -421,6 +394,7 @@ def service_delete(request, id):
     if item.is_trashed:
         try:
             item.delete()
+            purge_public_content('services', f'service:{id}')
             messages.success(request, 'Service permanently deleted.')
         except Exception:
             messages.error(request, 'Unable to permanently delete service due to related records.')
@@ -430,6 +404,7 @@ def service_delete(request, id):
     item.trashed_at = utc_now_naive()
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('services', f'service:{item.id}')
     messages.success(request, 'Service moved to trash.')
     return redirect('admin:services')
 
@@ -443,6 +418,7 @@ def service_trash_restore(request, id):
     item.trashed_at = None
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('services', f'service:{item.id}')
     messages.success(request, 'Service restored from trash.')
     return redirect('/admin/services?trash=1')
 
@@ -477,6 +453,8 @@ def services_bulk(request):
             messages.error(request, 'Some records could not be permanently deleted and were moved to trash instead.')
     else:
         messages.error(request, 'Unsupported bulk action.')
+        return redirect('admin:services')
+    purge_public_content('services', *[f'service:{item_id}' for item_id in ids])
     return redirect('admin:services')
 
 
@@ -500,6 +478,7 @@ def service_autosave(request, id):
     item.scheduled_publish_at = preview.scheduled_publish_at
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('services', f'service:{item.id}')
     return JsonResponse({'ok': True, 'saved_at': item.updated_at.isoformat()})
 
 
@@ -529,43 +508,13 @@ def service_restore(request, id):
     service.scheduled_publish_at = _parse_datetime_local(snapshot.get('scheduled_publish_at', ''))
     service.updated_at = utc_now_naive()
     service.save()
-    _create_service_version(service, request.user, change_note=f'Restored version {version.version_number}')
+    create_service_version(service, request.user, change_note=f'Restored version {version.version_number}')
+    refresh_service_profile(service)
+    purge_public_content('services', f'service:{service.id}')
     messages.success(request, f'Restored service to version {version.version_number}.')
     return redirect('admin:service_edit', id=service.id)
 
 
-def _post_snapshot(item):
-    return {
-        'title': item.title,
-        'slug': item.slug,
-        'excerpt': item.excerpt or '',
-        'content': item.content,
-        'featured_image': item.featured_image or '',
-        'category_id': item.category_id,
-        'seo_title': item.seo_title or '',
-        'seo_description': item.seo_description or '',
-        'og_image': item.og_image or '',
-        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
-        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
-    }
-
-
-def _create_post_version(item, user, change_note=''):
-    try:
-        latest = PostVersion.objects.filter(post_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        PostVersion.objects.create(
-            post_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_post_snapshot(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
-
-
 def _post_preview_from_post(request, item=None):
     target = item if item is not None else Post()
     target.title = clean_text(request.POST.get('title', ''), 300)
@@ -620,7 +569,8 @@ def _save_post(request, item=None):
         target.published_at = now
 
     target.save()
-    _create_post_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    create_post_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    purge_posts(f'post:{target.id}')
     return target, target, ''
 
 
@@ -700,7 +650,8 @@ def post_clone(request, id):
         updated_at=now,
     )
     cloned.save()
-    _create_post_version(cloned, request.user, change_note='Cloned from existing post')
+    create_post_version(cloned, request.user, change_note='Cloned from existing post')
+    purge_posts()
     messages.success(request, 'Post duplicated.')
     return redirect('admin:post_edit', id=cloned.id)
 
@@ -713,6 +664,7 @@ def post_delete(request, id):
     if item.is_trashed:
         try:
             item.delete()
+            purge_posts(f'post:{id}')
             messages.success(request, 'Post permanently deleted.')
         except Exception:
             messages.error(request, 'Unable to permanently delete post due to related records.')
@@ -722,6 +674,7 @@ def post_delete(request, id):
     item.trashed_at = utc_now_naive()
     item.updated_at = utc_now_naive()
     item.save()
+    purge_posts(f'post:{item.id}')
     messages.success(request, 'Post moved to trash.')
     return redirect('admin:posts')
 
@@ -735,6 +688,7 @@ def post_trash_restore(request, id):
     item.trashed_at = None
     item.updated_at = utc_now_naive()
     item.save()
+    purge_posts(f'post:{item.id}')
     messages.success(request, 'Post restored from trash.')
     return redirect('/admin/posts?trash=1')
 
@@ -769,6 +723,8 @@ def posts_bulk(request):
             messages.error(request, 'Some records could not be permanently deleted and were moved to trash instead.')
     else:
         messages.error(request, 'Unsupported bulk action.')
+        return redirect('admin:posts')
+    purge_posts(*[f'post:{item_id}' for item_id in ids])
     return redirect('admin:posts')
 
 
@@ -789,6 +745,7 @@ def post_autosave(request, id):
     item.scheduled_publish_at = preview.scheduled_publish_at
     item.updated_at = utc_now_naive()
     item.save()
+    purge_posts(f'post:{item.id}')
     return JsonResponse({'ok': True, 'saved_at': item.updated_at.isoformat()})
 
 
@@ -819,46 +776,12 @@ def post_restore(request, id):
         post.published_at = utc_now_naive()
     post.updated_at = utc_now_naive()
     post.save()
-    _create_post_version(post, request.user, change_note=f'Restored version {version.version_number}')
+    create_post_version(post, request.user, change_note=f'Restored version {version.version_number}')
+    purge_posts(f'post:{post.id}')
     messages.success(request, f'Restored post to version {version.version_number}.')
     return redirect('admin:post_edit', id=post.id)
 
 
-def _industry_snapshot(item):
-    return {
-        'title': item.title,
-        'slug': item.slug,
-        'description': item.description,
-        'icon_class': item.icon_class or '',
-        'hero_description': item.hero_description or '',
-        'challenges': item.challenges or '',
-        'solutions': item.solutions or '',
-        'stats': item.stats or '',
-        'sort_order': int(item.sort_order or 0),
-        'seo_title': item.seo_title or '',
-        'seo_description': item.seo_description or '',
-        'og_image': item.og_image or '',
-        'workflow_status': item.workflow_status or WORKFLOW_DRAFT,
-        'scheduled_publish_at': format_datetime_local(item.scheduled_publish_at),
-    }
-
-
-def _create_industry_version(item, user, change_note=''):
-    try:
-        latest = IndustryVersion.objects.filter(industry_id=item.id).order_by('-version_number').first()
-        version_number = (latest.version_number if latest else 0) + 1
-        IndustryVersion.objects.create(
-            industry_id=item.id,
-            version_number=version_number,
-            snapshot_json=json.dumps(_industry_snapshot(item), ensure_ascii=False),
-            change_note=clean_text(change_note, 260),
-            created_by_id=getattr(user, 'id', None),
-            created_at=utc_now_naive(),
-        )
-    except Exception:
-        return
-
-
 def _industry_preview_from_post(request, item=None):
     target = item if item is not None else Industry()
     target.title = clean_text(request.POST.get('title', ''), 200)
@@ -916,7 +839,8 @@ def _save_industry(request, item=None):
         target.published_at = now
 
     target.save()
-    _create_industry_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    create_industry_version(target, request.user, change_note=request.POST.get('change_note', ''))
+    purge_public_content('industries', f'industry:{target.id}')
     return target, target, ''
 
 
@@ -995,7 +919,8 @@ def industry_clone(request, id):
         updated_at=now,
     )
     cloned.save()
-    _create_industry_version(cloned, request.user, change_note='Cloned from existing industry')
+    create_industry_version(cloned, request.user, change_note='Cloned from existing industry')
+    purge_public_content('industries')
     messages.success(request, 'Industry duplicated.')
     return redirect('admin:industry_edit', id=cloned.id)
 
@@ -1008,6 +933,7 @@ def industry_delete(request, id):
     if item.is_trashed:
         try:
             item.delete()
+            purge_public_content('industries', f'industry:{id}')
             messages.success(request, 'Industry permanently deleted.')
         except Exception:
             messages.error(request, 'Unable to permanently delete industry due to related records.')
@@ -1017,6 +943,7 @@ def industry_delete(request, id):
     item.trashed_at = utc_now_naive()
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('industries', f'industry:{item.id}')
     messages.success(request, 'Industry moved to trash.')
     return redirect('admin:industries')
 
@@ -1030,6 +957,7 @@ def industry_trash_restore(request, id):
     item.trashed_at = None
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('industries', f'industry:{item.id}')
     messages.success(request, 'Industry restored from trash.')
     return redirect('/admin/industries?trash=1')
 
@@ -1064,6 +992,8 @@ def industries_bulk(request):
             messages.error(request, 'Some records could not be permanently deleted and were moved to trash instead.')
     else:
         messages.error(request, 'Unsupported bulk action.')
+        return redirect('admin:industries')
+    purge_public_content('industries', *[f'industry:{item_id}' for item_id in ids])
     return redirect('admin:industries')
 
 
@@ -1088,6 +1018,7 @@ def industry_autosave(request, id):
     item.scheduled_publish_at = preview.scheduled_publish_at
     item.updated_at = utc_now_naive()
     item.save()
+    purge_public_content('industries', f'industry:{item.id}')
     return JsonResponse({'ok': True, 'saved_at': item.updated_at.isoformat()})
 
 
@@ -1118,6 +1049,7 @@ def industry_restore(request, id):
     industry.scheduled_publish_at = _parse_datetime_local(snapshot.get('scheduled_publish_at', ''))
     industry.updated_at = utc_now_naive()
     industry.save()
-    _create_industry_version(industry, request.user, change_note=f'Restored version {version.version_number}')
+    create_industry_version(industry, request.user, change_note=f'Restored version {version.version_number}')
+    purge_public_content('industries', f'industry:{industry.id}')
     messages.success(request, f'Restored industry to version {version.version_number}.')
     return redirect('admin:industry_edit', id=industry.id)
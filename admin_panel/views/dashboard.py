@@ -5,29 +5,37 @@ from django.shortcuts import render
 
 from admin_panel.decorators import permission_required
 from admin_panel.models import (
-    AuthRateLimitBucket,
     ContactSubmission,
-    SecurityEvent,
     SupportTicket,
     normalize_ticket_number,
 )
+from admin_panel.stats import admin_stats
 from admin_panel.views.content import workflow_status_label
 from core.constants import (
     SUPPORT_TICKET_STATUS_IN_PROGRESS,
     SUPPORT_TICKET_STATUS_OPEN,
-    SUPPORT_TICKET_STATUS_RESOLVED,
     SUPPORT_TICKET_STATUS_WAITING_CUSTOMER,
     WORKFLOW_APPROVED,
     WORKFLOW_DRAFT,
-    WORKFLOW_PUBLISHED,
     WORKFLOW_REVIEW,
 )
 from core.utils import clean_text, utc_now_naive
-from public.models import CmsPage, ContentBlock, Industry, Post, Service, SiteSetting
+from public.models import Industry, Post, Service, SiteSetting
+from public.search import search
 
 QUOTE_INTAKE_EMAIL = 'quote-intake@rightonrepair.local'
 QUOTE_SUBJECT_PREFIX = 'quote request:'
 QUOTE_DETAILS_PREFIX = 'quote intake submission'
+DASHBOARD_SEARCH_LIMIT = 6
+
+
+def _search_with_slug(queryset, query, limit=DASHBOARD_SEARCH_LIMIT):
+    # Slugs are not in the full-text index; staff often search by them, so slug matches come first.
+    items = list(queryset.filter(slug__icontains=query).order_by('id')[:limit])
+    seen = {item.id for item in items}
+    if len(items) < limit:
+        items += [item for item in search(queryset, query, limit=limit) if item.id not in seen]
+    return items[:limit]
 
 
 def is_quote_ticket(ticket):
@@ -57,8 +65,6 @@ def _empty_search_results():
 @permission_required('dashboard:view')
 def dashboard(request):
     now = utc_now_naive()
-    last_24h = now - timedelta(hours=24)
-    last_7d = now - timedelta(days=7)
     stale_cutoff = now - timedelta(days=14)
     open_ticket_statuses = [
         SUPPORT_TICKET_STATUS_OPEN,
@@ -74,24 +80,6 @@ def dashboard(request):
     search_results = _empty_search_results()
     search_total = 0
 
-    stats = {
-        'services': 0,
-        'industries': 0,
-        'posts': 0,
-        'contacts': 0,
-        'contacts_24h': 0,
-        'support_tickets': 0,
-        'support_waiting': 0,
-        'tickets_24h': 0,
-        'resolved_7d': 0,
-        'critical_open_tickets': 0,
-        'services_missing_profile': 0,
-        'industries_incomplete': 0,
-        'published_posts_missing_excerpt': 0,
-        'security_events_24h': 0,
-        'active_admin_buckets': 0,
-        'missing_setting_keys': 0,
-    }
     health_score = 100
     health_checks = []
     missing_setting_keys = []
@@ -101,47 +89,7 @@ def dashboard(request):
     recent_contacts = []
     recent_tickets = []
 
-    stats['services'] = Service.objects.count()
-    stats['industries'] = Industry.objects.count()
-    stats['posts'] = Post.objects.count()
-    stats['contacts'] = ContactSubmission.objects.filter(is_read=False).count()
-    stats['contacts_24h'] = ContactSubmission.objects.filter(created_at__gte=last_24h).count()
-    stats['support_tickets'] = SupportTicket.objects.filter(status__in=open_ticket_statuses).count()
-    stats['support_waiting'] = SupportTicket.objects.filter(status=SUPPORT_TICKET_STATUS_WAITING_CUSTOMER).count()
-    stats['tickets_24h'] = SupportTicket.objects.filter(created_at__gte=last_24h).count()
-    stats['resolved_7d'] = SupportTicket.objects.filter(
-        status=SUPPORT_TICKET_STATUS_RESOLVED,
-        updated_at__gte=last_7d,
-    ).count()
-    stats['critical_open_tickets'] = SupportTicket.objects.filter(
-        status__in=open_ticket_statuses,
-        priority__in=['high', 'critical'],
-    ).count()
-    stats['services_missing_profile'] = Service.objects.filter(
-        Q(profile_json__isnull=True) | Q(profile_json__exact='')
-    ).count()
-    stats['industries_incomplete'] = Industry.objects.filter(
-        Q(hero_description__isnull=True)
-        | Q(hero_description__exact='')
-        | Q(challenges__isnull=True)
-        | Q(challenges__exact='')
-        | Q(solutions__isnull=True)
-        | Q(solutions__exact='')
-    ).count()
-    stats['published_posts_missing_excerpt'] = Post.objects.filter(
-        workflow_status=WORKFLOW_PUBLISHED
-    ).filter(
-        Q(excerpt__isnull=True) | Q(excerpt__exact='')
-    ).count()
-    stats['security_events_24h'] = SecurityEvent.objects.filter(
-        created_at__gte=last_24h,
-        event_type__in=['turnstile_failed', 'rate_limited'],
-    ).count()
-    stats['active_admin_buckets'] = AuthRateLimitBucket.objects.filter(
-        scope='admin_login',
-        count__gt=0,
-        reset_at__gt=now,
-    ).count()
+    stats = dict(admin_stats())
 
     required_settings = {'company_name', 'email', 'meta_title', 'meta_description'}
     current_settings = {
@@ -218,27 +166,9 @@ def dashboard(request):
         )
 
     if search_query:
-        search_results['services'] = list(
-            Service.objects.filter(
-                Q(title__icontains=search_query)
-                | Q(slug__icontains=search_query)
-                | Q(description__icontains=search_query)
-            ).order_by('sort_order', 'id')[:6]
-        )
-        search_results['industries'] = list(
-            Industry.objects.filter(
-                Q(title__icontains=search_query)
-                | Q(slug__icontains=search_query)
-                | Q(description__icontains=search_query)
-            ).order_by('sort_order', 'id')[:6]
-        )
-        search_results['posts'] = list(
-            Post.objects.filter(
-                Q(title__icontains=search_query)
-                | Q(slug__icontains=search_query)
-                | Q(excerpt__icontains=search_query)
-            ).order_by('-updated_at')[:6]
-        )
+        search_results['services'] = _search_with_slug(Service.objects.all(), search_query)
+        search_results['industries'] = _search_with_slug(Industry.objects.all(), search_query)
+        search_results['posts'] = _search_with_slug(Post.objects.all(), search_query)
         search_results['contacts'] = list(
             ContactSubmission.objects.filter(
                 Q(name__icontains=search_query)
@@ -284,7 +214,7 @@ def dashboard(request):
 
 @permission_required('dashboard:view')
 def control_center(request):
-    now = utc_now_naive()
+    stats = admin_stats()
     website_modules = [
         {
             'title': 'Services',
@@ -292,7 +222,7 @@ def control_center(request):
             'icon': 'fa-solid fa-gear',
             'href': '/admin/services',
             'permission': 'content:manage',
-            'metric': f'{Service.objects.count()} items',
+            'metric': f'{stats["services"]} items',
         },
         {
             'title': 'Industries',
@@ -300,7 +230,7 @@ def control_center(request):
             'icon': 'fa-solid fa-building',
             'href': '/admin/industries',
             'permission': 'content:manage',
-            'metric': f'{Industry.objects.count()} items',
+            'metric': f'{stats["industries"]} items',
         },
         {
             'title': 'Blog Posts',
@@ -308,7 +238,7 @@ def control_center(request):
             'icon': 'fa-solid fa-newspaper',
             'href': '/admin/posts',
             'permission': 'content:manage',
-            'metric': f'{Post.objects.count()} posts',
+            'metric': f'{stats["posts"]} posts',
         },
         {
             'title': 'Media Library',
@@ -343,7 +273,7 @@ def control_center(request):
             'icon': 'fa-solid fa-envelope',
             'href': '/admin/contacts',
             'permission': 'support:manage',
-            'metric': f'{ContactSubmission.objects.filter(is_read=False).count()} unread',
+            'metric': f'{stats["contacts"]} unread',
         },
         {
             'title': 'Support Tickets',
@@ -351,7 +281,7 @@ def control_center(request):
             'icon': 'fa-solid fa-ticket',
             'href': '/admin/support-tickets',
             'permission': 'support:manage',
-            'metric': f'{SupportTicket.objects.count()} total',
+            'metric': f'{stats["tickets_total"]} total',
         },
         {
             'title': 'Security Events',
@@ -359,7 +289,7 @@ def control_center(request):
             'icon': 'fa-solid fa-shield-halved',
             'href': '/admin/security-events',
             'permission': 'security:view',
-            'metric': f'{SecurityEvent.objects.filter(created_at__gte=now - timedelta(hours=24)).count()} / 24h',
+            'metric': f'{stats["security_events_all_24h"]} / 24h',
         },
         {
             'title': 'Settings',
@@ -395,14 +325,6 @@ def control_center(request):
             {'label': 'Headless Hub', 'href': '/admin/headless-hub', 'icon': 'fa-solid fa-cloud-arrow-down'}
         )
 
-    published_pages = CmsPage.objects.filter(is_published=True).count()
-    try:
-        from acp.models import AcpDashboardDocument
-
-        published_dashboards = AcpDashboardDocument.objects.filter(status=WORKFLOW_PUBLISHED).count()
-    except Exception:
-        published_dashboards = 0
-
     return render(
         request,
         'admin/control_center.html',
@@ -413,12 +335,12 @@ def control_center(request):
             'section_stats': {
                 'website_total': len(visible_website_modules),
                 'operations_total': len(visible_operations_modules),
-                'published_pages': published_pages,
-                'published_dashboards': published_dashboards,
+                'published_pages': stats['cms_pages_published'],
+                'published_dashboards': stats['acp_dashboards_published'],
                 'metrics': 0,
                 'mcp_servers': 0,
                 'mcp_operations': 0,
-                'content_blocks': ContentBlock.objects.count(),
+                'content_blocks': stats['content_blocks'],
             },
         },
     )
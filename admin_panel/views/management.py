@@ -1,28 +1,37 @@
 from __future__ import annotations
 
+import json
 import re
 from pathlib import Path
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib import messages
-from django.core.cache import cache
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.text import slugify
 
 from admin_panel.decorators import permission_required
 from admin_panel.models import User
-from core.constants import ROLE_DEFAULT, USER_ROLE_CHOICES, USER_ROLE_LABELS, WORKFLOW_PUBLISHED
+from admin_panel.stats import admin_stats
+from core.cache_namespaces import (
+    NAMESPACE_ADMIN_STATS,
+    NAMESPACE_HEADLESS_SETTINGS,
+    NAMESPACE_SEO,
+    NAMESPACE_SITE_CONTEXT,
+    NAMESPACE_SITEMAP,
+    bump_namespaces,
+)
+from core.constants import ROLE_DEFAULT, USER_ROLE_CHOICES, USER_ROLE_LABELS
+from core.page_cache import purge_tags
 from core.utils import clean_text, utc_now_naive
+from headless.auth import ALL_SCOPES, parse_named_tokens
 from public.models import (
     Category,
     CmsArticle,
     CmsPage,
-    Industry,
     MenuItem,
     Post,
-    Service,
     SiteSetting,
     TeamMember,
     Testimonial,
@@ -50,6 +59,7 @@ HEADLESS_SETTING_KEYS = [
     'headless_delivery_max_limit',
     'headless_delivery_require_token',
     'headless_delivery_token',
+    'headless_delivery_tokens',
     'headless_sync_enabled',
     'headless_sync_token',
     'headless_sync_max_items',
@@ -111,8 +121,8 @@ def _settings_map(keys=None):
     return {key: value for key, value in query.values_list('key', 'value')}
 
 
-def _clear_site_cache():
-    cache.clear()
+def _clear_site_cache(*namespaces):
+    bump_namespaces(*namespaces)
 
 
 def _unique_slug(model, seed, max_length, instance_id=None):
@@ -291,6 +301,7 @@ def _save_testimonial(request, item=None):
         target.is_trashed = False
         target.trashed_at = None
     target.save()
+    purge_tags('testimonials')
     return target, ''
 
 
@@ -325,11 +336,13 @@ def testimonial_delete(request, id):
     item = get_object_or_404(Testimonial, id=id)
     if item.is_trashed:
         item.delete()
+        purge_tags('testimonials')
         messages.success(request, 'Testimonial permanently deleted.')
         return redirect('admin:testimonials')
     item.is_trashed = True
     item.trashed_at = utc_now_naive()
     item.save(update_fields=['is_trashed', 'trashed_at'])
+    purge_tags('testimonials')
     messages.success(request, 'Testimonial moved to trash.')
     return redirect('admin:testimonials')
 
@@ -342,6 +355,7 @@ def testimonial_trash_restore(request, id):
     item.is_trashed = False
     item.trashed_at = None
     item.save(update_fields=['is_trashed', 'trashed_at'])
+    purge_tags('testimonials')
     messages.success(request, 'Testimonial restored.')
     return redirect('/admin/testimonials?trash=1')
 
@@ -365,6 +379,7 @@ def testimonials_bulk(request):
     else:
         query.update(is_trashed=False, trashed_at=None)
         messages.success(request, f'Updated {len(ids)} records.')
+    purge_tags('testimonials')
     return redirect('admin:testimonials')
 
 
@@ -537,7 +552,8 @@ def settings_view(request):
     if request.method == 'POST':
         for key in GENERAL_SETTING_KEYS:
             _set_setting(key, request.POST.get(key, ''))
-        _clear_site_cache()
+        _clear_site_cache(NAMESPACE_SITE_CONTEXT, NAMESPACE_SEO)
+        purge_tags('site_settings')
         messages.success(request, 'Settings updated.')
         return redirect('admin:settings')
     settings_map = _settings_map(GENERAL_SETTING_KEYS)
@@ -564,6 +580,14 @@ def headless_hub(request):
     env_sync_max_items = _safe_int(getattr(settings, 'HEADLESS_SYNC_MAX_ITEMS', 250), 250, 1, 5000)
 
     if request.method == 'POST':
+        # Validated before anything is saved, so a bad value leaves every setting as it was.
+        named_tokens_raw = (request.POST.get('headless_delivery_tokens') or '').strip()
+        clear_named_tokens = bool(request.POST.get('clear_headless_delivery_tokens'))
+        named_tokens = parse_named_tokens(named_tokens_raw) if named_tokens_raw and not clear_named_tokens else []
+        if named_tokens_raw and not clear_named_tokens and not named_tokens:
+            messages.error(request, 'Named tokens must be a JSON list of {"name", "token", "scopes"} objects.')
+            return redirect('admin:headless_hub')
+
         _set_setting(
             'headless_delivery_default_limit',
             str(_safe_int(request.POST.get('headless_delivery_default_limit'), config_default_limit, 1, 500)),
@@ -581,7 +605,14 @@ def headless_hub(request):
             _set_setting('headless_delivery_token', '')
         elif token_value:
             _set_setting('headless_delivery_token', token_value)
-        _clear_site_cache()
+        if clear_named_tokens:
+            _set_setting('headless_delivery_tokens', '')
+        elif named_tokens:
+            _set_setting(
+                'headless_delivery_tokens',
+                json.dumps([{'name': t.name, 'token': t.secret, 'scopes': sorted(t.scopes)} for t in named_tokens]),
+            )
+        _clear_site_cache(NAMESPACE_HEADLESS_SETTINGS)
         messages.success(request, 'Headless settings updated.')
         return redirect('admin:headless_hub')
 
@@ -594,37 +625,32 @@ def headless_hub(request):
     sync_enabled = _bool_like(settings_map.get('headless_sync_enabled')) or env_sync_enabled
     sync_token_configured = bool((settings_map.get('headless_sync_token') or '').strip() or env_sync_token)
     sync_max_items = _safe_int(settings_map.get('headless_sync_max_items'), env_sync_max_items, 1, 5000)
+    named_tokens = [
+        {'name': token.name, 'scopes': sorted(token.scopes)}
+        for token in parse_named_tokens(settings_map.get('headless_delivery_tokens') or '')
+    ]
 
     base = f'{request.scheme}://{request.get_host()}'
     endpoints = [
         {'label': 'Delivery Index', 'path': '/api/delivery', 'url': f'{base}/api/delivery'},
         {'label': 'Headless Export', 'path': '/api/headless/export', 'url': f'{base}/api/headless/export'},
         {'label': 'Headless Sync', 'path': '/api/headless/sync', 'url': f'{base}/api/headless/sync'},
+        {'label': 'Delivery Batch', 'path': '/api/delivery/batch', 'url': f'{base}/api/delivery/batch'},
+        {'label': 'Change Feed', 'path': '/api/delivery/changes', 'url': f'{base}/api/delivery/changes'},
     ]
 
-    try:
-        from acp.models import AcpDashboardDocument, AcpPageDocument
-
-        acp_pages_published = AcpPageDocument.objects.filter(status=WORKFLOW_PUBLISHED).count()
-        acp_dashboards_published = AcpDashboardDocument.objects.filter(status=WORKFLOW_PUBLISHED).count()
-    except Exception:
-        acp_pages_published = 0
-        acp_dashboards_published = 0
-
+    stats = admin_stats()
     counts = {
-        'cms_pages_published': CmsPage.objects.filter(is_published=True).count(),
-        'cms_articles_published': CmsArticle.objects.filter(is_published=True).count(),
-        'services_published': Service.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-            Q(is_trashed=False) | Q(is_trashed__isnull=True)
-        ).count(),
-        'industries_published': Industry.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-            Q(is_trashed=False) | Q(is_trashed__isnull=True)
-        ).count(),
-        'posts_published': Post.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-            Q(is_trashed=False) | Q(is_trashed__isnull=True)
-        ).count(),
-        'acp_pages_published': acp_pages_published,
-        'acp_dashboards_published': acp_dashboards_published,
+        name: stats[name]
+        for name in (
+            'cms_pages_published',
+            'cms_articles_published',
+            'services_published',
+            'industries_published',
+            'posts_published',
+            'acp_pages_published',
+            'acp_dashboards_published',
+        )
     }
     quick_links = [
         {'label': 'Settings', 'href': '/admin/settings'},
@@ -638,7 +664,7 @@ def headless_hub(request):
         request,
         'admin/headless_hub.html',
         {
-            'delivery_auth_warning': require_token and not bool(effective_delivery_token),
+            'delivery_auth_warning': require_token and not (effective_delivery_token or named_tokens),
             'require_token': require_token,
             'effective_delivery_token': effective_delivery_token,
             'default_limit': default_limit,
@@ -646,6 +672,8 @@ def headless_hub(request):
             'sync_enabled': sync_enabled,
             'sync_token_configured': sync_token_configured,
             'sync_max_items': sync_max_items,
+            'named_tokens': named_tokens,
+            'token_scopes': sorted(ALL_SCOPES),
             'config_default_limit': config_default_limit,
             'config_max_limit': config_max_limit,
             'site_delivery_token': site_delivery_token,
@@ -715,6 +743,7 @@ def cms_page_add(request):
                 created_at=now,
                 updated_at=now,
             )
+            _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
             messages.success(request, 'CMS page created.')
             return redirect('admin:cms_pages')
     return render(request, 'admin/cms_page_form.html', {'item': None, 'payload': payload})
@@ -734,6 +763,7 @@ def cms_page_edit(request, id):
             item.is_published = payload['is_published']
             item.updated_at = utc_now_naive()
             item.save(update_fields=['title', 'slug', 'content', 'is_published', 'updated_at'])
+            _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
             messages.success(request, 'CMS page updated.')
             return redirect('admin:cms_page_edit', id=item.id)
     return render(request, 'admin/cms_page_form.html', {'item': item, 'payload': payload})
@@ -744,6 +774,7 @@ def cms_page_delete(request, id):
     if request.method == 'POST':
         item = get_object_or_404(CmsPage, id=id)
         item.delete()
+        _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
         messages.success(request, 'CMS page deleted.')
     return redirect('admin:cms_pages')
 
@@ -774,6 +805,7 @@ def cms_article_add(request):
                 created_at=now,
                 updated_at=now,
             )
+            _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
             messages.success(request, 'CMS article created.')
             return redirect('admin:cms_articles')
     return render(request, 'admin/cms_article_form.html', {'item': None, 'payload': payload})
@@ -811,6 +843,7 @@ def cms_article_edit(request, id):
                     'updated_at',
                 ]
             )
+            _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
             messages.success(request, 'CMS article updated.')
             return redirect('admin:cms_article_edit', id=item.id)
     return render(request, 'admin/cms_article_form.html', {'item': item, 'payload': payload})
@@ -821,6 +854,7 @@ def cms_article_delete(request, id):
     if request.method == 'POST':
         item = get_object_or_404(CmsArticle, id=id)
         item.delete()
+        _clear_site_cache(NAMESPACE_SITEMAP, NAMESPACE_ADMIN_STATS)
         messages.success(request, 'CMS article deleted.')
     return redirect('admin:cms_articles')
 
@@ -6,13 +6,13 @@ from datetime import timedelta
 from io import StringIO
 
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
 from admin_panel.decorators import permission_required
 from admin_panel.models import ContactSubmission, SecurityEvent, SupportTicket, SupportTicketEvent
+from admin_panel.stats import invalidate_admin_stats
 from core.constants import (
     SUPPORT_TICKET_EVENT_ADMIN_UPDATE,
     SUPPORT_TICKET_EVENT_CREATED,
@@ -25,6 +25,8 @@ from core.constants import (
     normalize_support_ticket_status,
     support_ticket_stage_for_status,
 )
+from core.keyset import keyset_page
+from core.metric_rollups import windowed_counts
 from core.utils import clean_text, utc_now_naive
 
 LEAD_STATUS_LABELS = {
@@ -40,34 +42,6 @@ QUOTE_SUBJECT_PREFIX = 'quote request:'
 QUOTE_DETAILS_PREFIX = 'quote intake submission'
 
 
-class PaginationAdapter:
-    def __init__(self, page_obj):
-        self._page = page_obj
-        self.page = page_obj.number
-        self.pages = page_obj.paginator.num_pages
-        self.total = page_obj.paginator.count
-
-    @property
-    def items(self):
-        return list(self._page.object_list)
-
-    @property
-    def has_prev(self):
-        return self._page.has_previous()
-
-    @property
-    def has_next(self):
-        return self._page.has_next()
-
-    @property
-    def prev_num(self):
-        return self._page.previous_page_number() if self.has_prev else None
-
-    @property
-    def next_num(self):
-        return self._page.next_page_number() if self.has_next else None
-
-
 def _coerce_ids(values):
     if not values:
         return []
@@ -155,15 +129,18 @@ def format_datetime_local(value):
 @permission_required('support:manage')
 def contacts(request):
     status_filter = clean_text(request.GET.get('status', ''), 30)
-    query = ContactSubmission.objects.order_by('-created_at', '-id')
+    query = ContactSubmission.objects.all()
     if status_filter in LEAD_STATUS_LABELS:
         query = query.filter(lead_status=status_filter)
-    items = list(query[:500])
+    pager = keyset_page(query, request.GET.get('cursor', ''), per_page=100, field='created_at', with_total=True)
     return render(
         request,
         'admin/contacts.html',
         {
-            'items': items,
+            'items': pager.items,
+            'pager': pager,
+            'pager_endpoint': 'admin.contacts',
+            'pager_params': {'status': status_filter or None},
             'lead_statuses': LEAD_STATUS_LABELS,
             'lead_status_labels': LEAD_STATUS_LABELS,
             'bulk_url': '/admin/contacts/bulk',
@@ -196,6 +173,7 @@ def contact_status_update(request, id):
     item.lead_notes = request.POST.get('lead_notes', '')
     item.is_read = True
     item.save(update_fields=['lead_status', 'lead_notes', 'is_read'])
+    invalidate_admin_stats()
     messages.success(request, 'Lead status updated.')
     return redirect('admin:contact_view', id=item.id)
 
@@ -206,6 +184,7 @@ def contact_delete(request, id):
         return redirect('admin:contacts')
     item = get_object_or_404(ContactSubmission, id=id)
     item.delete()
+    invalidate_admin_stats()
     messages.success(request, 'Contact submission deleted.')
     return redirect('admin:contacts')
 
@@ -235,6 +214,8 @@ def contacts_bulk(request):
         messages.success(request, f'Deleted {deleted} contact records.')
     else:
         messages.error(request, 'Unsupported bulk action.')
+        return redirect('admin:contacts')
+    invalidate_admin_stats()
     return redirect('admin:contacts')
 
 
@@ -295,7 +276,7 @@ def support_tickets(request):
     type_filter = clean_text(request.GET.get('type', 'all'), 20).lower() or 'all'
     search_query = clean_text(request.GET.get('q', ''), 120)
 
-    query = SupportTicket.objects.select_related('client').order_by('-updated_at', '-id')
+    query = SupportTicket.objects.select_related('client')
 
     if status_filter:
         query = query.filter(status=normalize_support_ticket_status(status_filter))
@@ -323,19 +304,21 @@ def support_tickets(request):
             | Q(client__email__icontains=search_query)
         )
 
-    page_num = request.GET.get('page', '1')
-    try:
-        page_num = max(1, min(int(page_num), 1000))
-    except (TypeError, ValueError):
-        page_num = 1
-    paginator = Paginator(query, 50)
-    items = PaginationAdapter(paginator.get_page(page_num))
+    pager = keyset_page(query, request.GET.get('cursor', ''), per_page=50, field='updated_at', with_total=True)
 
     return render(
         request,
         'admin/support_tickets.html',
         {
-            'items': items.items,
+            'items': pager.items,
+            'pager': pager,
+            'pager_endpoint': 'admin.support_tickets',
+            'pager_params': {
+                'stage': stage_filter or None,
+                'status': status_filter or None,
+                'type': type_filter,
+                'q': search_query or None,
+            },
             'stage_filter': stage_filter,
             'status_filter': status_filter,
             'type_filter': type_filter,
@@ -367,6 +350,7 @@ def _create_ticket_event(ticket, request, *, event_type, message='', status_from
         metadata_json=json.dumps({'path': request.path}, ensure_ascii=False),
         created_at=now,
     )
+    invalidate_admin_stats()
 
 
 @permission_required('support:manage')
@@ -450,13 +434,8 @@ def security_events(request):
     event_type_filter = clean_text(request.GET.get('event_type', 'all'), 40) or 'all'
     scope_filter = clean_text(request.GET.get('scope', 'all'), 80) or 'all'
     search = clean_text(request.GET.get('q', ''), 120)
-    page_num = request.GET.get('page', '1')
-    try:
-        page_num = max(1, min(int(page_num), 1000))
-    except (TypeError, ValueError):
-        page_num = 1
 
-    query = SecurityEvent.objects.order_by('-created_at', '-id')
+    query = SecurityEvent.objects.all()
     if event_type_filter != 'all':
         query = query.filter(event_type=event_type_filter)
     if scope_filter != 'all':
@@ -469,23 +448,26 @@ def security_events(request):
             | Q(user_agent__icontains=search)
         )
 
-    paginator = Paginator(query, 25)
-    items = PaginationAdapter(paginator.get_page(page_num))
+    pager = keyset_page(query, request.GET.get('cursor', ''), per_page=25, field='created_at', with_total=True)
 
-    now = utc_now_naive()
-    since = now - timedelta(hours=24)
-    recent = SecurityEvent.objects.filter(created_at__gte=since)
+    try:
+        recent = windowed_counts('security_events', utc_now_naive() - timedelta(hours=24))
+    except Exception:
+        recent = {}
     stats = {
-        'last_24h': recent.count(),
-        'turnstile_failed_24h': recent.filter(event_type='turnstile_failed').count(),
-        'rate_limited_24h': recent.filter(event_type='rate_limited').count(),
+        'last_24h': sum(recent.values()),
+        'turnstile_failed_24h': recent.get('turnstile_failed', 0),
+        'rate_limited_24h': recent.get('rate_limited', 0),
     }
 
     return render(
         request,
         'admin/security_events.html',
         {
-            'items': items,
+            'items': pager.items,
+            'pager': pager,
+            'pager_endpoint': 'admin.security_events',
+            'pager_params': {'event_type': event_type_filter, 'scope': scope_filter, 'q': search or None},
             'stats': stats,
             'event_type_filter': event_type_filter,
             'scope_filter': scope_filter,
@@ -7,13 +7,17 @@ from django.middleware.csrf import get_token
 from django.templatetags.static import static
 from django.urls import NoReverseMatch, reverse
 from django.utils.safestring import mark_safe
-from jinja2 import Environment, pass_context
+from jinja2 import Environment, Template, pass_context
+
+from core.context_processors import begin_globals_tracking, end_globals_tracking
 
 _ENDPOINT_MAP = {
     'main.index': 'public:index',
     'main.about': 'public:about',
     'main.services': 'public:services',
     'main.blog': 'public:blog',
+    'main.blog_feed': 'public:blog_feed',
+    'main.blog_atom': 'public:blog_atom',
     'main.contact': 'public:contact',
     'main.request_quote': 'public:request_quote',
     'main.request_quote_personal': 'public:request_quote_personal',
@@ -158,8 +162,21 @@ def flash_adapter(context, with_categories: bool = False):
     return [msg for _, msg in queued]
 
 
+class GlobalsTrackingTemplate(Template):
+    """Records which lazy site-context globals each top-level render reads."""
+
+    def render(self, *args, **kwargs):
+        context = args[0] if args and isinstance(args[0], dict) else kwargs
+        token = begin_globals_tracking()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            end_globals_tracking(token, self.name, context.get('request'))
+
+
 def environment(**options):
     env = Environment(**options)
+    env.template_class = GlobalsTrackingTemplate
     env.globals.update(
         {
             'url_for': url_for_adapter,
@@ -141,8 +141,13 @@ CACHES = {
 }
 SITE_CONTEXT_CACHE_VERSION = os.environ.get('SITE_CONTEXT_CACHE_VERSION', 'v1').strip() or 'v1'
 SITE_CONTEXT_CACHE_TTL = int(os.environ.get('SITE_CONTEXT_CACHE_TTL', '120'))
+SITE_CONTEXT_L1_TTL = int(os.environ.get('SITE_CONTEXT_L1_TTL', '10'))
+SITE_CONTEXT_L1_VERSION_CHECK_SECONDS = float(os.environ.get('SITE_CONTEXT_L1_VERSION_CHECK_SECONDS', '2'))
 SEO_CACHE_VERSION = os.environ.get('SEO_CACHE_VERSION', 'v1').strip() or 'v1'
 SEO_CACHE_TTL = int(os.environ.get('SEO_CACHE_TTL', '900'))
+SERVICE_PROFILE_CACHE_VERSION = os.environ.get('SERVICE_PROFILE_CACHE_VERSION', 'v1').strip() or 'v1'
+PUBLIC_PAGE_CACHE_VERSION = os.environ.get('PUBLIC_PAGE_CACHE_VERSION', 'v1').strip() or 'v1'
+PUBLIC_PAGE_CACHE_TTL = int(os.environ.get('PUBLIC_PAGE_CACHE_TTL', '120'))
 
 CSRF_COOKIE_HTTPONLY = True
 SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
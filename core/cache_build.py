@@ -0,0 +1,144 @@
+"""
+Stampede-safe read-through caching.
+
+``get_or_build`` wraps the usual check-miss-build-set pattern:
+
+* Only one caller per key rebuilds at a time (a short ``cache.add`` lock);
+  concurrent callers keep serving the previous value while it is rebuilt.
+* Values are kept past their TTL for a grace period so an expired entry can
+  still be served stale during the rebuild.
+* Each caller may refresh slightly before expiry with a probability that rises
+  as expiry approaches (scaled by how long the last build took), which spreads
+  rebuilds out instead of lining them all up on the TTL boundary.
+
+Usage:
+    from core.cache_build import get_or_build
+
+    body = get_or_build(cache_key, _build_body, ttl=900, name='sitemap')
+"""
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+STATS_FLUSH_SECONDS = 60
+LOCK_TIMEOUT_SECONDS = 30
+MISS_WAIT_SECONDS = 2.0
+MISS_POLL_SECONDS = 0.05
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed_at = time.monotonic()
+
+
+def _stats_key(name: str, event: str) -> str:
+    return f'cache-build-stats:{name}:{event}'
+
+
+def _flush_stats() -> None:
+    global _stats_flushed_at
+    with _stats_lock:
+        pending = dict(_stats)
+        _stats.clear()
+        _stats_flushed_at = time.monotonic()
+    for (name, event), count in pending.items():
+        key = _stats_key(name, event)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            if not cache.add(key, count, None):
+                cache.incr(key, count)
+        except Exception:
+            continue
+
+
+def _record(name: str, event: str) -> None:
+    with _stats_lock:
+        _stats[(name, event)] += 1
+        due = time.monotonic() - _stats_flushed_at >= STATS_FLUSH_SECONDS
+    if due:
+        _flush_stats()
+
+
+def cache_build_stats(names) -> dict:
+    """Return ``{name: {'hit': n, 'stale': n, 'miss': n, 'rebuild': n}}`` across all workers."""
+    _flush_stats()
+    events = ('hit', 'stale', 'miss', 'rebuild')
+    keys = {_stats_key(name, event): (name, event) for name in names for event in events}
+    found = cache.get_many(list(keys))
+    result = {name: dict.fromkeys(events, 0) for name in names}
+    for key, (name, event) in keys.items():
+        result[name][event] = int(found.get(key) or 0)
+    return result
+
+
+def _is_fresh(envelope: dict, now: float, beta: float) -> bool:
+    expires_at = envelope.get('expires_at', 0)
+    delta = max(envelope.get('delta', 0.0), 0.001)
+    # Probabilistic early expiration: -log(U) is an exponential draw, so callers
+    # occasionally treat the value as expired shortly before its real deadline.
+    return now - delta * beta * math.log(1.0 - random.random()) < expires_at
+
+
+def _build(key: str, builder, ttl: int, stale_ttl: int, name: str):
+    started = time.monotonic()
+    value = builder()
+    delta = time.monotonic() - started
+    envelope = {'value': value, 'expires_at': time.time() + ttl, 'delta': delta}
+    try:
+        cache.set(key, envelope, ttl + stale_ttl)
+    except Exception:
+        pass
+    _record(name, 'rebuild')
+    return value
+
+
+def get_or_build(key: str, builder, ttl: int, *, name: str = '', stale_ttl: int | None = None, beta: float = 1.0):
+    """
+    Return the cached value for *key*, calling *builder* to produce it when
+    missing or due for refresh.  *stale_ttl* (default: *ttl*) is how long an
+    expired value may still be served while another caller rebuilds it.
+    """
+    name = name or key
+    stale_ttl = ttl if stale_ttl is None else max(0, int(stale_ttl))
+    lock_key = f'{key}:build-lock'
+
+    try:
+        envelope = cache.get(key)
+    except Exception:
+        envelope = None
+    if not isinstance(envelope, dict) or 'value' not in envelope:
+        envelope = None
+
+    if envelope is not None:
+        if _is_fresh(envelope, time.time(), beta):
+            _record(name, 'hit')
+            return envelope['value']
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT_SECONDS):
+            _record(name, 'stale')
+            return envelope['value']
+        try:
+            return _build(key, builder, ttl, stale_ttl, name)
+        finally:
+            cache.delete(lock_key)
+
+    _record(name, 'miss')
+    if cache.add(lock_key, 1, LOCK_TIMEOUT_SECONDS):
+        try:
+            return _build(key, builder, ttl, stale_ttl, name)
+        finally:
+            cache.delete(lock_key)
+
+    # Someone else is building a cold key: wait briefly for their result.
+    deadline = time.monotonic() + MISS_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(MISS_POLL_SECONDS)
+        envelope = cache.get(key)
+        if isinstance(envelope, dict) and 'value' in envelope:
+            return envelope['value']
+    return _build(key, builder, ttl, stale_ttl, name)
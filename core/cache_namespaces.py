@@ -0,0 +1,99 @@
+"""
+Generation counters for cache namespaces.
+
+Every registered namespace owns a single counter key. Readers fold the current
+generation into the keys they build, so bumping a namespace retires all of its
+entries at once without touching any other namespace (rate-limit counters
+survive a settings save, for example). Retired entries simply age out via
+their own TTLs.
+
+Usage:
+    from core.cache_namespaces import bump_namespaces, namespaced_key
+
+    cache_key = namespaced_key('seo', f'sitemap:{host}')
+    ...
+    bump_namespaces('seo')
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from django.core.cache import cache
+
+NAMESPACE_SITE_CONTEXT = 'site-context'
+NAMESPACE_SEO = 'seo'
+NAMESPACE_HEADLESS_SETTINGS = 'headless:site_setting'
+NAMESPACE_RATE_LIMIT = 'ratelimit'
+NAMESPACE_SLUG_INDEX = 'slug-index'
+NAMESPACE_RELATED_SERVICES = 'related-services'
+NAMESPACE_RELATED_POSTS = 'related-posts'
+NAMESPACE_SITEMAP = 'sitemap'
+NAMESPACE_DELIVERY = 'delivery'
+NAMESPACE_ADMIN_STATS = 'admin-stats'
+
+CACHE_NAMESPACES = (
+    NAMESPACE_SITE_CONTEXT,
+    NAMESPACE_SEO,
+    NAMESPACE_HEADLESS_SETTINGS,
+    NAMESPACE_RATE_LIMIT,
+    NAMESPACE_SLUG_INDEX,
+    NAMESPACE_RELATED_SERVICES,
+    NAMESPACE_RELATED_POSTS,
+    NAMESPACE_SITEMAP,
+    NAMESPACE_DELIVERY,
+    NAMESPACE_ADMIN_STATS,
+)
+
+# Per-process copies of generations: {namespace: (generation, fetched_at)}.
+_local_generations = {}
+_local_lock = threading.Lock()
+
+
+def _generation_key(namespace: str) -> str:
+    return f'cache-ns:{namespace}'
+
+
+def _check_namespace(namespace: str) -> None:
+    if namespace not in CACHE_NAMESPACES:
+        raise ValueError(f'Unknown cache namespace: {namespace}')
+
+
+def namespace_generation(namespace: str, max_age: float = 0) -> int:
+    """
+    Return the current generation of *namespace*, creating it on first use.
+    With *max_age*, a per-process copy up to that many seconds old is returned
+    without touching the cache backend.
+    """
+    _check_namespace(namespace)
+    if max_age > 0:
+        local = _local_generations.get(namespace)
+        if local is not None and time.monotonic() - local[1] < max_age:
+            return local[0]
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses a retired generation.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key, 0)
+    with _local_lock:
+        _local_generations[namespace] = (generation, time.monotonic())
+    return generation
+
+
+def namespaced_key(namespace: str, key: str) -> str:
+    """Build a cache key that is retired whenever *namespace* is bumped."""
+    return f'{namespace}:{namespace_generation(namespace)}:{key}'
+
+
+def bump_namespaces(*namespaces: str) -> None:
+    """Retire every entry in the given namespaces."""
+    for namespace in dict.fromkeys(namespaces):
+        _check_namespace(namespace)
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+        with _local_lock:
+            _local_generations.pop(namespace, None)
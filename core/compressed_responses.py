@@ -0,0 +1,160 @@
+"""
+Pre-compressed responses with strong validators.
+
+A response body is turned into a small "variants" dict: the identity bytes,
+optional gzip/brotli encodings, a strong ETag derived from the content hash and
+an optional Last-Modified timestamp. Cached variants are compressed once at
+build time at maximum quality; uncached ones are compressed lazily at a fast
+level (they are encoded on every request), and only after the conditional
+check, so revalidations never pay for compression.
+
+Usage:
+    variants = cached_response_variants(key, lambda: build_body().encode(), ttl, content_type='text/plain')
+    return variant_response(request, variants)
+"""
+from __future__ import annotations
+
+import calendar
+import gzip
+import hashlib
+from datetime import datetime
+
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from core.cache_build import get_or_build
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bodies below this size are not worth a Content-Encoding header.
+MIN_COMPRESS_SIZE = 256
+# (brotli quality, gzip level): once per cached build vs. on every request.
+PRECOMPRESS_LEVELS = (11, 9)
+LAZY_COMPRESS_LEVELS = (5, 6)
+
+
+def http_timestamp(value):
+    """Unix timestamp for a datetime (naive values are UTC, as stored), else ``None``."""
+    if not isinstance(value, datetime):
+        return None
+    if timezone.is_aware(value):
+        return int(value.timestamp())
+    return calendar.timegm(value.timetuple())
+
+
+def _compress(body, encoding, levels=PRECOMPRESS_LEVELS):
+    brotli_quality, gzip_level = levels
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality) if brotli is not None else None
+    if encoding == 'gzip':
+        # mtime=0 keeps the output (and so any cache built on it) deterministic.
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return None
+
+
+def _supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def response_variants(body, content_type, *, last_modified=None, precompress=True):
+    """Return the variants dict for *body* (bytes); *last_modified* is a Unix timestamp."""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    variants = {
+        'body': body,
+        'content_type': content_type,
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'last_modified': int(last_modified) if last_modified is not None else None,
+        'encodings': {},
+        'precompressed': bool(precompress),
+    }
+    if precompress and len(body) >= MIN_COMPRESS_SIZE:
+        for encoding in _supported_encodings():
+            compressed = _compress(body, encoding)
+            if compressed is not None and len(compressed) < len(body):
+                variants['encodings'][encoding] = compressed
+    return variants
+
+
+def cached_response_variants(key, build_body, ttl, *, content_type, last_modified=None, name=''):
+    """Read-through cache of precompressed variants for the body returned by *build_body*."""
+    return get_or_build(
+        key,
+        lambda: response_variants(build_body(), content_type, last_modified=last_modified),
+        ttl,
+        name=name,
+    )
+
+
+def _accepted_encodings(request):
+    accepted = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def negotiate_encoding(request, variants=None, *, encodings=None):
+    """
+    The best of *encodings* (default: every supported one) that *request*
+    accepts, or ``None``. With *variants*, small bodies are never encoded and
+    precompressed variants only offer the encodings they hold.
+    """
+    if variants is not None and len(variants['body']) < MIN_COMPRESS_SIZE:
+        return None
+    accepted = _accepted_encodings(request)
+    for encoding in encodings or _supported_encodings():
+        if variants is not None and variants.get('precompressed') and encoding not in variants['encodings']:
+            continue
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def variant_response(request, variants, *, status=200):
+    """
+    Serve *variants* for *request*: 304 when the client's validators match,
+    otherwise the best encoding the client accepts. Always sets a strong
+    ``ETag`` (per encoding) and ``Vary: Accept-Encoding``.
+    """
+    encoding = negotiate_encoding(request, variants)
+    etag = f'"{variants["etag"]}-{encoding}"' if encoding else f'"{variants["etag"]}"'
+    last_modified = variants.get('last_modified')
+
+    response = None
+    if status == 200:
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        body = variants['body']
+        if encoding:
+            encoded = variants['encodings'].get(encoding) or _compress(body, encoding, LAZY_COMPRESS_LEVELS)
+            if encoded is not None and len(encoded) < len(body):
+                body = encoded
+            else:
+                encoding = None
+                etag = f'"{variants["etag"]}"'
+        response = HttpResponse(body, content_type=variants['content_type'], status=status)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(body))
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
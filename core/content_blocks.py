@@ -0,0 +1,125 @@
+"""
+Batched, memoized loader for ``ContentBlock`` JSON.
+
+``load_page_content`` resolves several pages with one ``page__in`` query, keeps
+the parsed result on the request for the rest of that request, and caches the
+parsed sections across requests under a key derived from each block's
+``updated_at`` — an edit produces a new key, so nothing needs invalidating.
+
+Returned data is read-only (``ReadOnlyDict``/``ReadOnlyList``); call ``.copy()``
+or build a new dict before changing anything.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from public.models import ContentBlock
+
+CONTENT_CACHE_TTL = 24 * 60 * 60
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError('Content block data is read-only; copy it before modifying.')
+
+
+class ReadOnlyDict(dict):
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (ReadOnlyDict, (dict(self),))
+
+
+class ReadOnlyList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def copy(self):
+        return list(self)
+
+    def __reduce__(self):
+        return (ReadOnlyList, (list(self),))
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return ReadOnlyList(freeze(item) for item in value)
+    return value
+
+
+def _parse(raw):
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+
+def _cache_key(page, stamps):
+    signature = '|'.join(f'{block_id}:{section}:{updated_at}' for block_id, section, updated_at in sorted(stamps))
+    digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+    return f'content-blocks:{page}:{digest}'
+
+
+def _load_from_db(pages):
+    stamps = defaultdict(list)
+    for block_id, page, section, updated_at in ContentBlock.objects.filter(page__in=pages).values_list(
+        'id', 'page', 'section', 'updated_at'
+    ):
+        stamps[page].append((block_id, section, updated_at.isoformat() if updated_at else ''))
+
+    keys = {page: _cache_key(page, stamps[page]) for page in pages}
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception:
+        cached = {}
+
+    result = {}
+    stale = []
+    for page, key in keys.items():
+        if not stamps[page]:
+            result[page] = ReadOnlyDict()
+        elif isinstance(cached.get(key), ReadOnlyDict):
+            result[page] = cached[key]
+        else:
+            stale.append(page)
+
+    if stale:
+        parsed = defaultdict(dict)
+        for page, section, content in ContentBlock.objects.filter(page__in=stale).values_list(
+            'page', 'section', 'content'
+        ):
+            parsed[page][section] = _parse(content)
+        for page in stale:
+            result[page] = freeze(parsed[page])
+            try:
+                cache.set(keys[page], result[page], CONTENT_CACHE_TTL)
+            except Exception:
+                pass
+    return result
+
+
+def load_page_content(pages, request=None):
+    """Return ``{page: {section: data}}`` for every name in *pages*."""
+    pages = list(dict.fromkeys(pages))
+    memo = getattr(request, '_page_content', None) if request is not None else None
+    if request is not None and memo is None:
+        memo = {}
+        request._page_content = memo
+
+    result = {page: memo[page] for page in pages if memo and page in memo}
+    missing = [page for page in pages if page not in result]
+    if missing:
+        loaded = _load_from_db(missing)
+        result.update(loaded)
+        if memo is not None:
+            memo.update(loaded)
+    return result
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import re
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from functools import cache as memoize
 from types import SimpleNamespace
 
 from django.conf import settings
-from django.core.cache import cache
 from django.db.models import Q
 from django.middleware.csrf import get_token
+from django.utils.functional import SimpleLazyObject
 from django.utils.safestring import mark_safe
 
+from core.cache_build import get_or_build
+from core.cache_namespaces import NAMESPACE_SITE_CONTEXT, namespaced_key
 from core.constants import ORANGE_COUNTY_CA_CITIES, USER_ROLE_LABELS, WORKFLOW_PUBLISHED
+from core.local_cache import LocalCache
 from core.utils import get_page_content
 from public.models import Industry, Service, SiteSetting
 
@@ -40,6 +47,13 @@ DEFAULT_SITE_SETTINGS = {
 CONTEXT_CACHE_VERSION = str(getattr(settings, 'SITE_CONTEXT_CACHE_VERSION', 'v1'))
 CONTEXT_CACHE_TTL = max(30, int(getattr(settings, 'SITE_CONTEXT_CACHE_TTL', 120)))
 
+_context_l1 = LocalCache(
+    NAMESPACE_SITE_CONTEXT,
+    ttl=getattr(settings, 'SITE_CONTEXT_L1_TTL', 10),
+    max_entries=8,
+    version_check_seconds=getattr(settings, 'SITE_CONTEXT_L1_VERSION_CHECK_SECONDS', 2),
+)
+
 
 def normalize_icon_class(icon_class, fallback='fa-solid fa-circle'):
     fallback = fallback if ICON_CLASS_RE.match(fallback) else 'fa-solid fa-circle'
@@ -66,7 +80,10 @@ def normalize_icon_class(icon_class, fallback='fa-solid fa-circle'):
 
 def normalize_icon_attr(items, fallback):
     for item in items:
-        item.icon_class = normalize_icon_class(getattr(item, 'icon_class', ''), fallback)
+        icon_class = getattr(item, 'icon_class', '')
+        normalized = normalize_icon_class(icon_class, fallback)
+        if normalized != icon_class:
+            item.icon_class = normalized
     return items
 
 
@@ -78,15 +95,10 @@ def _public_base_url(request):
 
 
 def _context_cache_key(key):
-    return f'site-context:{CONTEXT_CACHE_VERSION}:{key}'
-
+    return namespaced_key(NAMESPACE_SITE_CONTEXT, f'{CONTEXT_CACHE_VERSION}:{key}')
 
-def _get_site_settings():
-    cache_key = _context_cache_key('site_settings')
-    cached = cache.get(cache_key)
-    if isinstance(cached, dict) and cached:
-        return dict(cached)
 
+def _build_site_settings():
     settings_dict = dict(DEFAULT_SITE_SETTINGS)
     try:
         rows = SiteSetting.objects.only('key', 'value')
@@ -94,10 +106,25 @@ def _get_site_settings():
             settings_dict[row.key] = row.value
     except Exception:
         pass
-    cache.set(cache_key, settings_dict, CONTEXT_CACHE_TTL)
     return settings_dict
 
 
+def _load_site_settings():
+    cached = get_or_build(
+        _context_cache_key('site_settings'),
+        _build_site_settings,
+        CONTEXT_CACHE_TTL,
+        name='site_settings',
+    )
+    if isinstance(cached, dict) and cached:
+        return cached
+    return dict(DEFAULT_SITE_SETTINGS)
+
+
+def _get_site_settings():
+    return dict(_context_l1.get('site_settings', _load_site_settings))
+
+
 def _serialize_nav_items(items):
     return [
         {
@@ -115,16 +142,7 @@ def _deserialize_nav_items(items):
     return [SimpleNamespace(**item) for item in items if isinstance(item, dict)]
 
 
-def _get_navigation_items():
-    cache_key = _context_cache_key('navigation')
-    cached = cache.get(cache_key)
-    if isinstance(cached, dict):
-        return (
-            _deserialize_nav_items(cached.get('nav_professional', [])),
-            _deserialize_nav_items(cached.get('nav_repair', [])),
-            _deserialize_nav_items(cached.get('nav_industries', [])),
-        )
-
+def _build_navigation_items():
     service_base = (
         Service.objects.filter(Q(is_trashed=False) | Q(is_trashed__isnull=True))
         .only('id', 'slug', 'title', 'description', 'icon_class', 'service_type', 'workflow_status', 'sort_order')
@@ -174,39 +192,121 @@ def _get_navigation_items():
     nav_repair = normalize_icon_attr(nav_repair, 'fa-solid fa-wrench')
     nav_industries = normalize_icon_attr(nav_industries, 'fa-solid fa-building')
 
-    cache.set(
-        cache_key,
-        {
-            'nav_professional': _serialize_nav_items(nav_professional),
-            'nav_repair': _serialize_nav_items(nav_repair),
-            'nav_industries': _serialize_nav_items(nav_industries),
-        },
+    return {
+        'nav_professional': _serialize_nav_items(nav_professional),
+        'nav_repair': _serialize_nav_items(nav_repair),
+        'nav_industries': _serialize_nav_items(nav_industries),
+    }
+
+
+def _load_navigation_items():
+    cached = get_or_build(
+        _context_cache_key('navigation'),
+        _build_navigation_items,
         CONTEXT_CACHE_TTL,
+        name='navigation',
+    )
+    if not isinstance(cached, dict):
+        cached = {}
+    return (
+        _deserialize_nav_items(cached.get('nav_professional', [])),
+        _deserialize_nav_items(cached.get('nav_repair', [])),
+        _deserialize_nav_items(cached.get('nav_industries', [])),
     )
-    return nav_professional, nav_repair, nav_industries
 
 
-def _get_footer_content():
-    cache_key = _context_cache_key('footer_content')
-    cached = cache.get(cache_key)
-    if isinstance(cached, dict):
-        return cached
+def _get_navigation_items():
+    return _context_l1.get('navigation', _load_navigation_items)
 
+
+def _build_footer_content(request=None):
     try:
-        footer_content = get_page_content('footer')
+        footer_content = get_page_content('footer', request=request)
     except Exception:
         footer_content = {}
-    if not isinstance(footer_content, dict):
-        footer_content = {}
+    footer_content = dict(footer_content) if isinstance(footer_content, dict) else {}
     service_area = footer_content.get('service_area', {})
     if not isinstance(service_area, dict):
         service_area = {}
-    service_area['cities'] = list(ORANGE_COUNTY_CA_CITIES)
-    footer_content['service_area'] = service_area
-    cache.set(cache_key, footer_content, CONTEXT_CACHE_TTL)
+    footer_content['service_area'] = {**service_area, 'cities': list(ORANGE_COUNTY_CA_CITIES)}
     return footer_content
 
 
+def _load_footer_content(request=None):
+    cached = get_or_build(
+        _context_cache_key('footer_content'),
+        lambda: _build_footer_content(request),
+        CONTEXT_CACHE_TTL,
+        name='footer_content',
+    )
+    return cached if isinstance(cached, dict) else {}
+
+
+def _get_footer_content(request=None):
+    return _context_l1.get('footer_content', lambda: _load_footer_content(request))
+
+
+# Names of lazy globals evaluated by the template currently rendering.
+_used_globals = ContextVar('site_context_used_globals', default=None)
+_globals_report = {}
+_globals_report_lock = threading.Lock()
+
+
+class _LazyGlobal(SimpleLazyObject):
+    """Lazily evaluated context value that records its first use during a render."""
+
+    def __init__(self, name, func):
+        self.__dict__['_global_name'] = name
+        super().__init__(func)
+
+    def _setup(self):
+        used = _used_globals.get()
+        if used is not None:
+            used.add(self._global_name)
+        super()._setup()
+
+
+def begin_globals_tracking():
+    return _used_globals.set(set())
+
+
+def end_globals_tracking(token, template_name, request=None):
+    """Record which lazy globals the finished render touched."""
+    used = _used_globals.get() or set()
+    _used_globals.reset(token)
+    template_name = template_name or '<string>'
+    with _globals_report_lock:
+        counts = _globals_report.setdefault(template_name, Counter())
+        counts['_renders'] += 1
+        counts.update(used)
+    if request is not None:
+        per_request = getattr(request, 'template_globals_used', None)
+        if per_request is None:
+            per_request = {}
+            request.template_globals_used = per_request
+        per_request[template_name] = sorted(used)
+
+
+def globals_usage_report():
+    """Return ``{template: {'_renders': n, global_name: renders_using_it}}`` for this process."""
+    with _globals_report_lock:
+        return {name: dict(counts) for name, counts in _globals_report.items()}
+
+
+def _safe_navigation_items():
+    try:
+        return _get_navigation_items()
+    except Exception:
+        return [], [], []
+
+
+def _theme_mode(settings_dict):
+    theme_mode = (settings_dict.get('theme_mode') or 'light').strip().lower()
+    if theme_mode not in {'dark', 'light'}:
+        theme_mode = 'light'
+    return theme_mode
+
+
 def _set_request_compat_attrs(request):
     resolver = getattr(request, 'resolver_match', None)
     endpoint = ''
@@ -220,44 +320,39 @@ def _set_request_compat_attrs(request):
             endpoint = f'{namespace}.{resolver.url_name}'
 
     request.endpoint = endpoint
-    request.base_url = request.build_absolute_uri(request.path)
-    request.url = request.build_absolute_uri()
+    request.base_url = _LazyGlobal('request.base_url', lambda: request.build_absolute_uri(request.path))
+    request.url = _LazyGlobal('request.url', request.build_absolute_uri)
 
 
 def globals_context(request):
+    # Everything that touches the cache or database is lazy, so renders that
+    # never show public chrome (admin, error pages) skip that work.
     _set_request_compat_attrs(request)
-    settings_dict = _get_site_settings()
-
-    try:
-        nav_professional, nav_repair, nav_industries = _get_navigation_items()
-    except Exception:
-        nav_professional, nav_repair, nav_industries = [], [], []
-
-    footer_content = _get_footer_content()
+    settings_dict = memoize(_get_site_settings)
+    navigation = memoize(_safe_navigation_items)
 
     def csrf_input_func():
         token = get_token(request)
         return mark_safe(f'<input type="hidden" name="csrfmiddlewaretoken" value="{token}">')
 
-    theme_mode = (settings_dict.get('theme_mode') or 'light').strip().lower()
-    if theme_mode not in {'dark', 'light'}:
-        theme_mode = 'light'
-
     return {
-        'site_settings': settings_dict,
+        'site_settings': _LazyGlobal('site_settings', settings_dict),
         'csp_nonce': getattr(request, 'csp_nonce', ''),
-        'asset_v': settings_dict.get('asset_version', ''),
+        'asset_v': _LazyGlobal('asset_v', lambda: settings_dict().get('asset_version', '')),
         'public_base_url': _public_base_url(request),
         'current_user': request.user,
         'csrf_input': csrf_input_func,
-        'nav_professional': nav_professional,
-        'nav_repair': nav_repair,
-        'nav_industries': nav_industries,
-        'footer_content': footer_content,
+        'nav_professional': _LazyGlobal('nav_professional', lambda: navigation()[0]),
+        'nav_repair': _LazyGlobal('nav_repair', lambda: navigation()[1]),
+        'nav_industries': _LazyGlobal('nav_industries', lambda: navigation()[2]),
+        'footer_content': _LazyGlobal('footer_content', lambda: _get_footer_content(request)),
         'theme_css_vars': {},
-        'theme_mode': theme_mode,
+        'theme_mode': _LazyGlobal('theme_mode', lambda: _theme_mode(settings_dict())),
         'orange_county_cities': list(ORANGE_COUNTY_CA_CITIES),
-        'google_fonts_url': (settings_dict.get('google_fonts_url') or '').strip(),
+        'google_fonts_url': _LazyGlobal(
+            'google_fonts_url',
+            lambda: (settings_dict().get('google_fonts_url') or '').strip(),
+        ),
         'turnstile_enabled': bool(
             (getattr(settings, 'TURNSTILE_SITE_KEY', '') or '').strip()
             and (getattr(settings, 'TURNSTILE_SECRET_KEY', '') or '').strip()
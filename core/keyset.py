@@ -0,0 +1,179 @@
+"""
+Keyset (seek) pagination for newest-first lists.
+
+Rows are ordered by a timestamp column and ``id``, and a page is read with
+``WHERE (ts, id) < (last seen) ... LIMIT n + 1`` rather than ``OFFSET``, so
+every page costs one index range scan however deep it is. There is no
+``COUNT(*)``; ``approximate_total`` gives a capped exact count or, past the
+cap on PostgreSQL, the planner's row estimate.
+
+Cursors are opaque URL-safe tokens: a direction (after/before) plus the
+timestamp and id of the edge row. Ranked results that have no stable key
+(search) use ``offset_page``, which has the same interface with an offset
+inside the token.
+
+NULL timestamps sort where the database puts them by default (high on
+PostgreSQL, low elsewhere), so the ``(ts, id)`` index is used as is.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import Q
+
+DEFAULT_TOTAL_CAP = 1000
+MAX_OFFSET = 600
+_AFTER = 'a'
+_BEFORE = 'b'
+_OFFSET = 'o'
+
+
+@dataclass
+class CursorPage:
+    items: list
+    next_cursor: str = ''
+    prev_cursor: str = ''
+    total: int | None = None
+    # True when ``total`` is a lower bound or a planner estimate.
+    total_is_estimate: bool = False
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_prev(self):
+        return bool(self.prev_cursor)
+
+
+def _encode(*parts):
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode(cursor):
+    """``(direction, value, id)`` from *cursor*; anything malformed means the first page."""
+    cursor = str(cursor or '').strip()
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        direction, *rest = raw.split('|')
+        if direction == _OFFSET:
+            return direction, None, max(0, int(rest[0]))
+        value, row_id = rest
+        if direction not in (_AFTER, _BEFORE):
+            return None
+        return direction, datetime.fromisoformat(value) if value else None, int(row_id)
+    except (IndexError, ValueError, UnicodeDecodeError):
+        return None
+
+
+def _nulls_high():
+    return connection.vendor == 'postgresql'
+
+
+def _ordering(field, forward):
+    # The database's own NULL placement, which _below/_above mirror.
+    return (f'-{field}', '-id') if forward else (field, 'id')
+
+
+def _below(field, value):
+    high = _nulls_high()
+    if value is None:
+        return Q(**{f'{field}__isnull': False}) if high else Q(pk__in=[])
+    condition = Q(**{f'{field}__lt': value})
+    return condition if high else condition | Q(**{f'{field}__isnull': True})
+
+
+def _above(field, value):
+    high = _nulls_high()
+    if value is None:
+        return Q(pk__in=[]) if high else Q(**{f'{field}__isnull': False})
+    condition = Q(**{f'{field}__gt': value})
+    return condition | Q(**{f'{field}__isnull': True}) if high else condition
+
+
+def _equal(field, value):
+    return Q(**{f'{field}__isnull': True}) if value is None else Q(**{field: value})
+
+
+def _row_cursor(direction, field, row):
+    value = getattr(row, field)
+    return _encode(direction, value.isoformat() if value is not None else '', row.id)
+
+
+def approximate_total(queryset, cap=DEFAULT_TOTAL_CAP):
+    """``(total, is_estimate)``: exact up to *cap* rows, then an estimate (PostgreSQL) or *cap* itself."""
+    queryset = queryset.order_by()
+    total = queryset[: cap + 1].count()
+    if total <= cap:
+        return total, False
+    if connection.vendor == 'postgresql':
+        try:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return max(cap, int(plan[0]['Plan']['Plan Rows'])), True
+        except Exception:
+            pass
+    return cap, True
+
+
+def keyset_page(queryset, cursor='', *, per_page, field='created_at', with_total=False):
+    """One newest-first page of *queryset* ordered by ``(field, id)``, starting at *cursor*."""
+    position = _decode(cursor)
+    if position is not None and position[0] == _OFFSET:
+        position = None
+    forward = position is None or position[0] == _AFTER
+    query = queryset
+    if position is not None:
+        _, value, row_id = position
+        if forward:
+            query = query.filter(_below(field, value) | (_equal(field, value) & Q(id__lt=row_id)))
+        else:
+            query = query.filter(_above(field, value) | (_equal(field, value) & Q(id__gt=row_id)))
+    rows = list(query.order_by(*_ordering(field, forward))[: per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if forward:
+        page = CursorPage(
+            rows,
+            next_cursor=_row_cursor(_AFTER, field, rows[-1]) if more else '',
+            prev_cursor=_row_cursor(_BEFORE, field, rows[0]) if position is not None and rows else '',
+        )
+    elif not more:
+        # Walked back to the start: show a full first page instead of a short one.
+        return keyset_page(queryset, '', per_page=per_page, field=field, with_total=with_total)
+    else:
+        rows.reverse()
+        page = CursorPage(
+            rows,
+            next_cursor=_row_cursor(_AFTER, field, rows[-1]),
+            prev_cursor=_row_cursor(_BEFORE, field, rows[0]),
+        )
+    if with_total:
+        page.total, page.total_is_estimate = approximate_total(queryset)
+    return page
+
+
+def offset_page(results, cursor='', *, per_page, max_offset=MAX_OFFSET):
+    """A ``CursorPage`` over any sliceable *results* (e.g. ranked search), capped at *max_offset* rows deep."""
+    position = _decode(cursor)
+    offset = position[2] if position is not None and position[0] == _OFFSET else 0
+    offset = min(offset, max_offset)
+    rows = list(results[offset: offset + per_page + 1])
+    more = len(rows) > per_page and offset + per_page < max_offset
+    return CursorPage(
+        rows[:per_page],
+        next_cursor=_encode(_OFFSET, offset + per_page) if more else '',
+        prev_cursor=_encode(_OFFSET, max(0, offset - per_page)) if offset else '',
+    )
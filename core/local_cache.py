@@ -0,0 +1,51 @@
+"""
+Per-process (L1) cache in front of the shared cache backend.
+
+Values live in this worker's memory for a short TTL and are dropped as soon as
+their cache namespace generation changes. The generation itself is re-read from
+the backend at most once per ``version_check_seconds``, so steady-state lookups
+make no backend calls and do no unpickling.
+
+Values are shared between requests: callers must treat them as read-only.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+from core.cache_namespaces import namespace_generation
+
+
+class LocalCache:
+    def __init__(self, namespace: str, *, ttl: float, max_entries: int = 32, version_check_seconds: float = 2.0):
+        self.namespace = namespace
+        self.ttl = max(0.0, float(ttl))
+        self.max_entries = max(1, int(max_entries))
+        self.version_check_seconds = max(0.0, float(version_check_seconds))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader):
+        """Return the local value for *key*, calling *loader* on a miss."""
+        if self.ttl <= 0:
+            return loader()
+        generation = namespace_generation(self.namespace, max_age=self.version_check_seconds)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == generation and entry[2] > now:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, generation, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from core.cache_build import cache_build_stats
+
+DEFAULT_NAMES = ['site_settings', 'navigation', 'footer_content', 'sitemap']
+
+
+class Command(BaseCommand):
+    help = 'Show hit, stale, miss and rebuild counters for get_or_build cache entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--names',
+            nargs='*',
+            default=DEFAULT_NAMES,
+            help='Cache entry names to report.',
+        )
+
+    def handle(self, *args, **options):
+        stats = cache_build_stats(options['names'])
+        for name, counts in stats.items():
+            lookups = counts['hit'] + counts['stale'] + counts['miss']
+            hit_rate = (counts['hit'] + counts['stale']) / lookups * 100 if lookups else 0.0
+            self.stdout.write(
+                f'{name}: hit={counts["hit"]} stale={counts["stale"]} miss={counts["miss"]} '
+                f'rebuild={counts["rebuild"]} hit_rate={hit_rate:.1f}%'
+            )
+        self.stdout.write(self.style.SUCCESS('Counters are flushed from each worker at most once a minute.'))
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.scheduled_publish import (
+    SCHEDULED_BATCH_SIZE,
+    publish_due,
+    scheduled_target_names,
+    shared_cache_configured,
+)
+
+
+class Command(BaseCommand):
+    help = 'Publish content whose scheduled_publish_at has passed (safe to run on several nodes).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SCHEDULED_BATCH_SIZE)
+        parser.add_argument('--only', default='', help='Comma-separated types, e.g. "post,page".')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=30.0)
+        parser.add_argument(
+            '--allow-local-cache',
+            action='store_true',
+            help='Run with a process-local cache; web processes then serve stale pages until their TTLs expire.',
+        )
+
+    def handle(self, *args, **options):
+        only = {name.strip() for name in options['only'].split(',') if name.strip()}
+        unknown = sorted(only - set(scheduled_target_names()))
+        if unknown:
+            raise CommandError(f'Unknown types: {", ".join(unknown)}')
+        if not shared_cache_configured() and not options['allow_local_cache']:
+            raise CommandError(
+                'The default cache is process-local, so this worker cannot invalidate what the web processes '
+                'have cached. Configure a shared cache backend, or pass --allow-local-cache to accept stale '
+                'pages until their TTLs expire.'
+            )
+        batch_size = max(1, options['batch_size'])
+
+        while True:
+            counts = publish_due(batch_size=batch_size, only=only or None)
+            published = {name: count for name, count in counts.items() if count}
+            if published or not options['loop']:
+                summary = ', '.join(f'{name}={count}' for name, count in published.items()) or 'nothing due'
+                self.stdout.write(self.style.SUCCESS(f'Scheduled publish: {summary}.'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(max(1.0, options['interval']))
+            except KeyboardInterrupt:
+                return
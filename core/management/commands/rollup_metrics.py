@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.metric_rollups import (
+    ROLLUP_BACKFILL_DAYS,
+    ROLLUP_METRICS,
+    prune_hourly_rollups,
+    roll_up_all,
+    setup_rollup_tables,
+)
+
+
+class Command(BaseCommand):
+    help = 'Fill the hourly/daily metric_rollup rows the ops dashboards read (safe to re-run).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', default='', help='Comma-separated metrics, e.g. "security_events".')
+        parser.add_argument('--backfill-days', type=int, default=ROLLUP_BACKFILL_DAYS,
+                            help='How far back a metric without a cursor starts.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300.0)
+        parser.add_argument('--setup', action='store_true', help='Create the rollup tables first if they are missing.')
+
+    def handle(self, *args, **options):
+        only = {name.strip() for name in options['only'].split(',') if name.strip()}
+        unknown = sorted(only - set(ROLLUP_METRICS))
+        if unknown:
+            raise CommandError(f'Unknown metrics: {", ".join(unknown)}')
+        backfill_days = max(1, options['backfill_days'])
+        if options['setup']:
+            created = setup_rollup_tables()
+            self.stdout.write(f'Rollup tables: {", ".join(created) or "already present"}.')
+
+        while True:
+            hours = roll_up_all(only=only or None, backfill_days=backfill_days)
+            pruned = prune_hourly_rollups()
+            rolled = {name: count for name, count in hours.items() if count}
+            if rolled or pruned or not options['loop']:
+                summary = ', '.join(f'{name}={count}h' for name, count in rolled.items()) or 'up to date'
+                self.stdout.write(self.style.SUCCESS(f'Metric rollups: {summary}; pruned {pruned} hourly rows.'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(max(1.0, options['interval']))
+            except KeyboardInterrupt:
+                return
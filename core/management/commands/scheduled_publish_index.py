@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from core.scheduled_publish import setup_scheduled_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create the partial scheduled_publish_at indexes used by publish_scheduled (PostgreSQL and SQLite).'
+
+    def handle(self, *args, **options):
+        tables = setup_scheduled_indexes()
+        if not tables:
+            self.stdout.write(self.style.WARNING('Partial indexes are not supported on this database; nothing created.'))
+            return
+        for table in tables:
+            self.stdout.write(f'{table}: {table}_scheduled_publish_idx')
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from public.search import SEARCH_INDEXES, search_backend, setup_search_index
+
+
+class Command(BaseCommand):
+    help = 'Create the full-text search index for posts, services and industries (tsvector on PostgreSQL, FTS5 on SQLite).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Refill the SQLite FTS5 tables from the source rows.')
+        parser.add_argument('--status', action='store_true', help='Only report which backend each model uses.')
+
+    def handle(self, *args, **options):
+        if not options['status']:
+            backend = setup_search_index(rebuild=options['rebuild'])
+            if backend == 'basic':
+                self.stdout.write(self.style.WARNING('No full-text index for this database; search uses icontains.'))
+        for model in SEARCH_INDEXES:
+            self.stdout.write(f'{model._meta.db_table}: {search_backend(model)}')
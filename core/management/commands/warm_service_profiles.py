@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from public.service_profiles import warm_service_profiles
+
+
+class Command(BaseCommand):
+    help = 'Precompute normalized service profiles into the shared cache.'
+
+    def handle(self, *args, **options):
+        count = warm_service_profiles()
+        self.stdout.write(self.style.SUCCESS(f'Warmed {count} service profile(s).'))
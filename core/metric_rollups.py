@@ -0,0 +1,276 @@
+"""
+Hourly and daily event-count rollups for the ops dashboards.
+
+The dashboards' time-windowed counters (security events, new contacts and
+tickets, MCP executions over the last 24h) read
+``metric_rollup`` instead of scanning the raw tables, so their cost stays
+flat as history grows. Rows are keyed by ``(metric, granularity,
+bucket_start, dimension)``; the dimension is one column of the source row
+(event type, status, ...) or ``''``.
+
+``roll_up`` fills complete hours after the metric's cursor in
+``metric_rollup_cursor``, rebuilds the daily rows those hours touch and
+advances the cursor, all in one transaction, so it can be re-run or run
+from several workers safely (``manage.py rollup_metrics --loop``). Only
+hours that ended ``ROLLUP_SETTLE_SECONDS`` ago are rolled up.
+
+``windowed_counts`` answers "since *t*" exactly: live counts for the partial
+hour at the start and for the tail after the cursor (both short index range
+scans), hourly rows for the ragged edges and daily rows for whole days. If
+the worker has never run, it falls back to counting live.
+
+The tables are unmanaged; ``manage.py rollup_metrics --setup`` (or
+``setup_rollup_tables``) creates them and the unique bucket index, roughly::
+
+    CREATE TABLE metric_rollup (
+        id BIGSERIAL PRIMARY KEY,
+        metric VARCHAR(80) NOT NULL,
+        granularity VARCHAR(8) NOT NULL,
+        bucket_start TIMESTAMP NOT NULL,
+        dimension VARCHAR(120) NOT NULL,
+        value BIGINT NOT NULL,
+        updated_at TIMESTAMP,
+        UNIQUE (metric, granularity, bucket_start, dimension)
+    );
+    CREATE TABLE metric_rollup_cursor (
+        metric VARCHAR(80) PRIMARY KEY,
+        rolled_through TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP
+    );
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+from core.models import MetricRollup, MetricRollupCursor
+from core.utils import utc_now_naive
+
+ROLLUP_HOUR = 'hour'
+ROLLUP_DAY = 'day'
+ROLLUP_SETTLE_SECONDS = 120
+# Catch-up per run is bounded so a long outage is worked off over several runs.
+ROLLUP_MAX_HOURS_PER_RUN = 24 * 7
+ROLLUP_BACKFILL_DAYS = 30
+# Hourly rows older than this are pruned; daily rows are kept.
+ROLLUP_HOUR_RETENTION_DAYS = 35
+
+
+@dataclass(frozen=True)
+class RollupMetric:
+    name: str
+    # 'app_label.ModelName', resolved lazily.
+    model: str
+    dimension: str = ''
+    time_field: str = 'created_at'
+    filters: tuple = ()
+    # Q objects the source rows must not match.
+    excludes: tuple = ()
+
+    def queryset(self):
+        query = apps.get_model(self.model).objects.filter(**dict(self.filters))
+        for condition in self.excludes:
+            query = query.exclude(condition)
+        return query
+
+
+ROLLUP_METRICS = {
+    metric.name: metric
+    for metric in (
+        RollupMetric('security_events', 'admin_panel.SecurityEvent', dimension='event_type'),
+        RollupMetric('contacts_created', 'admin_panel.ContactSubmission'),
+        RollupMetric('tickets_created', 'admin_panel.SupportTicket', dimension='priority'),
+        # Admin saves log an event with status_to set even when the status is unchanged; only count real transitions.
+        RollupMetric(
+            'ticket_status_changes',
+            'admin_panel.SupportTicketEvent',
+            dimension='status_to',
+            excludes=(Q(status_from=F('status_to')), Q(status_to__isnull=True)),
+        ),
+        RollupMetric('mcp_executions', 'acp.AcpMcpAuditEvent', dimension='status', filters=(('action', 'execute'),)),
+    )
+}
+
+
+def floor_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value):
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil(value, floor, step):
+    floored = floor(value)
+    return floored if floored == value else floored + step
+
+
+def _grouped(query, metric, hourly=False):
+    """``Counter({(hour or None, dimension): count})`` for *query*."""
+    fields = [metric.dimension] if metric.dimension else []
+    if hourly:
+        query = query.annotate(bucket=TruncHour(metric.time_field))
+        fields.append('bucket')
+    counts = Counter()
+    for row in query.values(*fields).annotate(n=Count('id')).order_by():
+        dimension = str(row.get(metric.dimension) or '')[:120] if metric.dimension else ''
+        counts[(row.get('bucket'), dimension)] += row['n']
+    return counts
+
+
+def _rollup_rows(metric, granularity, counts, now):
+    return [
+        MetricRollup(
+            metric=metric.name,
+            granularity=granularity,
+            bucket_start=bucket,
+            dimension=dimension,
+            value=value,
+            updated_at=now,
+        )
+        for (bucket, dimension), value in counts.items()
+        if value
+    ]
+
+
+ROLLUP_UNIQUE_INDEX = 'metric_rollup_bucket_uniq'
+
+
+def setup_rollup_tables():
+    """Create the rollup tables and their unique bucket index if missing; returns the tables created."""
+    created = []
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+    with connection.schema_editor() as editor:
+        for model in (MetricRollup, MetricRollupCursor):
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+                created.append(model._meta.db_table)
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, MetricRollup._meta.db_table)
+        if ROLLUP_UNIQUE_INDEX not in constraints:
+            # Two workers starting a metric with no cursor row yet cannot both insert its buckets.
+            cursor.execute(
+                f'CREATE UNIQUE INDEX {ROLLUP_UNIQUE_INDEX} '
+                f'ON {MetricRollup._meta.db_table} (metric, granularity, bucket_start, dimension)'
+            )
+    return created
+
+
+def roll_up(name, *, now=None, backfill_days=ROLLUP_BACKFILL_DAYS):
+    """Roll up the complete hours after *name*'s cursor; returns how many hours were covered."""
+    metric = ROLLUP_METRICS[name]
+    now = now or utc_now_naive()
+    end = floor_hour(now - timedelta(seconds=ROLLUP_SETTLE_SECONDS))
+    with transaction.atomic():
+        cursor = MetricRollupCursor.objects.select_for_update().filter(metric=name).first()
+        start = cursor.rolled_through if cursor else floor_day(now - timedelta(days=backfill_days))
+        end = min(end, start + timedelta(hours=ROLLUP_MAX_HOURS_PER_RUN))
+        if end <= start:
+            return 0
+
+        time_range = {f'{metric.time_field}__gte': start, f'{metric.time_field}__lt': end}
+        hourly = _grouped(metric.queryset().filter(**time_range), metric, hourly=True)
+        MetricRollup.objects.filter(
+            metric=name, granularity=ROLLUP_HOUR, bucket_start__gte=start, bucket_start__lt=end
+        ).delete()
+        MetricRollup.objects.bulk_create(_rollup_rows(metric, ROLLUP_HOUR, hourly, now))
+
+        # Rebuild the daily rows for every day these hours touched from the hourly rows.
+        first_day, last_day = floor_day(start), floor_day(end - timedelta(microseconds=1)) + timedelta(days=1)
+        daily = Counter()
+        for row in (
+            MetricRollup.objects.filter(
+                metric=name, granularity=ROLLUP_HOUR, bucket_start__gte=first_day, bucket_start__lt=last_day
+            )
+            .annotate(day=TruncDay('bucket_start'))
+            .values('day', 'dimension')
+            .annotate(total=Sum('value'))
+            .order_by()
+        ):
+            daily[(row['day'], row['dimension'])] += row['total'] or 0
+        MetricRollup.objects.filter(
+            metric=name, granularity=ROLLUP_DAY, bucket_start__gte=first_day, bucket_start__lt=last_day
+        ).delete()
+        MetricRollup.objects.bulk_create(_rollup_rows(metric, ROLLUP_DAY, daily, now))
+
+        MetricRollupCursor.objects.update_or_create(metric=name, defaults={'rolled_through': end, 'updated_at': now})
+    return int((end - start).total_seconds() // 3600)
+
+
+def prune_hourly_rollups(*, now=None, retention_days=ROLLUP_HOUR_RETENTION_DAYS):
+    """Delete old hourly rows, keeping any day a lagging cursor may still rebuild from them."""
+    now = now or utc_now_naive()
+    cutoff = floor_day(now - timedelta(days=retention_days))
+    lagging = MetricRollupCursor.objects.aggregate(oldest=Min('rolled_through'))['oldest']
+    if lagging is not None:
+        cutoff = min(cutoff, floor_day(lagging))
+    deleted, _ = MetricRollup.objects.filter(granularity=ROLLUP_HOUR, bucket_start__lt=cutoff).delete()
+    return deleted
+
+
+def roll_up_all(*, now=None, only=None, backfill_days=ROLLUP_BACKFILL_DAYS):
+    """Run ``roll_up`` for every metric (or those in *only*); returns ``{metric: hours}``."""
+    return {
+        name: roll_up(name, now=now, backfill_days=backfill_days)
+        for name in ROLLUP_METRICS
+        if not only or name in only
+    }
+
+
+def _rolled_through(name):
+    try:
+        return MetricRollupCursor.objects.filter(metric=name).values_list('rolled_through', flat=True).first()
+    except Exception:
+        return None
+
+
+def windowed_counts(name, since):
+    """``{dimension: count}`` of *name* events at or after *since* (``''`` for metrics without a dimension)."""
+    metric = ROLLUP_METRICS[name]
+    live = metric.queryset()
+    field = metric.time_field
+    counts = Counter()
+
+    def add_live(start, end=None):
+        query = live.filter(**{f'{field}__gte': start})
+        if end is not None:
+            query = query.filter(**{f'{field}__lt': end})
+        for (_, dimension), value in _grouped(query, metric).items():
+            counts[dimension] += value
+
+    rolled_through = _rolled_through(name)
+    first_hour = _ceil(since, floor_hour, timedelta(hours=1))
+    if rolled_through is None or rolled_through <= first_hour:
+        add_live(since)
+        return dict(counts)
+
+    if since < first_hour:
+        add_live(since, first_hour)
+    first_day = min(_ceil(first_hour, floor_day, timedelta(days=1)), rolled_through)
+    last_day = max(floor_day(rolled_through), first_day)
+    rollups = MetricRollup.objects.filter(metric=name)
+    hour_ranges = Q(bucket_start__gte=first_hour, bucket_start__lt=first_day) | Q(
+        bucket_start__gte=last_day, bucket_start__lt=rolled_through
+    )
+    for granularity, condition in (
+        (ROLLUP_HOUR, hour_ranges),
+        (ROLLUP_DAY, Q(bucket_start__gte=first_day, bucket_start__lt=last_day)),
+    ):
+        for row in rollups.filter(condition, granularity=granularity).values('dimension').annotate(total=Sum('value')):
+            counts[row['dimension']] += row['total'] or 0
+    add_live(rolled_through)
+    return dict(counts)
+
+
+def windowed_count(name, since, *, dimensions=None):
+    counts = windowed_counts(name, since)
+    if dimensions is None:
+        return sum(counts.values())
+    return sum(counts.get(dimension, 0) for dimension in dimensions)
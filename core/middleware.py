@@ -34,6 +34,11 @@ class RequestIDMiddleware:
         if getattr(django_settings, 'DEBUG', False):
             duration_ms = int((time.perf_counter() - request._start_ts) * 1000)
             response['Server-Timing'] = f'app;dur={duration_ms}'
+            used = getattr(request, 'template_globals_used', None)
+            if used:
+                response['X-Template-Globals'] = '; '.join(
+                    f'{name}={",".join(names) or "-"}' for name, names in used.items()
+                )
         return response
 
 
@@ -31,3 +31,27 @@ class WorkflowMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class MetricRollup(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    metric = models.CharField(max_length=80)
+    granularity = models.CharField(max_length=8)
+    bucket_start = models.DateTimeField()
+    dimension = models.CharField(max_length=120, default='')
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'metric_rollup'
+        managed = False
+
+
+class MetricRollupCursor(models.Model):
+    metric = models.CharField(max_length=80, primary_key=True)
+    rolled_through = models.DateTimeField()
+    updated_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'metric_rollup_cursor'
+        managed = False
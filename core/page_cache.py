@@ -0,0 +1,185 @@
+"""Rendered-HTML cache for anonymous public pages.
+
+Each entry records the generation of every content tag it was built from
+(``service:<id>``, ``industry:<id>``, ``content_block:<page>``, ``site_settings``
+...). Purging a tag bumps its generation so dependent entries miss on their
+next lookup; unrelated pages stay warm.
+
+Pages are rendered with a fixed CSP nonce placeholder which is swapped for the
+per-request nonce on every response, cached or not.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PAGE_CACHE_VERSION = str(getattr(settings, 'PUBLIC_PAGE_CACHE_VERSION', 'v1'))
+PAGE_CACHE_TTL = max(0, int(getattr(settings, 'PUBLIC_PAGE_CACHE_TTL', 120)))
+CSP_NONCE_PLACEHOLDER = 'csp-nonce-placeholder-7d41c0'
+
+# Every public page renders the site header/footer, which list services and
+# industries and read site settings plus the footer content block.
+BASE_PAGE_TAGS = ('site_settings', 'services', 'industries', 'content_block:footer')
+
+
+def _tag_key(tag: str) -> str:
+    return f'page-cache:{PAGE_CACHE_VERSION}:tag:{tag}'
+
+
+def _new_generation() -> int:
+    # Seed from the clock so a tag evicted from the cache never reuses an old generation.
+    return time.time_ns()
+
+
+def _tag_generations(tags) -> dict:
+    tags = sorted(set(tags))
+    keys = {_tag_key(tag): tag for tag in tags}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception:
+        found = {}
+    generations = {}
+    for key, tag in keys.items():
+        value = found.get(key)
+        if value is None:
+            value = _new_generation()
+            if not cache.add(key, value, None):
+                value = cache.get(key, value)
+        generations[tag] = value
+    return generations
+
+
+def purge_tags(*tags: str) -> None:
+    """Invalidate every cached page that carries any of ``tags``."""
+    for tag in {str(tag or '').strip() for tag in tags}:
+        if not tag:
+            continue
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), None)
+        except Exception:
+            continue
+
+
+def tag_page(request, *tags: str) -> None:
+    """Attach content tags to the page currently being rendered for ``request``."""
+    page_tags = getattr(request, '_page_cache_tags', None)
+    if page_tags is None:
+        return
+    page_tags.update(tag for tag in tags if tag)
+
+
+def _theme_mode() -> str:
+    from core.context_processors import _get_site_settings
+
+    try:
+        mode = (_get_site_settings().get('theme_mode') or 'light').strip().lower()
+    except Exception:
+        mode = 'light'
+    return mode if mode in {'dark', 'light'} else 'light'
+
+
+def _entry_key(request) -> str:
+    raw = '|'.join(
+        [
+            request.scheme,
+            request.get_host(),
+            request.path,
+            request.META.get('QUERY_STRING', ''),
+            _theme_mode(),
+        ]
+    )
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    return f'page-cache:{PAGE_CACHE_VERSION}:page:{digest}'
+
+
+def _is_cacheable_request(request) -> bool:
+    if request.method not in {'GET', 'HEAD'}:
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and getattr(user, 'is_authenticated', False):
+        return False
+    # Pending flash messages or a live session make the page visitor-specific.
+    if request.COOKIES.get('messages') or request.COOKIES.get(settings.SESSION_COOKIE_NAME):
+        return False
+    return True
+
+
+def _is_cacheable_response(response) -> bool:
+    if response.status_code != 200 or getattr(response, 'streaming', False):
+        return False
+    if response.cookies:
+        return False
+    cache_control = str(response.get('Cache-Control', '')).lower()
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def _with_nonce(content: bytes, nonce: str) -> bytes:
+    return content.replace(CSP_NONCE_PLACEHOLDER.encode('ascii'), str(nonce or '').encode('ascii'))
+
+
+def cache_public_page(*tags: str):
+    """Serve anonymous GETs of the wrapped view from the page cache."""
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if PAGE_CACHE_TTL <= 0 or not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            nonce = getattr(request, 'csp_nonce', '')
+            key = _entry_key(request)
+            try:
+                entry = cache.get(key)
+            except Exception:
+                entry = None
+            if entry and _tag_generations(entry['tags']) == entry['tags']:
+                response = HttpResponse(_with_nonce(entry['content'], nonce), content_type=entry['content_type'])
+                response['X-Page-Cache'] = 'HIT'
+                return response
+
+            # Snapshot generations before rendering so a purge racing the render wins.
+            generations = _tag_generations(set(BASE_PAGE_TAGS) | set(tags))
+            request._page_cache_tags = set(generations)
+            request.csp_nonce = CSP_NONCE_PLACEHOLDER
+            try:
+                response = view_func(request, *args, **kwargs)
+            finally:
+                request.csp_nonce = nonce
+            late_tags = request._page_cache_tags - set(generations)
+            del request._page_cache_tags
+
+            if not _is_cacheable_response(response):
+                if not getattr(response, 'streaming', False):
+                    response.content = _with_nonce(response.content, nonce)
+                return response
+
+            content = response.content
+            if late_tags:
+                generations.update(_tag_generations(late_tags))
+            try:
+                cache.set(
+                    key,
+                    {
+                        'content': content,
+                        'content_type': response.get('Content-Type', 'text/html; charset=utf-8'),
+                        'tags': generations,
+                    },
+                    PAGE_CACHE_TTL,
+                )
+            except Exception:
+                pass
+            response.content = _with_nonce(content, nonce)
+            response['X-Page-Cache'] = 'MISS'
+            return response
+
+        return wrapped
+
+    return decorator
@@ -17,9 +17,11 @@ from __future__ import annotations
 
 from django.core.cache import cache
 
+from core.cache_namespaces import NAMESPACE_RATE_LIMIT, namespaced_key
+
 
 def _cache_key(namespace: str) -> str:
-    return f'ratelimit:{namespace}'
+    return namespaced_key(NAMESPACE_RATE_LIMIT, namespace)
 
 
 def check_rate_limit(namespace: str, *, max_attempts: int = 5, window_seconds: int = 300) -> bool:
@@ -0,0 +1,275 @@
+"""
+Publish content whose ``scheduled_publish_at`` has passed.
+
+An item is due when it is not live yet, is not trashed, and its
+``scheduled_publish_at`` is in the past. Not live means ``approved``, or
+``published`` without a ``published_at``, which is how an ACP document saved
+as published with a future schedule is stored. Publishing sets the status
+and ``published_at``, clears ``scheduled_publish_at`` (so the pending set only
+ever shrinks), writes a version row and an ``AcpAuditEvent``, and makes the
+cache purges and namespace bumps the admin save paths make.
+
+Those purges act on the worker's own cache backend. With a process-local
+backend (``LocMemCache``, the default in ``config.settings``) they never
+reach the web processes. Those keep serving the old pages, slug index and
+related content until their TTLs run out, so a just-published service can
+404 for minutes. ``manage.py publish_scheduled`` therefore refuses to run
+unless the default cache is shared (Redis, Memcached, database, file), or
+``--allow-local-cache`` accepts that staleness.
+
+Admin saves leave ``scheduled_publish_at`` set on rows they publish
+directly. For those rows the schedule is only cleared: ``published_at``
+keeps its date and no version or audit row is written.
+
+Several workers can run at once. On PostgreSQL each batch is claimed with
+``SELECT ... FOR UPDATE SKIP LOCKED``; elsewhere every row is claimed with a
+conditional ``UPDATE`` on its old ``scheduled_publish_at``, so a row another
+worker already published matches nothing and is skipped.
+
+The due query is a range scan on ``scheduled_publish_at``. The tables are
+unmanaged, so ``manage.py scheduled_publish_index`` creates the supporting
+partial index on each of them (PostgreSQL and SQLite)::
+
+    CREATE INDEX IF NOT EXISTS service_scheduled_publish_idx
+        ON service (scheduled_publish_at) WHERE scheduled_publish_at IS NOT NULL
+
+Version rows are written in a savepoint each, so a failed version insert
+does not abort the batch transaction.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.constants import WORKFLOW_APPROVED, WORKFLOW_PUBLISHED
+from core.utils import utc_now_naive
+
+SCHEDULED_BATCH_SIZE = 100
+DUE_STATUSES = (WORKFLOW_APPROVED, WORKFLOW_PUBLISHED)
+SCHEDULER_ACTOR = 'scheduler'
+SCHEDULER_CHANGE_NOTE = 'Scheduled publish'
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@dataclass(frozen=True)
+class ScheduledTarget:
+    name: str
+    model: Any
+    status_field: str
+    snapshot: Callable
+    create_version: Callable
+    # Called after commit with the published rows.
+    invalidate: Callable
+    audit_domain: str
+    trashable: bool = False
+    extra_updates: tuple = ()
+
+
+def _targets():
+    # Imported here: the document modules import public and ACP models, which import from core.
+    from acp.documents import (
+        content_entry_snapshot,
+        create_content_entry_version,
+        create_dashboard_version,
+        create_page_version,
+        create_theme_version,
+        dashboard_snapshot,
+        page_snapshot,
+        theme_snapshot,
+    )
+    from acp.models import AcpContentEntry, AcpDashboardDocument, AcpPageDocument, AcpThemeTokenSet
+    from admin_panel.documents import (
+        create_industry_version,
+        create_post_version,
+        create_service_version,
+        industry_snapshot,
+        post_snapshot,
+        purge_posts,
+        purge_public_content,
+        service_snapshot,
+    )
+    from headless.delivery_cache import delivery_item_key, refresh_delivery_documents
+    from public.models import Industry, Post, Service
+    from public.service_profiles import refresh_service_profile
+
+    def refresh_delivery(kind):
+        return lambda rows: refresh_delivery_documents(kind, *[delivery_item_key(kind, row) for row in rows])
+
+    def refresh_services(rows):
+        for row in rows:
+            refresh_service_profile(row)
+        purge_public_content('services', *[f'service:{row.id}' for row in rows])
+
+    return (
+        ScheduledTarget(
+            'service', Service, 'workflow_status', service_snapshot, create_service_version, refresh_services,
+            'services', trashable=True,
+        ),
+        ScheduledTarget(
+            'industry', Industry, 'workflow_status', industry_snapshot, create_industry_version,
+            lambda rows: purge_public_content('industries', *[f'industry:{row.id}' for row in rows]),
+            'industries', trashable=True,
+        ),
+        ScheduledTarget(
+            'post', Post, 'workflow_status', post_snapshot, create_post_version,
+            lambda rows: purge_posts(*[f'post:{row.id}' for row in rows]),
+            'posts', trashable=True, extra_updates=(('is_published', True),),
+        ),
+        ScheduledTarget(
+            'page', AcpPageDocument, 'status', page_snapshot, create_page_version, refresh_delivery('page'), 'pages',
+        ),
+        ScheduledTarget(
+            'dashboard', AcpDashboardDocument, 'status', dashboard_snapshot, create_dashboard_version,
+            refresh_delivery('dashboard'), 'dashboards',
+        ),
+        ScheduledTarget(
+            'theme', AcpThemeTokenSet, 'status', theme_snapshot, create_theme_version, refresh_delivery('theme'), 'theme',
+        ),
+        ScheduledTarget(
+            'content', AcpContentEntry, 'status', content_entry_snapshot, create_content_entry_version,
+            refresh_delivery('content'), 'content',
+        ),
+    )
+
+
+def _index_sql(target):
+    table = target.model._meta.db_table
+    return (
+        f'CREATE INDEX IF NOT EXISTS {table}_scheduled_publish_idx '
+        f'ON {table} (scheduled_publish_at) WHERE scheduled_publish_at IS NOT NULL'
+    )
+
+
+def setup_scheduled_indexes():
+    """Create the partial ``scheduled_publish_at`` index of every target; returns the tables, or ``()`` if unsupported."""
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return ()
+    tables = []
+    with connection.cursor() as cursor:
+        for target in _targets():
+            cursor.execute(_index_sql(target))
+            tables.append(target.model._meta.db_table)
+    return tuple(tables)
+
+
+def _settle_live_rows(target, now):
+    """Clear the passed schedule of rows that are already live, keeping their ``published_at``."""
+    return target.model.objects.filter(
+        scheduled_publish_at__isnull=False,
+        scheduled_publish_at__lte=now,
+        published_at__isnull=False,
+        **{target.status_field: WORKFLOW_PUBLISHED},
+    ).update(scheduled_publish_at=None)
+
+
+def _due_rows(target, now, batch_size):
+    # A published row without published_at was saved with a future schedule and is not live yet.
+    query = target.model.objects.filter(
+        Q(**{target.status_field: WORKFLOW_APPROVED}) | Q(published_at__isnull=True),
+        scheduled_publish_at__isnull=False,
+        scheduled_publish_at__lte=now,
+        **{f'{target.status_field}__in': DUE_STATUSES},
+    )
+    if target.trashable:
+        query = query.filter(Q(is_trashed=False) | Q(is_trashed__isnull=True))
+    query = query.order_by('scheduled_publish_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        query = query.select_for_update(skip_locked=True)
+    return list(query[:batch_size])
+
+
+def _claim(target, rows, now):
+    """Mark *rows* published and return the ones this worker actually claimed."""
+    updates = {target.status_field: WORKFLOW_PUBLISHED, 'published_at': now, 'scheduled_publish_at': None, 'updated_at': now}
+    updates.update(target.extra_updates)
+    if connection.features.has_select_for_update_skip_locked:
+        # The rows are locked by this transaction, so one UPDATE claims them all.
+        target.model.objects.filter(id__in=[row.id for row in rows]).update(**updates)
+        claimed = rows
+    else:
+        claimed = [
+            row
+            for row in rows
+            if target.model.objects.filter(id=row.id, scheduled_publish_at=row.scheduled_publish_at).update(**updates)
+        ]
+    for row in claimed:
+        for name, value in updates.items():
+            setattr(row, name, value)
+    return claimed
+
+
+def _audit_rows(target, published, now):
+    from acp.models import AcpAuditEvent
+    from acp.views.common import DEFAULT_ENVIRONMENT
+
+    return [
+        AcpAuditEvent(
+            domain=target.audit_domain,
+            action='scheduled_publish',
+            entity_type=target.name,
+            entity_id=str(row.id),
+            before_json=before,
+            after_json=json.dumps(target.snapshot(row), ensure_ascii=False, default=str),
+            actor_username=SCHEDULER_ACTOR,
+            environment=DEFAULT_ENVIRONMENT,
+            created_at=now,
+        )
+        for row, before in published
+    ]
+
+
+def publish_due_batch(target, *, now=None, batch_size=SCHEDULED_BATCH_SIZE):
+    """Publish up to *batch_size* due rows of *target*; returns how many were published."""
+    from acp.models import AcpAuditEvent
+
+    now = now or utc_now_naive()
+    with transaction.atomic():
+        _settle_live_rows(target, now)
+        rows = _due_rows(target, now, batch_size)
+        if not rows:
+            return 0
+        before = {row.id: json.dumps(target.snapshot(row), ensure_ascii=False, default=str) for row in rows}
+        claimed = _claim(target, rows, now)
+        for row in claimed:
+            target.create_version(row, None, change_note=SCHEDULER_CHANGE_NOTE)
+        AcpAuditEvent.objects.bulk_create(_audit_rows(target, [(row, before[row.id]) for row in claimed], now))
+    if claimed:
+        try:
+            target.invalidate(claimed)
+        except Exception:
+            pass
+    return len(claimed)
+
+
+def publish_due(*, now=None, batch_size=SCHEDULED_BATCH_SIZE, only=None):
+    """Publish everything due, batch by batch; returns ``{target name: count}``."""
+    counts = {}
+    for target in _targets():
+        if only and target.name not in only:
+            continue
+        total = 0
+        while True:
+            published = publish_due_batch(target, now=now, batch_size=batch_size)
+            total += published
+            if published < batch_size:
+                break
+        counts[target.name] = total
+    return counts
+
+
+
+def shared_cache_configured():
+    """Whether the default cache is visible to other processes, so the worker's purges reach the web servers."""
+    backend = (getattr(settings, 'CACHES', {}).get('default') or {}).get('BACKEND', '')
+    return bool(backend) and backend not in LOCAL_CACHE_BACKENDS
+
+def scheduled_target_names():
+    return tuple(target.name for target in _targets())
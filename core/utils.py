@@ -1,11 +1,11 @@
 import ipaddress
-import json
 import re
-from datetime import datetime, timezone
+from datetime import datetime, time, timezone
 
 from django.http import HttpRequest
+from django.utils.dateparse import parse_date, parse_datetime
 
-from public.models import ContentBlock
+from core.content_blocks import load_page_content
 
 EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
 
@@ -14,6 +14,24 @@ def utc_now_naive():
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
+def parse_iso_datetime(value):
+    """ISO date or datetime -> naive UTC datetime (as stored); ``None`` if unparseable."""
+    raw = str(value or '').strip()
+    if 'T' in raw:
+        # An unencoded "+00:00" offset in a query string arrives as a space.
+        raw = raw.replace(' ', '+')
+    try:
+        parsed = parse_datetime(raw)
+        if parsed is None:
+            day = parse_date(raw)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        return None
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
 def clean_text(value, max_length=255):
     return (value or '').strip()[:max_length]
 
@@ -41,12 +59,8 @@ def get_request_ip(request: HttpRequest):
     return remote_ip or 'unknown'
 
 
-def get_page_content(page):
-    blocks = ContentBlock.objects.filter(page=page)
-    result = {}
-    for block in blocks:
-        try:
-            result[block.section] = json.loads(block.content)
-        except (json.JSONDecodeError, TypeError):
-            result[block.section] = {}
-    return result
+def get_page_content(page, request=None):
+    # Every public page renders the footer block too: with a request, load it in
+    # the same query so the footer context global finds it memoized.
+    pages = [page, 'footer'] if request is not None else [page]
+    return load_page_content(pages, request=request)[page]
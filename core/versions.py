@@ -0,0 +1,31 @@
+"""
+Version rows for edited documents (``*_version`` tables).
+
+Every version table has the same shape: a foreign key to the document, a
+``version_number`` counting up from 1, the JSON ``snapshot_json`` and the
+change note. ``create_version`` writes the next row in its own savepoint, so
+a failed insert is skipped without aborting the caller's transaction.
+"""
+from __future__ import annotations
+
+import json
+
+from django.db import transaction
+
+from core.utils import clean_text, utc_now_naive
+
+
+def create_version(model, fk, snapshot, item, user, change_note=''):
+    try:
+        with transaction.atomic():
+            latest = model.objects.filter(**{fk: item.id}).order_by('-version_number').first()
+            model.objects.create(
+                **{fk: item.id},
+                version_number=(latest.version_number if latest else 0) + 1,
+                snapshot_json=json.dumps(snapshot(item), ensure_ascii=False),
+                change_note=clean_text(change_note, 260),
+                created_by_id=getattr(user, 'id', None),
+                created_at=utc_now_naive(),
+            )
+    except Exception:
+        return
@@ -0,0 +1,76 @@
+"""
+Streaming XML responses.
+
+Sitemaps and feeds are produced as generators of small text fragments. The
+fragments are grouped into ~16KB byte chunks, optionally gzip-compressed as
+they are produced, and handed to ``StreamingHttpResponse`` so a worker never
+holds the whole document and the first bytes go out before the last row is
+read.
+
+Usage:
+    def fragments():
+        yield XML_DECLARATION
+        yield '<urlset ...>\\n'
+        for row in queryset.iterator():
+            yield xml_element('loc', row.url)
+        yield '</urlset>\\n'
+
+    use_gzip = negotiate_encoding(request, encodings=('gzip',)) == 'gzip'
+    return streaming_xml_response(fragments(), gzip=use_gzip)
+"""
+from __future__ import annotations
+
+import zlib
+from xml.sax.saxutils import escape, quoteattr
+
+from django.http import StreamingHttpResponse
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XML_CONTENT_TYPE = 'application/xml; charset=utf-8'
+CHUNK_SIZE = 16 * 1024
+
+def xml_element(tag, text=None, **attrs):
+    """Return ``<tag attr="...">text</tag>``; ``text=None`` gives a self-closing element."""
+    attributes = ''.join(f' {name}={quoteattr(str(value))}' for name, value in attrs.items())
+    if text is None:
+        return f'<{tag}{attributes}/>'
+    return f'<{tag}{attributes}>{escape(str(text))}</{tag}>'
+
+
+def encode_chunks(fragments, chunk_size=CHUNK_SIZE):
+    """Group text fragments into UTF-8 byte chunks of roughly *chunk_size*."""
+    buffer = []
+    size = 0
+    for fragment in fragments:
+        data = fragment.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress byte chunks incrementally into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_text_response(fragments, *, content_type, gzip=False):
+    """Stream text *fragments* in ~``CHUNK_SIZE`` byte chunks, gzip-encoded when *gzip* is set."""
+    chunks = encode_chunks(fragments)
+    response = StreamingHttpResponse(gzip_chunks(chunks) if gzip else chunks, content_type=content_type)
+    if gzip:
+        response['Content-Encoding'] = 'gzip'
+    return response
+
+
+def streaming_xml_response(fragments, *, gzip=False, content_type=XML_CONTENT_TYPE):
+    return streaming_text_response(fragments, content_type=content_type, gzip=gzip)
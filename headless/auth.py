@@ -1,52 +1,244 @@
+"""
+Token checks for the delivery and sync APIs.
+
+The settings that drive them (site settings first, then Django settings) are
+read into an immutable per-process ``DeliveryAuthConfig`` snapshot. The
+snapshot is rebuilt when the ``headless:site_setting`` cache namespace is
+bumped (the headless hub does this on save), and at the latest after
+``AUTH_SNAPSHOT_MAX_AGE`` seconds for processes a local-memory cache bump
+cannot reach. The per-request work is one dict lookup on the token digest
+plus ``compare_digest``.
+
+Besides the single delivery token (all read scopes) and the sync token
+(``sync`` scope), several named tokens can be configured, each limited to
+resource types::
+
+    [{"name": "edge", "token": "...", "scopes": ["page", "theme"]}]
+
+in the ``headless_delivery_tokens`` site setting or the
+``HEADLESS_DELIVERY_TOKENS`` Django setting.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
 import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
 
 from django.conf import settings
-from django.core.cache import cache
 from django.http import JsonResponse
 
+from core.cache_namespaces import NAMESPACE_HEADLESS_SETTINGS, namespace_generation
 from public.models import SiteSetting
 
+READ_SCOPES = frozenset({'page', 'dashboard', 'theme', 'content', 'export', 'changes'})
+SYNC_SCOPE = 'sync'
+ALL_SCOPES = READ_SCOPES | {SYNC_SCOPE}
+
+AUTH_SETTING_KEYS = (
+    'headless_delivery_token',
+    'headless_delivery_require_token',
+    'headless_delivery_tokens',
+    'headless_sync_enabled',
+    'headless_sync_token',
+    'headless_sync_max_items',
+)
+# How long a process trusts its copy of the namespace generation before re-checking the cache.
+AUTH_GENERATION_MAX_AGE = 5
+# A snapshot built while the database was unreachable is retried after this many seconds.
+AUTH_RETRY_SECONDS = 30
+# A rotated or cleared token stops working everywhere within this many seconds, bump or not.
+AUTH_SNAPSHOT_MAX_AGE = max(1, int(getattr(settings, 'HEADLESS_AUTH_SNAPSHOT_MAX_AGE', 30)))
+
+
+@dataclass(frozen=True)
+class DeliveryToken:
+    name: str
+    secret: str = field(repr=False)
+    scopes: frozenset
+
+    def allows(self, scope):
+        return scope is None or scope in self.scopes
 
-def _site_setting(key):
-    cache_key = f'headless:site_setting:{key}'
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-    try:
-        row = SiteSetting.objects.filter(key=key).only('value').first()
-        value = (row.value if row else '') or ''
-    except Exception:
-        value = ''
-    cache.set(cache_key, value, 30)
-    return value
+
+@dataclass(frozen=True)
+class DeliveryAuthConfig:
+    generation: int
+    require_token: bool
+    sync_enabled: bool
+    sync_max_items: int
+    # sha256(secret) hex digest -> DeliveryToken
+    tokens: MappingProxyType
+    expires_at: float = float('inf')
+
+    def match(self, provided):
+        if not provided:
+            return None
+        token = self.tokens.get(hashlib.sha256(provided.encode('utf-8')).hexdigest())
+        if token is not None and secrets.compare_digest(token.secret, provided):
+            return token
+        return None
+
+    def has_tokens(self, scope):
+        return any(token.allows(scope) for token in self.tokens.values())
 
 
 def _bool_like(value):
     return str(value or '').strip().lower() in {'1', 'true', 'yes', 'on'}
 
 
-def require_delivery_token(view_func):
-    def wrapped(request, *args, **kwargs):
-        site_expected = _site_setting('headless_delivery_token').strip()
-        env_expected = (getattr(settings, 'HEADLESS_DELIVERY_TOKEN', '') or '').strip()
-        expected = site_expected or env_expected
+def _int_setting(value, default, min_value, max_value):
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        parsed = default
+    return min(max_value, max(min_value, parsed))
+
+
+def parse_named_tokens(raw):
+    """Parse named token definitions (JSON text, list or ``{name: {...}}``) into ``DeliveryToken``s."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw or '[]')
+        except ValueError:
+            return []
+    if isinstance(raw, dict):
+        raw = [{'name': name, **spec} for name, spec in raw.items() if isinstance(spec, dict)]
+    tokens = []
+    for spec in raw if isinstance(raw, list) else ():
+        if not isinstance(spec, dict):
+            continue
+        secret = str(spec.get('token') or '').strip()
+        scopes = spec.get('scopes') or sorted(READ_SCOPES)
+        if isinstance(scopes, str):
+            scopes = [scopes]
+        scopes = frozenset(str(scope).strip() for scope in scopes) & ALL_SCOPES
+        if secret and scopes:
+            tokens.append(DeliveryToken(name=str(spec.get('name') or 'token')[:80], secret=secret, scopes=scopes))
+    return tokens
+
+
+def _build_config(generation):
+    expires_at = time.monotonic() + AUTH_SNAPSHOT_MAX_AGE
+    try:
+        site = dict(SiteSetting.objects.filter(key__in=AUTH_SETTING_KEYS).values_list('key', 'value'))
+    except Exception:
+        site = {}
+        expires_at = time.monotonic() + AUTH_RETRY_SECONDS
 
-        require_site = _bool_like(_site_setting('headless_delivery_require_token'))
-        require_env = _bool_like(getattr(settings, 'HEADLESS_DELIVERY_REQUIRE_TOKEN', False))
-        require_token = require_site or require_env
-        if not require_token:
-            return view_func(request, *args, **kwargs)
+    delivery_secret = (site.get('headless_delivery_token') or '').strip() or (
+        getattr(settings, 'HEADLESS_DELIVERY_TOKEN', '') or ''
+    ).strip()
+    sync_secret = (site.get('headless_sync_token') or '').strip() or (
+        getattr(settings, 'HEADLESS_SYNC_TOKEN', '') or ''
+    ).strip()
+    tokens = []
+    if delivery_secret:
+        tokens.append(DeliveryToken(name='delivery', secret=delivery_secret, scopes=READ_SCOPES))
+    if sync_secret:
+        tokens.append(DeliveryToken(name='sync', secret=sync_secret, scopes=frozenset({SYNC_SCOPE})))
+    tokens.extend(parse_named_tokens(getattr(settings, 'HEADLESS_DELIVERY_TOKENS', None) or []))
+    tokens.extend(parse_named_tokens(site.get('headless_delivery_tokens') or ''))
 
-        if not expected:
+    by_digest = {}
+    for token in tokens:
+        by_digest.setdefault(hashlib.sha256(token.secret.encode('utf-8')).hexdigest(), token)
+
+    return DeliveryAuthConfig(
+        generation=generation,
+        require_token=_bool_like(site.get('headless_delivery_require_token'))
+        or _bool_like(getattr(settings, 'HEADLESS_DELIVERY_REQUIRE_TOKEN', False)),
+        sync_enabled=_bool_like(site.get('headless_sync_enabled'))
+        or _bool_like(getattr(settings, 'HEADLESS_SYNC_ENABLED', False)),
+        sync_max_items=_int_setting(
+            site.get('headless_sync_max_items'),
+            _int_setting(getattr(settings, 'HEADLESS_SYNC_MAX_ITEMS', 250), 250, 1, 5000),
+            1,
+            5000,
+        ),
+        tokens=MappingProxyType(by_digest),
+        expires_at=expires_at,
+    )
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def delivery_auth_config():
+    """The current snapshot, rebuilt after a ``headless:site_setting`` namespace bump."""
+    global _snapshot
+    try:
+        generation = namespace_generation(NAMESPACE_HEADLESS_SETTINGS, max_age=AUTH_GENERATION_MAX_AGE)
+    except Exception:
+        generation = _snapshot.generation if _snapshot is not None else 0
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.generation == generation and time.monotonic() < snapshot.expires_at:
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.generation != generation or time.monotonic() >= snapshot.expires_at:
+            snapshot = _snapshot = _build_config(generation)
+    return snapshot
+
+
+def _provided_token(request):
+    provided = request.META.get('HTTP_X_DELIVERY_TOKEN', '').strip()
+    if not provided:
+        auth = request.META.get('HTTP_AUTHORIZATION', '').strip()
+        if auth[:7].lower() == 'bearer ':
+            provided = auth[7:].strip()
+    return provided
+
+
+def token_allows(request, scope):
+    """Whether the token that authorized *request* covers *scope* (always true when tokens are not required)."""
+    token = getattr(request, 'delivery_token', None)
+    return token is None or token.allows(scope)
+
+
+def _token_error(request, scope):
+    config = delivery_auth_config()
+    request.delivery_token = None
+    if scope == SYNC_SCOPE:
+        if not config.sync_enabled:
+            return JsonResponse({'ok': False, 'error': 'Headless sync is disabled.'}, status=403)
+    elif not config.require_token:
+        return None
+
+    token = config.match(_provided_token(request))
+    if token is None:
+        if not config.has_tokens(SYNC_SCOPE if scope == SYNC_SCOPE else None):
             return JsonResponse({'ok': False, 'error': 'Delivery token is required but not configured.'}, status=503)
+        return JsonResponse({'ok': False, 'error': 'Unauthorized.'}, status=401)
+    if not token.allows(scope):
+        return JsonResponse({'ok': False, 'error': 'Token is not allowed for this resource.'}, status=403)
+    request.delivery_token = token
+    return None
 
-        provided = (request.headers.get('X-Delivery-Token') or '').strip()
-        if not provided:
-            auth = (request.headers.get('Authorization') or '').strip()
-            if auth.lower().startswith('bearer '):
-                provided = auth[7:].strip()
-        if not provided or not secrets.compare_digest(expected, provided):
-            return JsonResponse({'ok': False, 'error': 'Unauthorized.'}, status=401)
-        return view_func(request, *args, **kwargs)
-
-    return wrapped
+
+def require_delivery_token(view_func=None, *, scope=None):
+    """
+    Check the delivery token before *view_func*. With *scope* the token must
+    also cover that resource type; views without one (the batch endpoint)
+    check per item with ``token_allows``.
+    """
+
+    def decorator(func):
+        def wrapped(request, *args, **kwargs):
+            error = _token_error(request, scope)
+            if error is not None:
+                return error
+            return func(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator(view_func) if view_func is not None else decorator
+
+
+def require_sync_token(view_func):
+    """Writes need sync to be enabled and a token with the ``sync`` scope, even when delivery is open."""
+    return require_delivery_token(view_func, scope=SYNC_SCOPE)
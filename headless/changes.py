@@ -0,0 +1,133 @@
+"""
+Change feed over delivered ACP documents.
+
+Every save of a page, dashboard, theme token set or content entry stamps
+``updated_at`` (publish, unpublish and scheduled publishes included), so the
+feed is a merge of the four tables ordered by ``(updated_at, kind, id)``. The
+cursor is that triple, opaque to clients; each response returns the position
+after its last event, so resuming from it never skips or repeats a row.
+
+Rows updated in the last ``CHANGE_FEED_SETTLE_SECONDS`` are held back: a
+transaction that stamped ``updated_at`` before committing could otherwise
+appear behind a cursor that already moved past it. Writers stamp rows before
+larger transactions commit (a sync batch of ``HEADLESS_SYNC_BATCH_SIZE``
+rows, a scheduled-publish batch with its versions and audit rows), so the
+window (``HEADLESS_CHANGE_FEED_SETTLE_SECONDS``, default 30s) must stay well
+above the longest of those; events are delayed by the same amount.
+
+Long polls wait on ``delivery_cache.change_sequence()`` (a cache counter
+bumped on every delivery change) and only query again when it moves, or
+every ``CHANGE_FEED_RECHECK_SECONDS`` to pick up rows that have settled.
+A waiting request holds a sync worker for the whole wait, so long polling
+is off unless ``HEADLESS_CHANGE_FEED_MAX_WAIT`` is set (keep it short and
+size the worker pool for the expected number of subscribers).
+"""
+from __future__ import annotations
+
+import base64
+import heapq
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.utils import utc_now_naive
+from headless.delivery_cache import DELIVERY_KINDS, change_sequence, delivery_item_key
+
+CHANGE_FEED_KINDS = ('page', 'dashboard', 'theme', 'content')
+CHANGE_FEED_LIMIT = 100
+CHANGE_FEED_MAX_WAIT = max(0, int(getattr(settings, 'HEADLESS_CHANGE_FEED_MAX_WAIT', 0)))
+CHANGE_FEED_SETTLE_SECONDS = max(1, int(getattr(settings, 'HEADLESS_CHANGE_FEED_SETTLE_SECONDS', 30)))
+CHANGE_FEED_RECHECK_SECONDS = 5
+CHANGE_FEED_POLL_INTERVAL = 0.5
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    updated_at, kind_index, row_id = position
+    raw = f'{updated_at.isoformat()}|{kind_index}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        updated_at, kind_index, row_id = raw.split('|')
+        return datetime.fromisoformat(updated_at), int(kind_index), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor('Invalid cursor.') from exc
+
+
+def head_position():
+    """A position after every settled row: where a new subscriber starts."""
+    return utc_now_naive() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS), len(CHANGE_FEED_KINDS), 0
+
+
+def _after(kind_index, position):
+    updated_at, cursor_kind, cursor_id = position
+    if kind_index > cursor_kind:
+        return Q(updated_at__gte=updated_at)
+    if kind_index == cursor_kind:
+        return Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=cursor_id)
+    return Q(updated_at__gt=updated_at)
+
+
+def _kind_rows(kind, position, cutoff, limit):
+    spec = DELIVERY_KINDS[kind]
+    query = spec['model'].objects.filter(_after(CHANGE_FEED_KINDS.index(kind), position), updated_at__lte=cutoff)
+    if spec.get('select_related'):
+        query = query.select_related(*spec['select_related'])
+    return list(query.order_by('updated_at', 'id')[:limit])
+
+
+def _event(kind, row):
+    published = row.status == 'published'
+    return {
+        'cursor': encode_cursor((row.updated_at, CHANGE_FEED_KINDS.index(kind), row.id)),
+        'type': kind,
+        'key': '/'.join(str(part) for part in delivery_item_key(kind, row)),
+        'id': row.id,
+        'event': 'published' if published else 'unpublished',
+        'status': row.status,
+        'updated_at': row.updated_at.isoformat(),
+        'published_at': row.published_at.isoformat() if row.published_at else None,
+    }
+
+
+def collect_changes(position, *, kinds=CHANGE_FEED_KINDS, limit=CHANGE_FEED_LIMIT):
+    """Return ``(events, next_position, has_more)`` for settled rows after *position*."""
+    cutoff = utc_now_naive() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    streams = []
+    for kind in kinds:
+        kind_index = CHANGE_FEED_KINDS.index(kind)
+        rows = _kind_rows(kind, position, cutoff, limit + 1)
+        streams.append([((row.updated_at, kind_index, row.id), kind, row) for row in rows])
+    merged = list(heapq.merge(*streams, key=lambda entry: entry[0]))
+    events = [_event(kind, row) for _, kind, row in merged[:limit]]
+    if len(merged) > limit:
+        return events, merged[limit - 1][0], True
+    if merged:
+        return events, merged[-1][0], False
+    # Nothing new: move up to the cutoff so later queries stay on the index tail.
+    return events, max(position, (cutoff, -1, 0)), False
+
+
+def wait_for_changes(position, *, wait, kinds=CHANGE_FEED_KINDS, limit=CHANGE_FEED_LIMIT):
+    """``collect_changes``, blocking up to *wait* seconds until there is at least one event."""
+    deadline = time.monotonic() + max(0, wait)
+    while True:
+        sequence = change_sequence()
+        events, next_position, has_more = collect_changes(position, kinds=kinds, limit=limit)
+        if events or time.monotonic() >= deadline:
+            return events, next_position, has_more
+        position = next_position
+        recheck_at = min(deadline, time.monotonic() + CHANGE_FEED_RECHECK_SECONDS)
+        while time.monotonic() < recheck_at and change_sequence() == sequence:
+            time.sleep(CHANGE_FEED_POLL_INTERVAL)
+        if change_sequence() != sequence:
+            # Let the new row settle before querying for it.
+            time.sleep(max(0, min(CHANGE_FEED_SETTLE_SECONDS, deadline - time.monotonic())))
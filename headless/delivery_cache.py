@@ -0,0 +1,302 @@
+"""
+Read-through cache of published delivery documents.
+
+Each published ACP page, dashboard, theme token set and content entry is stored
+as ready-to-send JSON bytes (with precompressed variants, see
+``core.compressed_responses``) under a key that includes its ``published_at``
+and ``updated_at``. A small pointer key maps ``(kind, key)`` to the current
+document, so a delivery request is two cache reads and no query or JSON
+encoding. ACP saves and publish actions call ``refresh_delivery_document`` to
+rebuild the pointer and document right away; entries otherwise expire after
+``DELIVERY_CACHE_TTL``.
+"""
+from __future__ import annotations
+
+import json
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from acp.models import AcpContentEntry, AcpDashboardDocument, AcpPageDocument, AcpThemeTokenSet
+from core.cache_namespaces import NAMESPACE_DELIVERY, bump_namespaces, namespaced_key
+from core.compressed_responses import http_timestamp, response_variants
+
+DELIVERY_CACHE_TTL = max(60, int(getattr(settings, 'DELIVERY_CACHE_TTL', 24 * 60 * 60)))
+# Unknown or unpublished documents are remembered briefly so polling a 404 stays cheap.
+DELIVERY_MISSING_TTL = 30
+_MISSING = '-'
+# Bumped on every delivery change so change-feed long polls can wait on a cache read.
+CHANGE_SEQUENCE_KEY = 'delivery:change-seq'
+
+
+def load_json(raw, fallback):
+    try:
+        data = json.loads(raw or '')
+    except (TypeError, ValueError):
+        return fallback
+    if isinstance(fallback, dict) and isinstance(data, dict):
+        return data
+    if isinstance(fallback, list) and isinstance(data, list):
+        return data
+    return fallback
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _page_payload(item, key):
+    return {
+        'id': item.id,
+        'slug': item.slug,
+        'title': item.title,
+        'template_id': item.template_id,
+        'locale': item.locale,
+        'status': item.status,
+        'seo': load_json(item.seo_json, {}),
+        'blocks_tree': load_json(item.blocks_tree, {}),
+        'theme_override': load_json(item.theme_override_json, {}),
+        'published_at': _isoformat(item.published_at),
+        'updated_at': _isoformat(item.updated_at),
+    }
+
+
+def _dashboard_payload(item, key):
+    return {
+        'id': item.id,
+        'dashboard_id': item.dashboard_id,
+        'title': item.title,
+        'route': item.route,
+        'layout_type': item.layout_type,
+        'status': item.status,
+        'layout_config': load_json(item.layout_config_json, {}),
+        'widgets': load_json(item.widgets_json, []),
+        'global_filters': load_json(item.global_filters_json, []),
+        'role_visibility': load_json(item.role_visibility_json, {}),
+        'published_at': _isoformat(item.published_at),
+        'updated_at': _isoformat(item.updated_at),
+    }
+
+
+def _theme_payload(item, key):
+    return {
+        'id': item.id,
+        'key': item.key,
+        'name': item.name,
+        'status': item.status,
+        'tokens': load_json(item.tokens_json, {}),
+        'published_at': _isoformat(item.published_at),
+        'updated_at': _isoformat(item.updated_at),
+    }
+
+
+def _content_payload(item, key):
+    content_type_key = key[0]
+    return {
+        'id': item.id,
+        'content_type_key': item.content_type.key if item.content_type else content_type_key,
+        'entry_key': item.entry_key,
+        'title': item.title,
+        'locale': item.locale,
+        'status': item.status,
+        'data': load_json(item.data_json, {}),
+        'published_at': _isoformat(item.published_at),
+        'updated_at': _isoformat(item.updated_at),
+    }
+
+
+# kind: model, lookup fields for the key parts, response field, payload builder.
+DELIVERY_KINDS = {
+    'page': {'model': AcpPageDocument, 'lookups': ('slug',), 'field': 'page', 'payload': _page_payload},
+    'dashboard': {
+        'model': AcpDashboardDocument,
+        'lookups': ('dashboard_id',),
+        'field': 'dashboard',
+        'payload': _dashboard_payload,
+    },
+    'theme': {'model': AcpThemeTokenSet, 'lookups': ('key',), 'field': 'theme', 'payload': _theme_payload},
+    'content': {
+        'model': AcpContentEntry,
+        'lookups': ('content_type__key', 'entry_key'),
+        'field': 'entry',
+        'payload': _content_payload,
+        'select_related': ('content_type',),
+        # Several locales may share a key; the most recently updated one wins.
+        'ordering': ('-updated_at', '-id'),
+    },
+}
+
+
+def _query(kind, filters, allow_unpublished):
+    spec = DELIVERY_KINDS[kind]
+    query = spec['model'].objects.filter(**filters)
+    if spec.get('select_related'):
+        query = query.select_related(*spec['select_related'])
+    if not allow_unpublished:
+        query = query.filter(status='published')
+    if spec.get('ordering'):
+        query = query.order_by(*spec['ordering'])
+    return query
+
+
+def delivery_item_key(kind, item):
+    parts = []
+    for lookup in DELIVERY_KINDS[kind]['lookups']:
+        value = item
+        for attr in lookup.split('__'):
+            value = getattr(value, attr, None)
+        parts.append(value)
+    return tuple(parts)
+
+
+def load_delivery_item(kind, *key, allow_unpublished=False):
+    filters = dict(zip(DELIVERY_KINDS[kind]['lookups'], key))
+    return _query(kind, filters, allow_unpublished).first()
+
+
+def load_delivery_items(kind, keys, *, allow_unpublished=False):
+    """Resolve many keys of one kind with a single query; returns ``{key: item}`` for the ones found."""
+    keys = {tuple(key) for key in keys}
+    if not keys:
+        return {}
+    lookups = DELIVERY_KINDS[kind]['lookups']
+    filters = {f'{lookup}__in': sorted({key[index] for key in keys}) for index, lookup in enumerate(lookups)}
+    found = {}
+    for item in _query(kind, filters, allow_unpublished):
+        key = delivery_item_key(kind, item)
+        if key in keys:
+            found.setdefault(key, item)
+    return found
+
+
+def delivery_body(kind, item, key):
+    """Serialize *item* exactly as the delivery endpoint returns it."""
+    spec = DELIVERY_KINDS[kind]
+    return json.dumps({'ok': True, spec['field']: spec['payload'](item, key)}, cls=DjangoJSONEncoder)
+
+
+def _pointer_key(kind, key):
+    return namespaced_key(NAMESPACE_DELIVERY, f'{kind}:' + '/'.join(quote(str(part), safe='') for part in key))
+
+
+def _document_key(pointer_key, version):
+    return f'{pointer_key}:{version}'
+
+
+def _document_version(item):
+    return f'{_isoformat(item.published_at) or "unpublished"}:{_isoformat(item.updated_at) or "static"}'
+
+
+def _cache_set(key, value, ttl):
+    try:
+        cache.set(key, value, ttl)
+    except Exception:
+        pass
+
+
+def _store(kind, key, item):
+    pointer_key = _pointer_key(kind, key)
+    if item is None:
+        _cache_set(pointer_key, _MISSING, DELIVERY_MISSING_TTL)
+        return None
+    variants = response_variants(
+        delivery_body(kind, item, key),
+        'application/json',
+        last_modified=http_timestamp(item.updated_at or item.published_at),
+    )
+    version = _document_version(item)
+    _cache_set(_document_key(pointer_key, version), variants, DELIVERY_CACHE_TTL)
+    _cache_set(pointer_key, version, DELIVERY_CACHE_TTL)
+    return variants
+
+
+def refresh_delivery_document(kind, *key):
+    """Rebuild the cached document for ``(kind, key)``; returns its variants or ``None``."""
+    return _store(kind, key, load_delivery_item(kind, *key))
+
+
+def delivery_variants(kind, *key):
+    """Cached response variants for the published ``(kind, key)`` document, or ``None`` if there is none."""
+    pointer_key = _pointer_key(kind, key)
+    try:
+        version = cache.get(pointer_key)
+        if version == _MISSING:
+            return None
+        if version is not None:
+            variants = cache.get(_document_key(pointer_key, version))
+            if variants is not None:
+                return variants
+    except Exception:
+        pass
+    return refresh_delivery_document(kind, *key)
+
+
+def delivery_variants_many(kind, keys):
+    """
+    Batch form of ``delivery_variants``: two ``get_many`` round trips for the
+    cached documents and one query for everything that was not cached.
+    """
+    keys = list(dict.fromkeys(tuple(key) for key in keys))
+    pointer_keys = {key: _pointer_key(kind, key) for key in keys}
+    result = {}
+    try:
+        versions = cache.get_many(list(pointer_keys.values()))
+        document_keys = {}
+        for key, pointer_key in pointer_keys.items():
+            version = versions.get(pointer_key)
+            if version == _MISSING:
+                result[key] = None
+            elif version is not None:
+                document_keys[key] = _document_key(pointer_key, version)
+        documents = cache.get_many(list(document_keys.values())) if document_keys else {}
+        for key, document_key in document_keys.items():
+            if documents.get(document_key) is not None:
+                result[key] = documents[document_key]
+    except Exception:
+        result = {}
+
+    missing = [key for key in keys if key not in result]
+    if missing:
+        found = load_delivery_items(kind, missing)
+        for key in missing:
+            result[key] = _store(kind, key, found.get(key))
+    return result
+
+
+def change_sequence():
+    try:
+        return cache.get(CHANGE_SEQUENCE_KEY, 0)
+    except Exception:
+        return 0
+
+
+def note_delivery_change():
+    try:
+        cache.incr(CHANGE_SEQUENCE_KEY)
+    except ValueError:
+        cache.add(CHANGE_SEQUENCE_KEY, 1, None)
+    except Exception:
+        pass
+
+
+def refresh_delivery_documents(kind, *keys):
+    """Refresh several keys of one kind (e.g. the old and new slug after a rename)."""
+    note_delivery_change()
+    seen = set()
+    for key in keys:
+        key = key if isinstance(key, tuple) else (key,)
+        # An empty tuple (no previous key) would otherwise pass all() and refresh unfiltered.
+        if not key or not all(key) or key in seen:
+            continue
+        seen.add(key)
+        try:
+            refresh_delivery_document(kind, *key)
+        except Exception:
+            pass
+
+
+def invalidate_delivery_cache():
+    bump_namespaces(NAMESPACE_DELIVERY)
+    note_delivery_change()
@@ -0,0 +1,206 @@
+"""
+Bulk NDJSON export of published content for mirroring into edge caches.
+
+Every published ACP page, dashboard, theme token set and content entry, plus
+published services, industries and posts, is written as one JSON object per
+line::
+
+    {"type": "page", "key": "home", "data": {...}}
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` (a server-side cursor
+on PostgreSQL) and encoded one at a time, so memory stays flat however large
+the export is. The last line is an ``export`` record whose ``generated_at``
+can be passed back as ``since`` to fetch only rows updated afterwards.
+
+A ``since`` export also reports the rows updated since then that are no
+longer published (unpublished, archived or trashed), so a mirror built from
+incremental exports can drop them::
+
+    {"type": "page", "key": "home", "removed": true}
+
+Content entries of several locales share a key, so a key is only reported
+while no published row still carries it. Hard-deleted rows and renamed
+slugs leave nothing to query and are never reported; mirrors need a periodic
+full export to drop those.
+"""
+from __future__ import annotations
+
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from acp.models import AcpContentEntry, AcpDashboardDocument, AcpPageDocument, AcpThemeTokenSet
+from core.constants import WORKFLOW_PUBLISHED
+from core.utils import utc_now_naive
+from headless.delivery_cache import DELIVERY_KINDS, delivery_item_key, load_delivery_items, load_json
+from public.models import Industry, Post, Service
+
+EXPORT_CHUNK_SIZE = max(50, int(getattr(settings, 'HEADLESS_EXPORT_CHUNK_SIZE', 500)))
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+PUBLISHED_LIVE = Q(workflow_status=WORKFLOW_PUBLISHED) & (Q(is_trashed=False) | Q(is_trashed__isnull=True))
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _published_rows(model):
+    return model.objects.filter(PUBLISHED_LIVE)
+
+
+def _seo(row):
+    return {'title': row.seo_title or '', 'description': row.seo_description or '', 'og_image': row.og_image or ''}
+
+
+def _service_payload(row):
+    return {
+        'id': row.id,
+        'slug': row.slug,
+        'title': row.title,
+        'description': row.description,
+        'icon_class': row.icon_class or '',
+        'image': row.image or '',
+        'service_type': row.service_type or '',
+        'is_featured': bool(row.is_featured),
+        'sort_order': row.sort_order or 0,
+        'profile': load_json(row.profile_json, {}),
+        'seo': _seo(row),
+        'published_at': _isoformat(row.published_at),
+        'updated_at': _isoformat(row.updated_at),
+    }
+
+
+def _industry_payload(row):
+    return {
+        'id': row.id,
+        'slug': row.slug,
+        'title': row.title,
+        'description': row.description,
+        'icon_class': row.icon_class or '',
+        'hero_description': row.hero_description or '',
+        'challenges': row.challenges or '',
+        'solutions': row.solutions or '',
+        'stats': row.stats or '',
+        'sort_order': row.sort_order or 0,
+        'seo': _seo(row),
+        'published_at': _isoformat(row.published_at),
+        'updated_at': _isoformat(row.updated_at),
+    }
+
+
+def _post_payload(row):
+    return {
+        'id': row.id,
+        'slug': row.slug,
+        'title': row.title,
+        'excerpt': row.excerpt or '',
+        'content': row.content,
+        'featured_image': row.featured_image or '',
+        'category': row.category.name if row.category_id and row.category else '',
+        'seo': _seo(row),
+        'published_at': _isoformat(row.published_at),
+        'created_at': _isoformat(row.created_at),
+        'updated_at': _isoformat(row.updated_at),
+    }
+
+
+def _joined_key(key):
+    return '/'.join(str(part) for part in key)
+
+
+def _acp_section(kind, model):
+    related = DELIVERY_KINDS[kind].get('select_related')
+
+    def rows():
+        query = model.objects.filter(status='published')
+        return query.select_related(*related) if related else query
+
+    def withdrawn():
+        query = model.objects.exclude(status='published')
+        return query.select_related(*related) if related else query
+
+    def record(item):
+        key = delivery_item_key(kind, item)
+        return _joined_key(key), DELIVERY_KINDS[kind]['payload'](item, key)
+
+    def removed_keys(items):
+        keys = {delivery_item_key(kind, item) for item in items}
+        live = load_delivery_items(kind, keys)
+        return {_joined_key(key) for key in keys if key not in live}
+
+    return kind, rows, record, withdrawn, removed_keys
+
+
+def _public_section(kind, model, payload, related=()):
+    def rows():
+        query = _published_rows(model)
+        return query.select_related(*related) if related else query
+
+    def withdrawn():
+        return model.objects.exclude(PUBLISHED_LIVE)
+
+    def removed_keys(items):
+        slugs = {item.slug for item in items}
+        live = set(_published_rows(model).filter(slug__in=slugs).values_list('slug', flat=True))
+        return slugs - live
+
+    return kind, rows, lambda row: (row.slug, payload(row)), withdrawn, removed_keys
+
+
+# (type, published queryset factory, row -> (key, data), unpublished queryset factory,
+#  unpublished rows -> keys with no published row left); exported in this order.
+EXPORT_SECTIONS = (
+    _acp_section('theme', AcpThemeTokenSet),
+    _acp_section('page', AcpPageDocument),
+    _acp_section('dashboard', AcpDashboardDocument),
+    _acp_section('content', AcpContentEntry),
+    _public_section('service', Service, _service_payload),
+    _public_section('industry', Industry, _industry_payload),
+    _public_section('post', Post, _post_payload, related=('category',)),
+)
+EXPORT_TYPES = tuple(section[0] for section in EXPORT_SECTIONS)
+
+
+def _line(record):
+    return json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+
+
+def _removal_lines(kind, withdrawn, removed_keys, since):
+    """Yield a removal record for each key unpublished at or after *since*; returns how many were written."""
+    reported = set()
+    rows = withdrawn().filter(updated_at__gte=since).order_by('id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    # Checked a chunk at a time so the "still published" lookup stays one bounded query.
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        for key in sorted(removed_keys(chunk) - reported):
+            reported.add(key)
+            yield _line({'type': kind, 'key': key, 'removed': True})
+    return len(reported)
+
+
+def iter_export_lines(*, since=None, types=None):
+    """Yield the NDJSON lines of an export; *since* limits it to rows updated at or after that time."""
+    # Taken before the first query so rows updated mid-export are picked up next time.
+    generated_at = utc_now_naive()
+    counts = {}
+    removed = {}
+    for kind, rows, record, withdrawn, removed_keys in EXPORT_SECTIONS:
+        if types and kind not in types:
+            continue
+        query = rows()
+        if since is not None:
+            query = query.filter(updated_at__gte=since)
+        count = 0
+        for row in query.order_by('id').iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            key, data = record(row)
+            yield _line({'type': kind, 'key': key, 'data': data})
+            count += 1
+        counts[kind] = count
+        if since is not None:
+            removed[kind] = yield from _removal_lines(kind, withdrawn, removed_keys, since)
+    trailer = {'type': 'export', 'generated_at': _isoformat(generated_at), 'since': _isoformat(since), 'counts': counts}
+    if since is not None:
+        trailer['removed'] = removed
+    yield _line(trailer)
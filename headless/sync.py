@@ -0,0 +1,333 @@
+"""
+Bulk upsert of ACP content entries and page documents pushed from upstream.
+
+The request body is either NDJSON (one record per line, read as it streams
+in) or a JSON array / ``{"records": [...]}`` object. Records look like::
+
+    {"type": "content", "content_type": "faq", "entry_key": "shipping",
+     "locale": "en-US", "title": "Shipping", "status": "published", "data": {...}}
+    {"type": "page", "slug": "home", "title": "Home", "status": "draft",
+     "seo": {...}, "blocks_tree": {...}, "theme_override": {...}}
+
+Records are processed in batches of ``SYNC_BATCH_SIZE``: every batch costs one
+lookup query per record type, one ``bulk_create`` and one ``bulk_update`` per
+model and one ``bulk_create`` of version rows, inside a single transaction.
+Content entry data is validated against its type's ``schema_json`` and
+records whose fields already match the stored row are reported as
+``unchanged`` without a write. Each record gets its own result.
+"""
+from __future__ import annotations
+
+import json
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Max
+
+from acp.documents import coerce_slug, content_entry_snapshot, page_snapshot
+from acp.models import (
+    AcpContentEntry,
+    AcpContentEntryVersion,
+    AcpContentType,
+    AcpPageDocument,
+    AcpPageVersion,
+)
+from acp.schema import schema_errors
+from acp.views.common import load_json, maybe_mark_published, normalize_status
+from core.utils import clean_text, parse_iso_datetime, utc_now_naive
+
+SYNC_BATCH_SIZE = max(1, int(getattr(settings, 'HEADLESS_SYNC_BATCH_SIZE', 500)))
+SYNC_CHANGE_NOTE = 'Headless sync'
+
+_INVALID_JSON = object()
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPayloadError(ValueError):
+    pass
+
+
+def iter_payload_records(request):
+    """Yield the records in the request body; unparseable NDJSON lines yield ``_INVALID_JSON``."""
+    if 'ndjson' in (request.content_type or '') or 'jsonlines' in (request.content_type or ''):
+        for line in request:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield _INVALID_JSON
+        return
+
+    try:
+        data = json.loads(request.read() or b'[]')
+    except ValueError:
+        raise SyncPayloadError('Request body must be JSON or NDJSON.')
+    records = data.get('records') if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        raise SyncPayloadError('Expected a JSON array or a "records" list.')
+    yield from records
+
+
+def _json_field(record, name):
+    value = record.get(name, {})
+    if value is None:
+        value = {}
+    if not isinstance(value, dict):
+        return None, f'"{name}" must be an object.'
+    return value, ''
+
+
+def _common_fields(record):
+    status = normalize_status(record.get('status'))
+    scheduled_publish_at = None
+    if record.get('scheduled_publish_at'):
+        scheduled_publish_at = parse_iso_datetime(record['scheduled_publish_at'])
+        if scheduled_publish_at is None:
+            return None, 'Invalid scheduled_publish_at.'
+    return {
+        'title': clean_text(str(record.get('title') or ''), 220),
+        'locale': clean_text(str(record.get('locale') or ''), 20) or 'en-US',
+        'status': status,
+        'scheduled_publish_at': scheduled_publish_at,
+    }, ''
+
+
+def _prepare_content(record, content_types):
+    content_type = content_types.get(str(record.get('content_type') or ''))
+    if content_type is None:
+        return None, None, 'Unknown content type.'
+    fields, error = _common_fields(record)
+    if error:
+        return None, None, error
+    entry_key = clean_text(str(record.get('entry_key') or ''), 140)
+    if not entry_key or not fields['title']:
+        return None, None, 'Entry key and title are required.'
+    data, error = _json_field(record, 'data')
+    if error:
+        return None, None, error
+    errors = schema_errors(data, load_json(content_type.schema_json, {}))
+    if errors:
+        return None, None, 'Schema validation failed: ' + ' '.join(errors[:5])
+    fields.update(content_type_id=content_type.id, entry_key=entry_key, data_json=data)
+    return (content_type.id, entry_key, fields['locale']), fields, ''
+
+
+def _prepare_page(record):
+    fields, error = _common_fields(record)
+    if error:
+        return None, None, error
+    slug = coerce_slug(str(record.get('slug') or ''))
+    if not slug or not fields['title']:
+        return None, None, 'Slug and title are required.'
+    for name, column in (('seo', 'seo_json'), ('blocks_tree', 'blocks_tree'), ('theme_override', 'theme_override_json')):
+        value, error = _json_field(record, name)
+        if error:
+            return None, None, error
+        fields[column] = value
+    fields.update(slug=slug, template_id=clean_text(str(record.get('template_id') or ''), 120) or 'default-page')
+    return slug, fields, ''
+
+
+# type: model, JSON columns, version model and its foreign key, snapshot, identity of a row.
+SYNC_TYPES = {
+    'content': {
+        'model': AcpContentEntry,
+        'json_fields': ('data_json',),
+        'version_model': AcpContentEntryVersion,
+        'version_fk': 'content_entry_id',
+        'snapshot': content_entry_snapshot,
+        'identity': lambda row: (row.content_type_id, row.entry_key, row.locale),
+    },
+    'page': {
+        'model': AcpPageDocument,
+        'json_fields': ('seo_json', 'blocks_tree', 'theme_override_json'),
+        'version_model': AcpPageVersion,
+        'version_fk': 'page_id',
+        'snapshot': page_snapshot,
+        'identity': lambda row: row.slug,
+    },
+}
+
+
+def _existing_rows(kind, identities):
+    if not identities:
+        return {}
+    if kind == 'content':
+        query = AcpContentEntry.objects.filter(
+            content_type_id__in={identity[0] for identity in identities},
+            entry_key__in={identity[1] for identity in identities},
+        )
+    else:
+        query = AcpPageDocument.objects.filter(slug__in=identities)
+    identity_of = SYNC_TYPES[kind]['identity']
+    return {identity_of(row): row for row in query if identity_of(row) in identities}
+
+
+def _unchanged(kind, row, fields):
+    json_fields = SYNC_TYPES[kind]['json_fields']
+    for name, value in fields.items():
+        current = getattr(row, name)
+        if name in json_fields:
+            current = load_json(current, {})
+        if current != value:
+            return False
+    return True
+
+
+def _write_versions(kind, rows, user_id, now):
+    spec = SYNC_TYPES[kind]
+    fk = spec['version_fk']
+    latest = dict(
+        spec['version_model'].objects.filter(**{f'{fk}__in': [row.id for row in rows]})
+        .values_list(fk)
+        .annotate(top=Max('version_number'))
+    )
+    spec['version_model'].objects.bulk_create(
+        [
+            spec['version_model'](
+                **{fk: row.id},
+                version_number=(latest.get(row.id) or 0) + 1,
+                snapshot_json=json.dumps(spec['snapshot'](row), ensure_ascii=False),
+                change_note=SYNC_CHANGE_NOTE,
+                created_by_id=user_id,
+                created_at=now,
+            )
+            for row in rows
+        ],
+        batch_size=SYNC_BATCH_SIZE,
+    )
+
+
+def _result_key(kind, record, identity):
+    if kind == 'content':
+        return f'{record.get("content_type") or ""}/{record.get("entry_key") or ""}'
+    if kind == 'page':
+        return identity or str(record.get('slug') or '')
+    return ''
+
+
+class SyncRun:
+    """Accumulates per-record results while records are fed in batches."""
+
+    def __init__(self, user_id=None, max_records=250):
+        self.user_id = user_id
+        self.max_records = max_records
+        self.results = []
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'error': 0}
+        self.changed = {kind: set() for kind in SYNC_TYPES}
+        self._content_types = {}
+
+    def _result(self, index, kind, key, status, *, id=None, error=''):
+        result = {'index': index, 'type': kind, 'key': key, 'status': status}
+        if id is not None:
+            result['id'] = id
+        if error:
+            result['error'] = error
+        self.counts[status] += 1
+        self.results.append(result)
+
+    def _load_content_types(self, batch):
+        wanted = {
+            str(record.get('content_type') or '')
+            for _, record in batch
+            if isinstance(record, dict) and record.get('type') == 'content'
+        } - set(self._content_types)
+        if wanted:
+            found = {row.key: row for row in AcpContentType.objects.filter(key__in=wanted, is_enabled=True)}
+            # Unknown keys are remembered too, so later batches do not look them up again.
+            self._content_types.update({key: found.get(key) for key in wanted})
+
+    def run(self, records):
+        batch = []
+        for index, record in enumerate(records):
+            if index >= self.max_records:
+                self._result(index, '', '', 'error', error=f'Record limit of {self.max_records} reached; the rest was ignored.')
+                break
+            batch.append((index, record))
+            if len(batch) >= SYNC_BATCH_SIZE:
+                self.apply_batch(batch)
+                batch = []
+        if batch:
+            self.apply_batch(batch)
+        self.results.sort(key=lambda result: result['index'])
+        return self
+
+    def apply_batch(self, batch):
+        self._load_content_types(batch)
+        prepared = {kind: {} for kind in SYNC_TYPES}
+        for index, record in batch:
+            if record is _INVALID_JSON or not isinstance(record, dict):
+                self._result(index, '', '', 'error', error='Record must be a JSON object.')
+                continue
+            kind = record.get('type')
+            if kind == 'content':
+                identity, fields, error = _prepare_content(record, self._content_types)
+            elif kind == 'page':
+                identity, fields, error = _prepare_page(record)
+            else:
+                identity, fields, error = None, None, 'Unknown record type.'
+            key = _result_key(kind, record, identity)
+            if not error and identity in prepared[kind]:
+                error = 'Duplicate record in batch.'
+            if error:
+                self._result(index, kind or '', key, 'error', error=error)
+                continue
+            prepared[kind][identity] = (index, key, fields)
+
+        pending = []
+        for kind, items in prepared.items():
+            existing = _existing_rows(kind, set(items))
+            creates, updates = [], []
+            for identity, (index, key, fields) in items.items():
+                row = existing.get(identity)
+                if row is not None and _unchanged(kind, row, fields):
+                    self._result(index, kind, key, 'unchanged', id=row.id)
+                    continue
+                target = row if row is not None else SYNC_TYPES[kind]['model'](created_by_id=self.user_id)
+                for name, value in fields.items():
+                    if name in SYNC_TYPES[kind]['json_fields']:
+                        value = json.dumps(value, ensure_ascii=False)
+                    setattr(target, name, value)
+                target.updated_by_id = self.user_id
+                maybe_mark_published(target, fields['status'], fields['scheduled_publish_at'])
+                (updates if row is not None else creates).append(target)
+                pending.append((index, kind, key, target, 'updated' if row is not None else 'created'))
+            prepared[kind] = (creates, updates)
+
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                # Stamped here, so a batch that waited on a lock is not written with an older time.
+                now = utc_now_naive()
+                for _, _, _, target, status in pending:
+                    target.updated_at = now
+                    if status == 'created':
+                        target.created_at = now
+                for kind, (creates, updates) in prepared.items():
+                    model = SYNC_TYPES[kind]['model']
+                    if creates:
+                        model.objects.bulk_create(creates, batch_size=SYNC_BATCH_SIZE)
+                    if updates:
+                        fields = [
+                            field.attname
+                            for field in model._meta.concrete_fields
+                            if not field.primary_key and field.attname not in {'created_by_id', 'created_at'}
+                        ]
+                        model.objects.bulk_update(updates, fields, batch_size=SYNC_BATCH_SIZE)
+                    if creates or updates:
+                        _write_versions(kind, creates + updates, self.user_id, now)
+        except (IntegrityError, DatabaseError) as exc:
+            logger.exception('Headless sync batch of %s records could not be saved', len(pending))
+            error = f'Batch could not be saved ({exc.__class__.__name__}: {clean_text(str(exc), 200)}).'
+            for index, kind, key, _, _ in pending:
+                self._result(index, kind, key, 'error', error=error)
+            return
+        for index, kind, key, target, status in pending:
+            self.changed[kind].add(key)
+            self._result(index, kind, key, status, id=target.id)
+
@@ -1,9 +1,25 @@
-from django.test import Client, SimpleTestCase
+import gzip
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import IntegrityError
+from django.test import Client, SimpleTestCase, override_settings
+
+from acp.models import AcpContentEntry
+from acp.schema import schema_errors
+from core.cache_namespaces import NAMESPACE_HEADLESS_SETTINGS, bump_namespaces
+from headless import changes
+from headless.auth import AUTH_SNAPSHOT_MAX_AGE, delivery_auth_config
+from headless.delivery_cache import invalidate_delivery_cache, note_delivery_change, refresh_delivery_documents
+from headless.sync import SyncRun
 
 
 class HeadlessApiTests(SimpleTestCase):
     def setUp(self):
         self.client = Client()
+        invalidate_delivery_cache()
 
     def test_health_endpoint_returns_ok_json(self):
         response = self.client.get('/api/health')
@@ -19,3 +35,317 @@ class HeadlessApiTests(SimpleTestCase):
         payload = response.json()
         self.assertTrue(payload.get('ok'))
         self.assertEqual(payload.get('endpoint'), 'delivery_index')
+
+    @patch('headless.delivery_cache.AcpThemeTokenSet.objects.filter')
+    def test_delivery_theme_is_compressed_and_revalidates(self, filter_mock):
+        item = SimpleNamespace(
+            id=3,
+            key='brand',
+            name='Brand',
+            status='published',
+            tokens_json=json.dumps({f'color-{index}': '#0b5fff' for index in range(40)}),
+            published_at=datetime(2026, 3, 1, 8, 0),
+            updated_at=datetime(2026, 3, 2, 8, 0),
+        )
+        filter_mock.return_value.filter.return_value.first.return_value = item
+
+        response = self.client.get('/api/delivery/theme/brand', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['Last-Modified'], 'Mon, 02 Mar 2026 08:00:00 GMT')
+        payload = json.loads(gzip.decompress(response.content))
+        self.assertEqual(payload['theme']['key'], 'brand')
+
+        revalidated = self.client.get(
+            '/api/delivery/theme/brand',
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+
+        identity = self.client.get('/api/delivery/theme/brand')
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertNotEqual(identity['ETag'], response['ETag'])
+
+    @patch('headless.delivery_cache.AcpPageDocument.objects.filter')
+    def test_delivery_page_is_served_from_cache_until_refreshed(self, filter_mock):
+        item = SimpleNamespace(
+            id=8,
+            slug='home',
+            title='Home',
+            template_id='default-page',
+            locale='en-US',
+            status='published',
+            seo_json='{"title": "Home"}',
+            blocks_tree='{"children": []}',
+            theme_override_json='{}',
+            published_at=datetime(2026, 3, 1, 8, 0),
+            updated_at=datetime(2026, 3, 1, 8, 0),
+        )
+        filter_mock.return_value.filter.return_value.first.return_value = item
+
+        first = self.client.get('/api/delivery/page/home')
+        self.assertEqual(first.json()['page']['seo'], {'title': 'Home'})
+        self.client.get('/api/delivery/page/home')
+        self.assertEqual(filter_mock.call_count, 1)
+
+        item.title = 'Home v2'
+        item.updated_at = datetime(2026, 3, 2, 8, 0)
+        refresh_delivery_documents('page', 'home')
+        refreshed = self.client.get('/api/delivery/page/home')
+        self.assertEqual(refreshed.json()['page']['title'], 'Home v2')
+        self.assertNotEqual(refreshed['ETag'], first['ETag'])
+
+        filter_mock.return_value.filter.return_value.first.return_value = None
+        refresh_delivery_documents('page', 'home')
+        self.assertEqual(self.client.get('/api/delivery/page/home').status_code, 404)
+
+    @patch('headless.delivery_cache.refresh_delivery_document')
+    def test_refresh_skips_missing_and_empty_keys(self, refresh_mock):
+        refresh_delivery_documents('content', (), None, ('faq', ''), ('faq', 'returns'), ('faq', 'returns'))
+
+        refresh_mock.assert_called_once_with('content', 'faq', 'returns')
+
+    @patch('headless.delivery_cache.AcpThemeTokenSet.objects.filter')
+    @patch('headless.delivery_cache.AcpPageDocument.objects.filter')
+    def test_delivery_batch_resolves_each_kind_with_one_query(self, page_filter, theme_filter):
+        stamp = datetime(2026, 3, 1, 8, 0)
+        pages = [
+            SimpleNamespace(
+                id=index,
+                slug=slug,
+                title=slug.title(),
+                template_id='default-page',
+                locale='en-US',
+                status='published',
+                seo_json='{}',
+                blocks_tree='{}',
+                theme_override_json='{}',
+                published_at=stamp,
+                updated_at=stamp,
+            )
+            for index, slug in enumerate(('home', 'about'), start=1)
+        ]
+        page_filter.return_value.filter.return_value = pages
+        theme_filter.return_value.filter.return_value = []
+
+        response = self.client.post(
+            '/api/delivery/batch',
+            data=json.dumps({'resources': ['page:home', {'type': 'page', 'key': 'about'}, 'theme:brand', 'page:home']}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        items = response.json()['items']
+        self.assertEqual([item['status'] for item in items], [200, 200, 404, 200])
+        self.assertEqual(items[1]['document']['page']['title'], 'About')
+        page_filter.assert_called_once_with(slug__in=['about', 'home'])
+        self.assertEqual(theme_filter.call_count, 1)
+
+        # Now cached: no further queries, and the byte cap applies per item.
+        with patch('headless.views.DELIVERY_BATCH_MAX_BYTES', len(self.client.get('/api/delivery/page/home').content)):
+            capped = self.client.get('/api/delivery/batch?resources=page:home,page:about').json()['items']
+        self.assertEqual([item['status'] for item in capped], [200, 413])
+        self.assertEqual(page_filter.call_count, 1)
+
+        self.assertEqual(self.client.get('/api/delivery/batch?resources=widget:x').status_code, 400)
+        for malformed in ({'type': 'page', 'key': 5}, {'type': 'page', 'key': {'slug': 'home'}}, 7):
+            response = self.client.post(
+                '/api/delivery/batch', data=json.dumps({'resources': [malformed]}), content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+
+    @patch('headless.export.load_delivery_items')
+    @patch('headless.export.AcpThemeTokenSet.objects.exclude')
+    @patch('headless.export.AcpThemeTokenSet.objects.filter')
+    def test_export_streams_ndjson_since_a_timestamp(self, filter_mock, exclude_mock, live_items):
+        item = SimpleNamespace(
+            id=3,
+            key='brand',
+            name='Brand',
+            status='published',
+            tokens_json='{"color": "#0b5fff"}',
+            published_at=datetime(2026, 3, 1, 8, 0),
+            updated_at=datetime(2026, 3, 2, 8, 0),
+        )
+        filter_mock.return_value.filter.return_value.order_by.return_value.iterator.return_value = iter([item])
+        # Both rows were unpublished since; another "dark" row is still live, so only "legacy" is removed.
+        withdrawn = [SimpleNamespace(id=4, key='legacy', status='archived'), SimpleNamespace(id=5, key='dark', status='draft')]
+        exclude_mock.return_value.filter.return_value.order_by.return_value.iterator.return_value = iter(withdrawn)
+        live_items.return_value = {('dark',): SimpleNamespace(id=6, key='dark')}
+
+        response = self.client.get(
+            '/api/headless/export?types=theme&since=2026-03-02T09:00:00+01:00',
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual(lines[0], {'type': 'theme', 'key': 'brand', 'data': lines[0]['data']})
+        self.assertEqual(lines[0]['data']['tokens'], {'color': '#0b5fff'})
+        self.assertEqual(lines[1], {'type': 'theme', 'key': 'legacy', 'removed': True})
+        self.assertEqual((lines[-1]['counts'], lines[-1]['removed']), ({'theme': 1}, {'theme': 1}))
+        filter_mock.return_value.filter.assert_called_once_with(updated_at__gte=datetime(2026, 3, 2, 8, 0))
+        exclude_mock.return_value.filter.assert_called_once_with(updated_at__gte=datetime(2026, 3, 2, 8, 0))
+        self.assertEqual(set(live_items.call_args.args[1]), {('legacy',), ('dark',)})
+
+        self.assertEqual(self.client.get('/api/headless/export?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/headless/export?types=users').status_code, 400)
+
+    def test_sync_requires_a_token_even_when_delivery_is_open(self):
+        self.assertEqual(self.client.post('/api/headless/sync', data='[]', content_type='application/json').status_code, 403)
+        with override_settings(HEADLESS_SYNC_ENABLED=True):
+            bump_namespaces(NAMESPACE_HEADLESS_SETTINGS)
+            response = self.client.post('/api/headless/sync', data='[]', content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(HEADLESS_DELIVERY_TOKENS=[{'name': 'edge', 'token': 'edge-secret', 'scopes': ['theme']}])
+    @patch('headless.auth.SiteSetting.objects.filter')
+    def test_named_tokens_are_scoped_and_config_is_snapshotted(self, setting_filter):
+        setting_filter.return_value.values_list.return_value = [('headless_delivery_require_token', '1')]
+        bump_namespaces(NAMESPACE_HEADLESS_SETTINGS)
+
+        self.assertEqual(self.client.get('/api/delivery/page/home').status_code, 401)
+        self.assertEqual(self.client.get('/api/delivery/page/home', HTTP_X_DELIVERY_TOKEN='edge-secret').status_code, 403)
+        with patch('headless.views.delivery_variants_many', return_value={}):
+            items = self.client.get(
+                '/api/delivery/batch?resources=theme:brand,page:home', HTTP_AUTHORIZATION='Bearer edge-secret'
+            ).json()['items']
+        self.assertEqual([item['status'] for item in items], [404, 403])
+        self.assertEqual(setting_filter.call_count, 1)
+
+        bump_namespaces(NAMESPACE_HEADLESS_SETTINGS)
+        self.client.get('/api/delivery/page/home')
+        self.assertEqual(setting_filter.call_count, 2)
+
+    @patch('headless.auth.time.monotonic')
+    @patch('headless.auth.SiteSetting.objects.filter')
+    def test_auth_snapshot_is_rebuilt_after_its_max_age_without_a_bump(self, setting_filter, monotonic):
+        setting_filter.return_value.values_list.return_value = [('headless_delivery_token', 'old-secret')]
+        monotonic.return_value = 1000.0
+        bump_namespaces(NAMESPACE_HEADLESS_SETTINGS)
+        self.assertIsNotNone(delivery_auth_config().match('old-secret'))
+
+        setting_filter.return_value.values_list.return_value = []
+        monotonic.return_value = 1000.0 + AUTH_SNAPSHOT_MAX_AGE - 1
+        self.assertIsNotNone(delivery_auth_config().match('old-secret'))
+        monotonic.return_value = 1000.0 + AUTH_SNAPSHOT_MAX_AGE
+        self.assertIsNone(delivery_auth_config().match('old-secret'))
+
+    @override_settings(HEADLESS_SYNC_ENABLED=True, HEADLESS_SYNC_TOKEN='sync-secret')
+    @patch('headless.sync.transaction.atomic')
+    @patch('headless.sync.AcpContentEntryVersion.objects')
+    @patch('headless.sync.AcpContentEntry.objects')
+    @patch('headless.sync.AcpContentType.objects.filter')
+    def test_sync_upserts_content_entries_in_bulk(self, type_filter, entries, versions, atomic_mock):
+        type_filter.return_value = [
+            SimpleNamespace(id=5, key='faq', schema_json='{"type": "object", "required": ["answer"]}')
+        ]
+        existing = AcpContentEntry(
+            id=40, content_type_id=5, entry_key='returns', title='Returns', locale='en-US',
+            status='draft', data_json='{"answer": "30 days"}', scheduled_publish_at=None,
+        )
+        entries.filter.return_value = [existing]
+        entries.bulk_create.side_effect = lambda rows, **kwargs: [setattr(row, 'id', 41) for row in rows]
+        versions.filter.return_value.values_list.return_value.annotate.return_value = []
+        lines = [
+            {'type': 'content', 'content_type': 'faq', 'entry_key': 'shipping', 'title': 'Shipping', 'data': {'answer': '2 days'}},
+            {'type': 'content', 'content_type': 'faq', 'entry_key': 'returns', 'title': 'Returns', 'data': {'answer': '30 days'}},
+            {'type': 'content', 'content_type': 'faq', 'entry_key': 'bad', 'title': 'Bad', 'data': {}},
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\n{not json\n'
+
+        bump_namespaces(NAMESPACE_HEADLESS_SETTINGS)
+        response = self.client.post(
+            '/api/headless/sync', data=body, content_type='application/x-ndjson', HTTP_X_DELIVERY_TOKEN='sync-secret'
+        )
+        payload = response.json()
+        self.assertEqual([result['status'] for result in payload['results']], ['created', 'unchanged', 'error', 'error'])
+        self.assertIn('$.answer: is required.', payload['results'][2]['error'])
+        self.assertEqual(payload['results'][0]['id'], 41)
+        entries.bulk_update.assert_not_called()
+        created_versions = versions.bulk_create.call_args.args[0]
+        self.assertEqual([(row.content_entry_id, row.version_number) for row in created_versions], [(41, 1)])
+        type_filter.assert_called_once()
+
+    @patch('headless.sync.transaction.atomic')
+    @patch('headless.sync.AcpPageDocument.objects')
+    def test_sync_reports_why_a_batch_was_not_saved(self, pages, atomic_mock):
+        pages.filter.return_value = []
+        pages.bulk_create.side_effect = IntegrityError('UNIQUE constraint failed: acp_page_documents.slug')
+
+        with self.assertLogs('headless.sync', level='ERROR'):
+            run = SyncRun().run([{'type': 'page', 'slug': 'home', 'title': 'Home'}])
+
+        self.assertEqual(run.counts['error'], 1)
+        self.assertEqual(
+            run.results[0]['error'],
+            'Batch could not be saved (IntegrityError: UNIQUE constraint failed: acp_page_documents.slug).',
+        )
+        self.assertEqual(run.changed['page'], set())
+
+
+class ContentSchemaTests(SimpleTestCase):
+    def test_schema_subset_reports_each_violation(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'headline': {'type': 'string', 'maxLength': 5},
+                'tags': {'type': 'array', 'items': {'enum': ['a', 'b']}},
+                'rank': {'type': 'integer', 'minimum': 1},
+            },
+            'required': ['headline'],
+            'additionalProperties': False,
+        }
+        self.assertEqual(schema_errors({'headline': 'Hi', 'tags': ['a'], 'rank': 2}, schema), [])
+        self.assertEqual(
+            schema_errors({'headline': 'Too long', 'tags': ['c'], 'rank': True, 'extra': 1}, schema),
+            [
+                '$.headline: longer than 5 characters.',
+                "$.tags[0]: must be one of ['a', 'b'].",
+                '$.rank: expected integer.',
+                '$.extra: is not allowed.',
+            ],
+        )
+
+
+class ChangeFeedTests(SimpleTestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_cursor_round_trip_and_head(self):
+        position = (datetime(2026, 3, 1, 8, 0, 0, 250), 2, 17)
+        self.assertEqual(changes.decode_cursor(changes.encode_cursor(position)), position)
+        with self.assertRaises(changes.InvalidCursor):
+            changes.decode_cursor('not-a-cursor')
+        payload = self.client.get('/api/delivery/changes').json()
+        self.assertEqual(payload['events'], [])
+        self.assertEqual(self.client.get('/api/delivery/changes?cursor=bogus').status_code, 400)
+
+    @patch('headless.views.CHANGE_FEED_MAX_WAIT', 5)
+    @patch('headless.changes.time.sleep')
+    @patch('headless.changes._kind_rows')
+    def test_long_poll_merges_kinds_after_a_change(self, kind_rows, sleep_mock):
+        stamp = datetime(2026, 3, 1, 8, 0)
+        page = SimpleNamespace(id=9, slug='home', status='published', updated_at=stamp, published_at=stamp)
+        theme = SimpleNamespace(id=2, key='brand', status='draft', updated_at=stamp, published_at=None)
+        polls = []
+
+        def rows(kind, position, cutoff, limit):
+            polls.append(kind)
+            if len(polls) <= 4:
+                return []
+            return {'page': [page], 'theme': [theme]}.get(kind, [])
+
+        kind_rows.side_effect = rows
+        sleep_mock.side_effect = lambda seconds: note_delivery_change()
+
+        cursor = changes.encode_cursor((datetime(2026, 3, 1, 7, 0), -1, 0))
+        payload = self.client.get(f'/api/delivery/changes?cursor={cursor}&wait=5').json()
+        self.assertEqual(
+            [(event['type'], event['key'], event['event']) for event in payload['events']],
+            [('page', 'home', 'published'), ('theme', 'brand', 'unpublished')],
+        )
+        self.assertEqual(changes.decode_cursor(payload['cursor']), (stamp, 2, 2))
+        self.assertEqual(len(polls), 8)
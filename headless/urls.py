@@ -9,6 +9,8 @@ urlpatterns = [
     path('headless/export', views.headless_export, name='headless_export'),
     path('headless/sync', views.headless_sync_upsert, name='headless_sync_upsert'),
     path('delivery', views.delivery_index, name='delivery_index'),
+    path('delivery/changes', views.delivery_changes, name='delivery_changes'),
+    path('delivery/batch', views.delivery_batch, name='delivery_batch'),
     path('delivery/page/<slug:slug>', views.acp_delivery_page, name='acp_delivery_page'),
     path('delivery/dashboard/<str:dashboard_id>', views.acp_delivery_dashboard, name='acp_delivery_dashboard'),
     path('delivery/theme/<str:token_set_key>', views.acp_delivery_theme, name='acp_delivery_theme'),
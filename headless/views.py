@@ -1,23 +1,92 @@
+import json
+
+from django.conf import settings
 from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 
-from acp.models import AcpContentEntry, AcpDashboardDocument, AcpPageDocument, AcpThemeTokenSet
-from headless.auth import require_delivery_token
+from acp.views.common import write_audit
+from core.compressed_responses import http_timestamp, negotiate_encoding, response_variants, variant_response
+from core.utils import parse_iso_datetime
+from core.xml_stream import streaming_text_response
+from headless.auth import delivery_auth_config, require_delivery_token, require_sync_token, token_allows
+from headless.changes import (
+    CHANGE_FEED_KINDS,
+    CHANGE_FEED_MAX_WAIT,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    head_position,
+    wait_for_changes,
+)
+from headless.delivery_cache import (
+    DELIVERY_KINDS,
+    delivery_body,
+    delivery_variants,
+    delivery_variants_many,
+    invalidate_delivery_cache,
+    load_delivery_item,
+    load_delivery_items,
+)
+from headless.export import EXPORT_TYPES, NDJSON_CONTENT_TYPE, iter_export_lines
+from headless.sync import SyncPayloadError, SyncRun, iter_payload_records
+
+DELIVERY_BATCH_MAX_ITEMS = max(1, int(getattr(settings, 'DELIVERY_BATCH_MAX_ITEMS', 50)))
+# Documents past this many bytes are reported with status 413 instead of inlined.
+DELIVERY_BATCH_MAX_BYTES = max(1024, int(getattr(settings, 'DELIVERY_BATCH_MAX_BYTES', 1024 * 1024)))
 
 
 def health(request):
     return JsonResponse({'ok': True, 'service': 'django', 'component': 'headless-api'})
 
 
-@require_delivery_token
+@require_delivery_token(scope='export')
 def headless_export(request):
-    return JsonResponse({'ok': True, 'mode': 'scaffold', 'endpoint': 'headless_export'})
+    since = None
+    if request.GET.get('since'):
+        since = parse_iso_datetime(request.GET['since'])
+        if since is None:
+            return JsonResponse({'ok': False, 'error': 'Invalid since timestamp.'}, status=400)
+    types = {part.strip() for part in request.GET.get('types', '').split(',') if part.strip()}
+    unknown = sorted(types - set(EXPORT_TYPES))
+    if unknown:
+        return JsonResponse({'ok': False, 'error': f'Unknown export types: {", ".join(unknown)}.'}, status=400)
+
+    response = streaming_text_response(
+        iter_export_lines(since=since, types=types or None),
+        content_type=NDJSON_CONTENT_TYPE,
+        gzip=negotiate_encoding(request, encodings=('gzip',)) == 'gzip',
+    )
+    response['Cache-Control'] = 'no-store'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
 
 
 @csrf_exempt
-@require_delivery_token
+@require_sync_token
 def headless_sync_upsert(request):
-    return JsonResponse({'ok': True, 'mode': 'scaffold', 'endpoint': 'headless_sync_upsert'})
+    if request.method != 'POST':
+        return JsonResponse({'ok': False, 'error': 'Method not allowed.'}, status=405)
+    user = getattr(request, 'user', None)
+    user_id = user.id if user is not None and user.is_authenticated else None
+    try:
+        run = SyncRun(user_id=user_id, max_records=delivery_auth_config().sync_max_items).run(
+            iter_payload_records(request)
+        )
+    except SyncPayloadError as exc:
+        return JsonResponse({'ok': False, 'error': str(exc)}, status=400)
+
+    if any(run.changed.values()):
+        invalidate_delivery_cache()
+        write_audit(
+            request,
+            domain='headless',
+            action='sync',
+            entity_type='batch',
+            entity_id='',
+            after_json=json.dumps({'counts': run.counts, 'changed': {k: len(v) for k, v in run.changed.items()}}),
+        )
+    return JsonResponse({'ok': not run.counts['error'], 'counts': run.counts, 'results': run.results})
 
 
 @require_delivery_token
@@ -25,135 +94,198 @@ def delivery_index(request):
     return JsonResponse({'ok': True, 'mode': 'scaffold', 'endpoint': 'delivery_index'})
 
 
-def _load_json(raw, fallback):
-    import json
-
-    try:
-        data = json.loads(raw or '')
-    except (TypeError, ValueError):
-        return fallback
-    if isinstance(fallback, dict) and isinstance(data, dict):
-        return data
-    if isinstance(fallback, list) and isinstance(data, list):
-        return data
-    return fallback
-
-
 def _can_view_unpublished(request):
     user = getattr(request, 'user', None)
     checker = getattr(user, 'has_permission', None)
     return bool(user and user.is_authenticated and callable(checker) and checker('acp:studio:view'))
 
 
-@require_delivery_token
-def acp_delivery_page(request, slug):
-    allow_unpublished = _can_view_unpublished(request)
-    query = AcpPageDocument.objects.filter(slug=slug)
-    if not allow_unpublished:
-        query = query.filter(status='published')
-    item = query.first()
+def _delivery(request, kind, *key, not_found):
+    """
+    Published documents come pre-serialized (and precompressed) from the
+    delivery cache; staff previews that may include drafts bypass it.
+    """
+    if not _can_view_unpublished(request):
+        variants = delivery_variants(kind, *key)
+        if variants is None:
+            return JsonResponse({'ok': False, 'error': not_found}, status=404)
+        return variant_response(request, variants)
+
+    item = load_delivery_item(kind, *key, allow_unpublished=True)
     if not item:
-        return JsonResponse({'ok': False, 'error': 'Page not found.'}, status=404)
-    return JsonResponse(
-        {
-            'ok': True,
-            'page': {
-                'id': item.id,
-                'slug': item.slug,
-                'title': item.title,
-                'template_id': item.template_id,
-                'locale': item.locale,
-                'status': item.status,
-                'seo': _load_json(item.seo_json, {}),
-                'blocks_tree': _load_json(item.blocks_tree, {}),
-                'theme_override': _load_json(item.theme_override_json, {}),
-                'published_at': item.published_at.isoformat() if item.published_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            },
-        }
+        return JsonResponse({'ok': False, 'error': not_found}, status=404)
+    variants = response_variants(
+        delivery_body(kind, item, key),
+        'application/json',
+        last_modified=http_timestamp(item.updated_at or item.published_at),
+        precompress=False,
     )
+    response = variant_response(request, variants)
+    # Responses that may include drafts must not be stored by shared caches.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
-@require_delivery_token
+@require_delivery_token(scope='page')
+def acp_delivery_page(request, slug):
+    return _delivery(request, 'page', slug, not_found='Page not found.')
+
+
+@require_delivery_token(scope='dashboard')
 def acp_delivery_dashboard(request, dashboard_id):
-    allow_unpublished = _can_view_unpublished(request)
-    query = AcpDashboardDocument.objects.filter(dashboard_id=dashboard_id)
-    if not allow_unpublished:
-        query = query.filter(status='published')
-    item = query.first()
-    if not item:
-        return JsonResponse({'ok': False, 'error': 'Dashboard not found.'}, status=404)
-    return JsonResponse(
-        {
-            'ok': True,
-            'dashboard': {
-                'id': item.id,
-                'dashboard_id': item.dashboard_id,
-                'title': item.title,
-                'route': item.route,
-                'layout_type': item.layout_type,
-                'status': item.status,
-                'layout_config': _load_json(item.layout_config_json, {}),
-                'widgets': _load_json(item.widgets_json, []),
-                'global_filters': _load_json(item.global_filters_json, []),
-                'role_visibility': _load_json(item.role_visibility_json, {}),
-                'published_at': item.published_at.isoformat() if item.published_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            },
-        }
-    )
+    return _delivery(request, 'dashboard', dashboard_id, not_found='Dashboard not found.')
 
 
-@require_delivery_token
+@require_delivery_token(scope='theme')
 def acp_delivery_theme(request, token_set_key):
-    allow_unpublished = _can_view_unpublished(request)
-    query = AcpThemeTokenSet.objects.filter(key=token_set_key)
-    if not allow_unpublished:
-        query = query.filter(status='published')
-    item = query.first()
-    if not item:
-        return JsonResponse({'ok': False, 'error': 'Theme token set not found.'}, status=404)
-    return JsonResponse(
-        {
-            'ok': True,
-            'theme': {
-                'id': item.id,
-                'key': item.key,
-                'name': item.name,
-                'status': item.status,
-                'tokens': _load_json(item.tokens_json, {}),
-                'published_at': item.published_at.isoformat() if item.published_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            },
-        }
-    )
+    return _delivery(request, 'theme', token_set_key, not_found='Theme token set not found.')
 
 
-@require_delivery_token
+@require_delivery_token(scope='content')
 def acp_delivery_content_entry(request, content_type_key, entry_key):
+    return _delivery(request, 'content', content_type_key, entry_key, not_found='Content entry not found.')
+
+
+def _batch_ref(raw):
+    """``{"type": "content", "key": "faq/shipping"}`` or ``"content:faq/shipping"`` -> ``(kind, key)``."""
+    if isinstance(raw, str):
+        kind, _, key = raw.strip().partition(':')
+    elif isinstance(raw, dict):
+        kind = raw.get('type')
+        key = raw.get('key')
+        if kind == 'content' and not key and raw.get('content_type') and raw.get('entry_key'):
+            key = (raw.get('content_type'), raw.get('entry_key'))
+    else:
+        return None
+    spec = DELIVERY_KINDS.get(str(kind or '').strip())
+    if spec is None or not key:
+        return None
+    if isinstance(key, str):
+        key = tuple(key.split('/', len(spec['lookups']) - 1))
+    elif not isinstance(key, (list, tuple)):
+        return None
+    key = tuple(str(part).strip() for part in key)
+    if len(key) != len(spec['lookups']) or not all(key):
+        return None
+    return kind.strip(), key
+
+
+def _batch_refs(request):
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or b'{}')
+        except (TypeError, ValueError):
+            return None, 'Request body must be JSON.'
+        raw_refs = data.get('resources') if isinstance(data, dict) else data
+        if not isinstance(raw_refs, list):
+            return None, 'Expected a "resources" list.'
+    else:
+        raw_refs = [ref for ref in request.GET.get('resources', '').split(',') if ref.strip()]
+    if not raw_refs:
+        return None, 'No resources requested.'
+    if len(raw_refs) > DELIVERY_BATCH_MAX_ITEMS:
+        return None, f'At most {DELIVERY_BATCH_MAX_ITEMS} resources per batch.'
+    refs = []
+    for index, raw in enumerate(raw_refs):
+        ref = _batch_ref(raw)
+        if ref is None:
+            return None, f'Invalid resource reference at position {index}.'
+        refs.append(ref)
+    return refs, ''
+
+
+def _batch_documents(refs, allow_unpublished):
+    """``{(kind, key): body bytes or None}`` resolved with at most one query per kind."""
+    keys_by_kind = {}
+    for kind, key in refs:
+        keys_by_kind.setdefault(kind, []).append(key)
+    documents = {}
+    for kind, keys in keys_by_kind.items():
+        if allow_unpublished:
+            found = load_delivery_items(kind, keys, allow_unpublished=True)
+            for key in keys:
+                item = found.get(key)
+                documents[(kind, key)] = delivery_body(kind, item, key).encode('utf-8') if item else None
+        else:
+            for key, variants in delivery_variants_many(kind, keys).items():
+                documents[(kind, key)] = variants['body'] if variants else None
+    return documents
+
+
+@csrf_exempt
+@require_delivery_token
+def delivery_batch(request):
+    """
+    Resolve several delivery documents in one round trip. Each item carries its
+    own status; cached documents are spliced in as-is rather than re-encoded.
+    """
+    if request.method not in ('GET', 'POST'):
+        return JsonResponse({'ok': False, 'error': 'Method not allowed.'}, status=405)
+    refs, error = _batch_refs(request)
+    if error:
+        return JsonResponse({'ok': False, 'error': error}, status=400)
+
     allow_unpublished = _can_view_unpublished(request)
-    query = AcpContentEntry.objects.select_related('content_type').filter(
-        content_type__key=content_type_key,
-        entry_key=entry_key,
-    )
-    if not allow_unpublished:
-        query = query.filter(status='published')
-    item = query.order_by('-updated_at', '-id').first()
-    if not item:
-        return JsonResponse({'ok': False, 'error': 'Content entry not found.'}, status=404)
-    return JsonResponse(
-        {
-            'ok': True,
-            'entry': {
-                'id': item.id,
-                'content_type_key': item.content_type.key if item.content_type else content_type_key,
-                'entry_key': item.entry_key,
-                'title': item.title,
-                'locale': item.locale,
-                'status': item.status,
-                'data': _load_json(item.data_json, {}),
-                'published_at': item.published_at.isoformat() if item.published_at else None,
-                'updated_at': item.updated_at.isoformat() if item.updated_at else None,
-            },
-        }
+    allowed = [ref for ref in refs if token_allows(request, ref[0])]
+    documents = _batch_documents(allowed, allow_unpublished)
+    parts = []
+    total = 0
+    for kind, key in refs:
+        head = {'type': kind, 'key': '/'.join(key)}
+        document = documents.get((kind, key))
+        if not token_allows(request, kind):
+            head.update(status=403, error='Token is not allowed for this resource.')
+        elif document is None:
+            head.update(status=404, error='Not found.')
+        elif total + len(document) > DELIVERY_BATCH_MAX_BYTES:
+            head.update(status=413, error='Batch size limit reached.')
+        else:
+            total += len(document)
+            head['status'] = 200
+            parts.append(json.dumps(head)[:-1].encode('utf-8') + b', "document": ' + document + b'}')
+            continue
+        parts.append(json.dumps(head).encode('utf-8'))
+
+    body = b'{"ok": true, "items": [' + b', '.join(parts) + b']}'
+    response = variant_response(request, response_variants(body, 'application/json', precompress=False))
+    if allow_unpublished:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@require_delivery_token(scope='changes')
+def delivery_changes(request):
+    """
+    Change feed: ``?cursor=`` resumes after a previous response, ``?since=``
+    starts at a timestamp, neither returns the current head cursor. ``wait``
+    (seconds, capped at ``CHANGE_FEED_MAX_WAIT``, which is 0 unless
+    configured) long-polls until there is at least one event, holding this
+    worker meanwhile.
+    """
+    requested = {part.strip() for part in request.GET.get('types', '').split(',') if part.strip()}
+    kinds = tuple(
+        kind for kind in CHANGE_FEED_KINDS if (not requested or kind in requested) and token_allows(request, kind)
     )
+    if request.GET.get('cursor'):
+        try:
+            position = decode_cursor(request.GET['cursor'])
+        except InvalidCursor as exc:
+            return JsonResponse({'ok': False, 'error': str(exc)}, status=400)
+    elif request.GET.get('since'):
+        since = parse_iso_datetime(request.GET['since'])
+        if since is None:
+            return JsonResponse({'ok': False, 'error': 'Invalid since timestamp.'}, status=400)
+        position = (since, -1, 0)
+    else:
+        response = JsonResponse({'ok': True, 'cursor': encode_cursor(head_position()), 'events': [], 'has_more': False})
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    try:
+        wait = min(CHANGE_FEED_MAX_WAIT, max(0, int(request.GET.get('wait') or 0)))
+    except ValueError:
+        wait = 0
+    events, next_position, has_more = wait_for_changes(position, wait=wait, kinds=kinds) if kinds else ([], position, False)
+    response = JsonResponse({'ok': True, 'cursor': encode_cursor(next_position), 'events': events, 'has_more': has_more})
+    response['Cache-Control'] = 'no-store'
+    return response
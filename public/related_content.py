@@ -0,0 +1,227 @@
+"""
+Precomputed related-content graph for service detail pages.
+
+The graph has two independently rebuilt parts:
+
+* ``services``: card data for every service (DB rows plus virtual services),
+  the related-service ids for each service and the featured industries.
+  Rebuilt when a service or industry changes.
+* ``posts``: card data for referenced posts and the related-post ids for each
+  service. Rebuilt when a post changes (and with the services part, since it
+  matches on service titles).
+
+Cards carry only what the template shows, already truncated, so a detail view
+does one lookup per part and no queries.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models import Q
+from markupsafe import Markup
+
+from core.cache_build import get_or_build
+from core.cache_namespaces import (
+    NAMESPACE_RELATED_POSTS,
+    NAMESPACE_RELATED_SERVICES,
+    bump_namespaces,
+    namespaced_key,
+)
+from core.constants import WORKFLOW_PUBLISHED
+from core.content_blocks import freeze
+from core.local_cache import LocalCache
+from public.models import Industry, Post, Service
+from public.virtual_services import SERVICE_ORDERING, inject_virtual_services
+
+RELATED_CONTENT_TTL = max(60, int(getattr(settings, 'RELATED_CONTENT_TTL', 3600)))
+RELATED_SERVICE_LIMIT = 6
+SAME_TYPE_LIMIT = 4
+OTHER_TYPE_LIMIT = 8
+FEATURED_INDUSTRY_LIMIT = 6
+RELATED_POST_LIMIT = 3
+LATEST_POST_LIMIT = 6
+CARD_TEXT_LIMIT = 141
+POST_BLURB_LIMIT = 151
+
+_services_l1 = LocalCache(NAMESPACE_RELATED_SERVICES, ttl=RELATED_CONTENT_TTL, max_entries=1)
+_posts_l1 = LocalCache(NAMESPACE_RELATED_POSTS, ttl=RELATED_CONTENT_TTL, max_entries=1)
+
+
+def _active(model):
+    return model.objects.filter(Q(is_trashed=False) | Q(is_trashed__isnull=True))
+
+
+def _service_rows():
+    fields = ('id', 'slug', 'title', 'description', 'icon_class', 'service_type', 'sort_order', 'workflow_status')
+    rows = list(_active(Service).only(*fields).order_by(*SERVICE_ORDERING))
+    published = inject_virtual_services([row for row in rows if row.workflow_status == WORKFLOW_PUBLISHED])
+    everything = inject_virtual_services(rows)
+    return published, everything
+
+
+def _card(item):
+    return {
+        'id': item.id,
+        'slug': item.slug,
+        'title': item.title,
+        'description': (getattr(item, 'description', '') or '')[:CARD_TEXT_LIMIT],
+        'icon_class': getattr(item, 'icon_class', '') or '',
+        'service_type': getattr(item, 'service_type', ''),
+    }
+
+
+def _pick(rows, *, exclude_id, service_type=None, limit):
+    picked = []
+    for row in rows:
+        if row['id'] == exclude_id or (service_type and row['service_type'] != service_type):
+            continue
+        picked.append(row)
+        if len(picked) >= limit:
+            break
+    return picked
+
+
+def _related_service_ids(service_id, service_type, published, everything):
+    """Same-type services first, then other types, mirroring the old per-request queries."""
+    from public.views.pages import normalize_icon_class
+
+    same = _pick(published, exclude_id=service_id, service_type=service_type, limit=SAME_TYPE_LIMIT) or _pick(
+        everything, exclude_id=service_id, service_type=service_type, limit=SAME_TYPE_LIMIT
+    )
+    other = _pick(published, exclude_id=service_id, limit=OTHER_TYPE_LIMIT) or _pick(
+        everything, exclude_id=service_id, limit=OTHER_TYPE_LIMIT
+    )
+    related = [(row['id'], normalize_icon_class(row['icon_class'], 'fa-solid fa-gear')) for row in same]
+    seen = {row['id'] for row in same}
+    for row in other:
+        if len(related) >= RELATED_SERVICE_LIMIT:
+            break
+        if row['id'] in seen or row['service_type'] == service_type:
+            continue
+        related.append((row['id'], normalize_icon_class(row['icon_class'], 'fa-solid fa-wrench')))
+        seen.add(row['id'])
+    return tuple(related)
+
+
+def _build_services_part():
+    from public.views.pages import normalize_icon_class
+
+    published_rows, all_rows = _service_rows()
+    published = [_card(row) for row in published_rows]
+    everything = [_card(row) for row in all_rows]
+
+    industries = list(
+        _active(Industry).filter(workflow_status=WORKFLOW_PUBLISHED).order_by('sort_order', 'id')[:FEATURED_INDUSTRY_LIMIT]
+    ) or list(_active(Industry).order_by('sort_order', 'id')[:FEATURED_INDUSTRY_LIMIT])
+    featured_industries = []
+    for industry in industries:
+        card = _card(industry)
+        card['icon_class'] = normalize_icon_class(card['icon_class'], 'fa-solid fa-building')
+        featured_industries.append(card)
+
+    cards = {row['id']: row for row in everything}
+    return freeze(
+        {
+            'cards': cards,
+            'published': published,
+            'everything': everything,
+            'related': {
+                row['id']: _related_service_ids(row['id'], row['service_type'], published, everything)
+                for row in everything
+            },
+            'industries': featured_industries,
+        }
+    )
+
+
+def _matching_post_ids(title, posts, limit=RELATED_POST_LIMIT):
+    needle = (title or '').lower()
+    if not needle:
+        return []
+    return [post_id for post_id, post_title in posts if needle in post_title][:limit]
+
+
+def _related_post_ids(title, posts, latest):
+    related = _matching_post_ids(title, posts)
+    for post_id in latest:
+        if len(related) >= RELATED_POST_LIMIT:
+            break
+        if post_id not in related:
+            related.append(post_id)
+    return tuple(related)
+
+
+def _build_posts_part():
+    published = (
+        _active(Post)
+        .filter(workflow_status=WORKFLOW_PUBLISHED)
+        .order_by('-created_at', '-id')
+    )
+    posts = [(post_id, (title or '').lower()) for post_id, title in published.values_list('id', 'title')]
+    latest = [post_id for post_id, _ in posts[:LATEST_POST_LIMIT]]
+
+    services = _services_part()
+    related = {
+        service_id: _related_post_ids(card['title'], posts, latest)
+        for service_id, card in services['cards'].items()
+    }
+    referenced = set(latest)
+    for post_ids in related.values():
+        referenced.update(post_ids)
+
+    cards = {}
+    for post in published.filter(id__in=referenced).only('id', 'slug', 'title', 'excerpt', 'content'):
+        blurb = post.excerpt or Markup(post.content or '').striptags()
+        cards[post.id] = {'id': post.id, 'slug': post.slug, 'title': post.title, 'excerpt': blurb[:POST_BLURB_LIMIT]}
+    return freeze({'cards': cards, 'posts': posts, 'latest': latest, 'related': related})
+
+
+def _services_part():
+    def load():
+        return get_or_build(
+            namespaced_key(NAMESPACE_RELATED_SERVICES, 'graph'),
+            _build_services_part,
+            RELATED_CONTENT_TTL,
+            name='related_services',
+        )
+
+    return _services_l1.get('graph', load)
+
+
+def _posts_part():
+    def load():
+        return get_or_build(
+            namespaced_key(NAMESPACE_RELATED_POSTS, 'graph'),
+            _build_posts_part,
+            RELATED_CONTENT_TTL,
+            name='related_posts',
+        )
+
+    return _posts_l1.get('graph', load)
+
+
+def related_content(service):
+    """Return ``(related_services, featured_industries, related_posts)`` card lists for *service*."""
+    services = _services_part()
+    related = services['related'].get(service.id)
+    if related is None:
+        related = _related_service_ids(service.id, service.service_type, services['published'], services['everything'])
+    related_services = [
+        {**services['cards'][service_id], 'icon_class': icon_class}
+        for service_id, icon_class in related
+        if service_id in services['cards']
+    ]
+
+    posts = _posts_part()
+    post_ids = posts['related'].get(service.id)
+    if post_ids is None:
+        post_ids = _related_post_ids(service.title, posts['posts'], posts['latest'])
+    related_posts = [posts['cards'][post_id] for post_id in post_ids if post_id in posts['cards']]
+    return related_services, list(services['industries']), related_posts
+
+
+def invalidate_related_services():
+    bump_namespaces(NAMESPACE_RELATED_SERVICES, NAMESPACE_RELATED_POSTS)
+
+
+def invalidate_related_posts():
+    bump_namespaces(NAMESPACE_RELATED_POSTS)
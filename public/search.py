@@ -0,0 +1,307 @@
+"""
+Ranked full-text search over posts, services and industries.
+
+One API for the public blog and the admin search::
+
+    results = SearchResults(queryset, 'battery swap')   # lazy, Paginator-compatible
+    for post in results[:6]:
+        post.search_snippet                             # Markup with <mark> highlights
+
+``queryset`` carries the caller's filters (published only, category, ...);
+the search restricts it to matching rows and orders them by rank.
+
+Backends, picked from the database vendor and what ``manage.py search_index
+--setup`` has installed:
+
+* PostgreSQL: a stored generated ``search_vector`` tsvector column per table
+  (weights A/B/C over the indexed fields) with a GIN index, queried with
+  ``websearch_to_tsquery``, ranked by ``ts_rank_cd`` and highlighted with
+  ``ts_headline``. Generated columns keep themselves in sync.
+* SQLite: an external-content FTS5 table per model (``post_fts`` ...) kept in
+  sync by insert/update/delete triggers, ranked by weighted ``bm25`` and
+  highlighted with ``snippet``.
+* Anything else, or before setup: ``icontains`` over the same fields, newest
+  first, with snippets highlighted in Python.
+"""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils.html import escape, strip_tags
+from markupsafe import Markup
+
+from public.models import Industry, Post, Service
+
+SEARCH_CONFIG = 'english'
+SNIPPET_WORDS = 24
+# Highlight markers that cannot occur in stored text; swapped for <mark> after escaping.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+_BACKEND_CHECK_TTL = 300
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    # (field, Postgres weight, bm25 weight), most important first.
+    fields: tuple
+    snippet_field: str
+    # Newest-first ordering for the fallback backend.
+    fallback_order: tuple
+
+    @property
+    def fts_table(self):
+        return f'{self.table}_fts'
+
+    @property
+    def field_names(self):
+        return tuple(name for name, _, _ in self.fields)
+
+
+SEARCH_INDEXES = {
+    Post: SearchIndex(
+        'post', (('title', 'A', 10.0), ('excerpt', 'B', 4.0), ('content', 'C', 1.0)), 'content', ('-created_at', '-id')
+    ),
+    Service: SearchIndex(
+        'service',
+        (('title', 'A', 10.0), ('seo_description', 'B', 4.0), ('description', 'C', 1.0)),
+        'description',
+        ('sort_order', 'id'),
+    ),
+    Industry: SearchIndex(
+        'industry',
+        (('title', 'A', 10.0), ('hero_description', 'B', 4.0), ('description', 'C', 1.0)),
+        'description',
+        ('sort_order', 'id'),
+    ),
+}
+
+_backend_checked = {}
+
+
+def search_terms(text):
+    return _TERM_RE.findall(str(text or '').lower())[:MAX_TERMS]
+
+
+def _fts5_query(terms):
+    # Every term must match, as a prefix; quoting keeps FTS5 operators out of user input.
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _pg_setup_sql(index):
+    vector = ' || '.join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({name}, '')), '{weight}')" for name, weight, _ in index.fields
+    )
+    return [
+        f'ALTER TABLE {index.table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+        f'GENERATED ALWAYS AS ({vector}) STORED',
+        f'CREATE INDEX IF NOT EXISTS {index.table}_search_vector_idx ON {index.table} USING GIN (search_vector)',
+    ]
+
+
+def _sqlite_setup_sql(index):
+    columns = ', '.join(index.field_names)
+    new_values = ', '.join(f'new.{name}' for name in index.field_names)
+    old_values = ', '.join(f'old.{name}' for name in index.field_names)
+    fts = index.fts_table
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});'
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, '
+        f"content='{index.table}', content_rowid='id', tokenize='porter unicode61')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {index.table} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {index.table} BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {index.table} BEGIN {delete} {insert} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def setup_search_index(rebuild=False):
+    """Create (or, with *rebuild*, refill) the search structures for the current database; returns the backend."""
+    vendor = connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        return 'basic'
+    with connection.cursor() as cursor:
+        for index in SEARCH_INDEXES.values():
+            if vendor == 'postgresql':
+                statements = _pg_setup_sql(index)
+            else:
+                statements = _sqlite_setup_sql(index)
+                if not rebuild and index.fts_table in connection.introspection.table_names(cursor):
+                    statements = statements[1:-1]
+            for statement in statements:
+                cursor.execute(statement)
+    _backend_checked.clear()
+    return vendor
+
+
+def _index_installed(index):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            return index.fts_table in connection.introspection.table_names(cursor)
+        columns = connection.introspection.get_table_description(cursor, index.table)
+        return any(column.name == 'search_vector' for column in columns)
+
+
+def search_backend(model):
+    """``'postgresql'``, ``'sqlite'`` or ``'basic'`` for *model* on the current database."""
+    index = SEARCH_INDEXES[model]
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return 'basic'
+    cache_key = (connection.alias, connection.vendor, index.table)
+    checked = _backend_checked.get(cache_key)
+    if checked is not None and time.monotonic() - checked[1] < _BACKEND_CHECK_TTL:
+        return checked[0]
+    try:
+        backend = connection.vendor if _index_installed(index) else 'basic'
+    except DatabaseError:
+        backend = 'basic'
+    _backend_checked[cache_key] = (backend, time.monotonic())
+    return backend
+
+
+def render_snippet(raw):
+    """Escape *raw* (which may contain markup fragments) and turn highlight markers into ``<mark>``."""
+    text = escape(strip_tags(raw or ''))
+    text = text.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    return Markup(' '.join(text.split()))
+
+
+def _python_snippet(text, terms, words=SNIPPET_WORDS):
+    tokens = strip_tags(text or '').split()
+    if not tokens:
+        return Markup('')
+    lowered = [token.lower() for token in tokens]
+    start = next((i for i, token in enumerate(lowered) if any(term in token for term in terms)), 0)
+    start = max(0, start - words // 3)
+    window = tokens[start:start + words]
+    marked = [
+        f'{_MARK_START}{token}{_MARK_END}' if any(term in token.lower() for term in terms) else token
+        for token in window
+    ]
+    prefix = '… ' if start else ''
+    suffix = ' …' if start + words < len(tokens) else ''
+    return render_snippet(prefix + ' '.join(marked) + suffix)
+
+
+class SearchResults:
+    """
+    Lazy ranked results for *text* within *queryset*. Supports ``len()``/
+    ``count()`` and slicing, so it can be handed to ``Paginator`` directly;
+    each slice runs one ranked query plus one query to load the rows.
+    """
+
+    def __init__(self, queryset, text):
+        self.queryset = queryset
+        self.index = SEARCH_INDEXES[queryset.model]
+        self.terms = search_terms(text)
+        self.text = ' '.join(self.terms)
+        self.backend = search_backend(queryset.model) if self.terms else 'basic'
+        self._count = None
+
+    def _scope_sql(self):
+        return self.queryset.order_by().values('id').query.sql_with_params()
+
+    def _match_sql(self):
+        index = self.index
+        scope_sql, scope_params = self._scope_sql()
+        if self.backend == 'postgresql':
+            where = (
+                f"search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s) AND {index.table}.id IN ({scope_sql})"
+            )
+            return f'FROM {index.table} WHERE {where}', [self.text, *scope_params]
+        fts = index.fts_table
+        return f'FROM {fts} WHERE {fts} MATCH %s AND rowid IN ({scope_sql})', [_fts5_query(self.terms), *scope_params]
+
+    def _fallback_queryset(self):
+        condition = Q()
+        for term in self.terms:
+            term_condition = Q()
+            for name in self.index.field_names:
+                term_condition |= Q(**{f'{name}__icontains': term})
+            condition &= term_condition
+        return self.queryset.filter(condition).order_by(*self.index.fallback_order)
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            elif self.backend == 'basic':
+                self._count = self._fallback_queryset().count()
+            else:
+                sql, params = self._match_sql()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) {sql}', params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _ranked_rows(self, offset, limit):
+        index = self.index
+        from_sql, params = self._match_sql()
+        if self.backend == 'postgresql':
+            options = f'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=1'
+            sql = (
+                f"SELECT id, ts_rank_cd(search_vector, websearch_to_tsquery('{SEARCH_CONFIG}', %s)) AS rank, "
+                f"ts_headline('{SEARCH_CONFIG}', coalesce({index.snippet_field}, ''), "
+                f"websearch_to_tsquery('{SEARCH_CONFIG}', %s), %s) "
+                f'{from_sql} ORDER BY rank DESC, id DESC LIMIT %s OFFSET %s'
+            )
+            params = [self.text, self.text, options, *params, limit, offset]
+        else:
+            fts = index.fts_table
+            weights = ', '.join(str(weight) for _, _, weight in index.fields)
+            snippet_column = index.field_names.index(index.snippet_field)
+            # bm25 is lower-is-better.
+            sql = (
+                f"SELECT rowid, bm25({fts}, {weights}) AS rank, "
+                f"snippet({fts}, {snippet_column}, '{_MARK_START}', '{_MARK_END}', '…', {SNIPPET_WORDS}) "
+                f'{from_sql} ORDER BY rank, rowid DESC LIMIT %s OFFSET %s'
+            )
+            params = [*params, limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _slice(self, offset, limit):
+        if not self.terms or limit <= 0:
+            return []
+        if self.backend == 'basic':
+            rows = list(self._fallback_queryset()[offset:offset + limit])
+            for row in rows:
+                row.search_snippet = _python_snippet(getattr(row, self.index.snippet_field, ''), self.terms)
+            return rows
+        ranked = self._ranked_rows(offset, limit)
+        objects = self.queryset.in_bulk([row_id for row_id, _, _ in ranked])
+        results = []
+        for row_id, rank, snippet in ranked:
+            item = objects.get(row_id)
+            if item is None:
+                continue
+            item.search_rank = rank
+            item.search_snippet = render_snippet(snippet)
+            results.append(item)
+        return results
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start = key.start or 0
+            stop = key.stop if key.stop is not None else self.count()
+            return self._slice(start, stop - start)
+        items = self._slice(key, 1)
+        if not items:
+            raise IndexError(key)
+        return items[0]
+
+
+def search(queryset, text, limit=20):
+    """The top *limit* matches for *text* within *queryset*, best first."""
+    return SearchResults(queryset, text)[:limit]
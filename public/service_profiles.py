@@ -0,0 +1,90 @@
+"""
+Cache of normalized service profiles.
+
+``_normalize_service_profile`` merges defaults, ``profile_json`` and the research
+overrides for a service; the result only changes when the service row does, so
+it is cached per ``(service.id, updated_at)`` and refreshed by admin saves.
+Because keys change with every edit, each worker also keeps the unpickled
+profiles it has served in a small local map.
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import cache as memoize
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.content_blocks import freeze
+from core.service_seo_overrides import SERVICE_RESEARCH_OVERRIDES
+from public.models import Service
+from public.virtual_services import virtual_services
+
+PROFILE_CACHE_TTL = 24 * 60 * 60
+LOCAL_PROFILE_LIMIT = 256
+
+_local_profiles = {}
+
+
+@memoize
+def _profile_code_version():
+    # Deploys that edit the research overrides must not serve profiles built from the old ones.
+    base = str(getattr(settings, 'SERVICE_PROFILE_CACHE_VERSION', 'v1'))
+    digest = hashlib.sha1(repr(SERVICE_RESEARCH_OVERRIDES).encode('utf-8')).hexdigest()[:12]
+    return f'{base}-{digest}'
+
+
+def _profile_cache_key(service):
+    updated_at = getattr(service, 'updated_at', None)
+    stamp = updated_at.isoformat() if updated_at else 'static'
+    return f'service-profile:{_profile_code_version()}:{service.id}:{service.slug}:{stamp}'
+
+
+def _build_profile(service):
+    from public.views.pages import _normalize_service_profile
+
+    return freeze(_normalize_service_profile(service))
+
+
+def refresh_service_profile(service):
+    """Rebuild and store the cached profile for *service*; returns it."""
+    key = _profile_cache_key(service)
+    profile = _build_profile(service)
+    try:
+        cache.set(key, profile, PROFILE_CACHE_TTL)
+    except Exception:
+        pass
+    _remember(key, profile)
+    return profile
+
+
+def _remember(key, profile):
+    if len(_local_profiles) >= LOCAL_PROFILE_LIMIT:
+        _local_profiles.clear()
+    _local_profiles[key] = profile
+
+
+def get_service_profile(service):
+    """Return the normalized (read-only) profile for *service*."""
+    key = _profile_cache_key(service)
+    local = _local_profiles.get(key)
+    if local is not None:
+        return local
+    try:
+        cached = cache.get(key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        _remember(key, cached)
+        return cached
+    return refresh_service_profile(service)
+
+
+def warm_service_profiles():
+    """Precompute profiles for every non-trashed and virtual service; returns the count."""
+    services = list(Service.objects.filter(Q(is_trashed=False) | Q(is_trashed__isnull=True)))
+    services.extend(virtual_services())
+    for service in services:
+        refresh_service_profile(service)
+    return len(services)
@@ -0,0 +1,87 @@
+"""
+In-memory slug index for service and industry detail pages.
+
+Maps every reachable slug to what the detail view should do with it:
+``('row', id)`` to render a DB row, ``('virtual', slug)`` to render a virtual
+service, or ``('redirect', target_slug)`` for legacy aliases. Slugs that are not
+in the index are a 404 without any query, which also covers bot-probed paths.
+
+The index is rebuilt after content saves (namespace bump) and otherwise kept for
+``SLUG_INDEX_TTL`` seconds as a safety net for out-of-band edits.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.cache_build import get_or_build
+from core.cache_namespaces import NAMESPACE_SLUG_INDEX, bump_namespaces, namespaced_key
+from core.constants import WORKFLOW_PUBLISHED
+from core.local_cache import LocalCache
+from public.models import Industry, Service
+from public.virtual_services import SERVICE_ORDERING, VIRTUAL_SERVICES_BY_SLUG
+
+SLUG_INDEX_TTL = max(30, int(getattr(settings, 'SLUG_INDEX_TTL', 300)))
+
+_slug_index_l1 = LocalCache(NAMESPACE_SLUG_INDEX, ttl=SLUG_INDEX_TTL, max_entries=2, version_check_seconds=2)
+
+
+def _row_slugs(model):
+    """Return ``{slug: id}`` preferring published rows, then sort order, like the old query cascade."""
+    published = {}
+    fallback = {}
+    rows = (
+        model.objects.filter(Q(is_trashed=False) | Q(is_trashed__isnull=True))
+        .order_by(*SERVICE_ORDERING)
+        .values_list('id', 'slug', 'workflow_status')
+    )
+    for row_id, slug, status in rows:
+        if not slug:
+            continue
+        if status == WORKFLOW_PUBLISHED:
+            published.setdefault(slug, row_id)
+        fallback.setdefault(slug, row_id)
+    return {**fallback, **published}
+
+
+def _build_index(model, aliases, virtual_slugs=()):
+    index = {slug: ('row', row_id) for slug, row_id in _row_slugs(model).items()}
+    for slug in virtual_slugs:
+        index.setdefault(slug, ('virtual', slug))
+    for alias, target in aliases.items():
+        if alias not in index and target in index:
+            index[alias] = ('redirect', target)
+    return index
+
+
+def _build_service_index():
+    from public.views.pages import SERVICE_SLUG_ALIASES
+
+    return _build_index(Service, SERVICE_SLUG_ALIASES, [slug for slug in VIRTUAL_SERVICES_BY_SLUG if slug])
+
+
+def _build_industry_index():
+    from public.views.pages import INDUSTRY_SLUG_ALIASES
+
+    return _build_index(Industry, INDUSTRY_SLUG_ALIASES)
+
+
+def _load(name, builder):
+    def load():
+        return get_or_build(namespaced_key(NAMESPACE_SLUG_INDEX, name), builder, SLUG_INDEX_TTL, name=f'slug_index:{name}')
+
+    return _slug_index_l1.get(name, load)
+
+
+def resolve_service_slug(slug):
+    """Return ``('row', id)``, ``('virtual', slug)``, ``('redirect', slug)`` or ``None``."""
+    return _load('services', _build_service_index).get(slug)
+
+
+def resolve_industry_slug(slug):
+    """Return ``('row', id)``, ``('redirect', slug)`` or ``None``."""
+    return _load('industries', _build_industry_index).get(slug)
+
+
+def invalidate_slug_index():
+    bump_namespaces(NAMESPACE_SLUG_INDEX)
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core import cache_build
+
+
+class GetOrBuildTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def _builder(self):
+        self.builds += 1
+        return f'value-{self.builds}'
+
+    def test_builds_once_then_serves_hits(self):
+        first = cache_build.get_or_build('test:key', self._builder, 60, name='test-hits')
+        second = cache_build.get_or_build('test:key', self._builder, 60, name='test-hits')
+
+        self.assertEqual(first, 'value-1')
+        self.assertEqual(second, 'value-1')
+        self.assertEqual(self.builds, 1)
+        stats = cache_build.cache_build_stats(['test-hits'])['test-hits']
+        self.assertEqual((stats['miss'], stats['hit'], stats['rebuild']), (1, 1, 1))
+
+    def _expire(self, key):
+        envelope = cache.get(key)
+        envelope['expires_at'] -= 120
+        cache.set(key, envelope, 60)
+
+    def test_expired_value_is_served_stale_while_another_caller_rebuilds(self):
+        cache_build.get_or_build('test:stale', self._builder, 60, name='test-stale')
+        self._expire('test:stale')
+        cache.add('test:stale:build-lock', 1, 30)
+
+        value = cache_build.get_or_build('test:stale', self._builder, 60, name='test-stale')
+
+        self.assertEqual(value, 'value-1')
+        self.assertEqual(self.builds, 1)
+
+    def test_expired_value_is_rebuilt_by_lock_holder(self):
+        cache_build.get_or_build('test:rebuild', self._builder, 60, name='test-rebuild')
+        self._expire('test:rebuild')
+
+        value = cache_build.get_or_build('test:rebuild', self._builder, 60, name='test-rebuild')
+
+        self.assertEqual(value, 'value-2')
+        self.assertIsNone(cache.get('test:rebuild:build-lock'))
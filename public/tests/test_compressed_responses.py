@@ -0,0 +1,60 @@
+import gzip
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase
+
+from core import compressed_responses
+from core.compressed_responses import response_variants, variant_response
+
+BODY = ('<url><loc>https://example.com/page</loc></url>\n' * 40).encode('utf-8')
+
+
+class CompressedResponseTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_precompressed_variant_is_served_and_refused_encodings_are_skipped(self):
+        variants = response_variants(BODY, 'application/xml', last_modified=1767225600)
+        self.assertIn('gzip', variants['encodings'])
+
+        with patch('core.compressed_responses._compress') as compress_mock:
+            response = variant_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='br;q=0, gzip;q=0.8'), variants)
+        compress_mock.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Last-Modified'], 'Thu, 01 Jan 2026 00:00:00 GMT')
+
+        refused = variant_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'), variants)
+        self.assertNotIn('Content-Encoding', refused)
+        self.assertEqual(refused.content, BODY)
+
+    def test_revalidation_skips_lazy_compression(self):
+        variants = response_variants(BODY, 'application/json', precompress=False)
+        first = variant_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), variants)
+
+        with patch.object(compressed_responses, '_compress') as compress_mock:
+            revalidated = variant_response(
+                self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag']),
+                variants,
+            )
+        self.assertEqual(revalidated.status_code, 304)
+        compress_mock.assert_not_called()
+
+    def test_small_bodies_are_not_encoded(self):
+        response = variant_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), response_variants(b'ok', 'text/plain'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+    def test_lazy_encoding_uses_the_fast_levels(self):
+        variants = response_variants(BODY, 'application/json', precompress=False)
+
+        with patch.object(compressed_responses, '_compress', wraps=compressed_responses._compress) as compress_mock:
+            response = variant_response(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip'), variants)
+        compress_mock.assert_called_once_with(BODY, 'gzip', compressed_responses.LAZY_COMPRESS_LEVELS)
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_streaming_negotiation_only_offers_gzip(self):
+        negotiate = compressed_responses.negotiate_encoding
+        self.assertEqual(negotiate(self.factory.get('/', HTTP_ACCEPT_ENCODING='br, gzip'), encodings=('gzip',)), 'gzip')
+        self.assertIsNone(negotiate(self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, br'), encodings=('gzip',)))
+        self.assertIsNone(negotiate(self.factory.get('/'), encodings=('gzip',)))
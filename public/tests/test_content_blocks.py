@@ -0,0 +1,83 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase
+
+from core import content_blocks, context_processors
+from core.utils import get_page_content
+
+UPDATED_AT = datetime(2026, 1, 5, 12, 0, 0)
+ROWS = [
+    (1, 'home', 'trust_signals', json.dumps({'items': [{'label': 'Certified', 'icon': 'fa-star'}]})),
+    (2, 'home', 'hero', json.dumps({'title': 'Hello'})),
+    (3, 'footer', 'service_area', json.dumps({'description': 'OC'})),
+]
+
+
+def _fake_filter(page__in):
+    rows = [row for row in ROWS if row[1] in page__in]
+    queryset = MagicMock()
+
+    def values_list(*fields):
+        if 'content' in fields:
+            return [(page, section, content) for _, page, section, content in rows]
+        return [(block_id, page, section, UPDATED_AT) for block_id, page, section, _ in rows]
+
+    queryset.values_list.side_effect = values_list
+    return queryset
+
+
+class ContentBlockLoaderTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch('core.content_blocks.ContentBlock.objects.filter', side_effect=_fake_filter)
+        self.filter_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_loads_several_pages_with_one_query_and_memoizes_per_request(self):
+        request = RequestFactory().get('/')
+
+        pages = content_blocks.load_page_content(['home', 'footer', 'about'], request=request)
+        again = content_blocks.load_page_content(['home'], request=request)
+
+        self.assertEqual(pages['home']['hero'], {'title': 'Hello'})
+        self.assertEqual(pages['footer']['service_area'], {'description': 'OC'})
+        self.assertEqual(pages['about'], {})
+        self.assertIs(again['home'], pages['home'])
+        # One stamp query plus one content query for the two cold pages.
+        self.assertEqual(self.filter_mock.call_count, 2)
+
+    @patch('core.context_processors._context_l1.get', side_effect=lambda name, loader: loader())
+    @patch('core.context_processors.get_or_build', side_effect=lambda key, builder, *args, **kwargs: builder())
+    def test_page_views_load_the_footer_in_the_same_query(self, _get_or_build, _l1_get):
+        request = RequestFactory().get('/')
+
+        home = get_page_content('home', request=request)
+        footer = context_processors._get_footer_content(request)
+
+        self.assertEqual(home['hero'], {'title': 'Hello'})
+        self.assertEqual(footer['service_area']['description'], 'OC')
+        self.assertEqual(self.filter_mock.call_count, 2)
+        self.assertEqual(self.filter_mock.call_args_list[0].kwargs, {'page__in': ['home', 'footer']})
+
+    def test_unchanged_blocks_skip_content_query_across_requests(self):
+        content_blocks.load_page_content(['home'])
+        self.filter_mock.reset_mock()
+
+        pages = content_blocks.load_page_content(['home'])
+
+        self.assertEqual(pages['home']['hero']['title'], 'Hello')
+        self.assertEqual(self.filter_mock.call_count, 1)
+
+    def test_loaded_content_is_read_only(self):
+        home = content_blocks.load_page_content(['home'])['home']
+
+        with self.assertRaises(TypeError):
+            home['trust_signals']['items'][0]['icon'] = 'fa-solid fa-bolt'
+        with self.assertRaises(TypeError):
+            home['trust_signals']['items'].append({})
+        self.assertIsInstance(home.copy(), dict)
+        home.copy()['hero'] = {}
+        self.assertEqual(home['hero'], {'title': 'Hello'})
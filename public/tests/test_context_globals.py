@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase
+
+from core import context_processors
+
+
+class LazyGlobalsContextTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/about', HTTP_HOST='example.com')
+        self.request.user = AnonymousUser()
+        self.request.csp_nonce = 'nonce'
+
+    @patch('core.context_processors._get_footer_content')
+    @patch('core.context_processors._get_navigation_items')
+    @patch('core.context_processors._get_site_settings', return_value={'company_name': 'Acme', 'theme_mode': 'dark'})
+    def test_only_globals_read_by_template_are_loaded(self, settings_mock, nav_mock, footer_mock):
+        template = engines['jinja2'].from_string(
+            "{{ site_settings.company_name }}|{{ theme_mode }}|{{ public_url(request.url) }}"
+        )
+
+        body = template.render({}, self.request)
+
+        self.assertEqual(body, 'Acme|dark|http://example.com/about')
+        settings_mock.assert_called_once()
+        nav_mock.assert_not_called()
+        footer_mock.assert_not_called()
+        self.assertEqual(
+            self.request.template_globals_used,
+            {'<string>': ['request.url', 'site_settings', 'theme_mode']},
+        )
+        report = context_processors.globals_usage_report()['<string>']
+        self.assertGreaterEqual(report['_renders'], 1)
+        self.assertNotIn('nav_professional', report)
@@ -0,0 +1,54 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core import keyset
+
+
+class CursorTests(SimpleTestCase):
+    def test_cursor_round_trips_and_is_opaque(self):
+        cursor = keyset._encode('a', datetime(2026, 3, 1, 12, 30).isoformat(), 42)
+
+        self.assertNotIn('2026', cursor)
+        self.assertEqual(keyset._decode(cursor), ('a', datetime(2026, 3, 1, 12, 30), 42))
+
+    def test_malformed_cursor_means_first_page(self):
+        malformed = (
+            '',
+            'not base64 !!',
+            'bw',
+            keyset._encode('z', '', 1),
+            keyset._encode('a', 'yesterday', 1),
+            keyset._encode('a', '2026-03-01T12:30:00'),
+        )
+        for cursor in malformed:
+            self.assertIsNone(keyset._decode(cursor))
+
+    def test_null_timestamps_follow_database_ordering(self):
+        with patch.object(keyset, '_nulls_high', return_value=False):
+            self.assertIn(('created_at__isnull', True), keyset._below('created_at', datetime(2026, 1, 1)).children)
+        with patch.object(keyset, '_nulls_high', return_value=True):
+            self.assertIn(('created_at__isnull', True), keyset._above('created_at', datetime(2026, 1, 1)).children)
+
+
+class OffsetPageTests(SimpleTestCase):
+    def test_walks_forward_and_back(self):
+        results = list(range(25))
+
+        first = keyset.offset_page(results, '', per_page=10)
+        second = keyset.offset_page(results, first.next_cursor, per_page=10)
+        third = keyset.offset_page(results, second.next_cursor, per_page=10)
+        back = keyset.offset_page(results, third.prev_cursor, per_page=10)
+
+        self.assertFalse(first.has_prev)
+        self.assertEqual(second.items, list(range(10, 20)))
+        self.assertEqual(third.items, list(range(20, 25)))
+        self.assertFalse(third.has_next)
+        self.assertEqual(back.items, second.items)
+
+    def test_depth_is_capped(self):
+        page = keyset.offset_page(list(range(100)), keyset._encode('o', 90), per_page=10, max_offset=30)
+
+        self.assertEqual(page.items, list(range(30, 40)))
+        self.assertFalse(page.has_next)
@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core import page_cache
+
+
+class PublicPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.calls = 0
+        cache.clear()
+        patcher = patch('core.page_cache._theme_mode', return_value='light')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @page_cache.cache_public_page('content_block:home')
+        def view(request, slug):
+            self.calls += 1
+            page_cache.tag_page(request, f'service:{slug}')
+            return HttpResponse(f'<script nonce="{request.csp_nonce}"></script>render-{self.calls}')
+
+        self.view = view
+
+    def _get(self, nonce, user=None):
+        request = self.factory.get('/services/a', HTTP_HOST='example.com')
+        request.user = user or AnonymousUser()
+        request.csp_nonce = nonce
+        return self.view(request, slug='7')
+
+    def test_cached_page_gets_fresh_nonce_per_response(self):
+        first = self._get('nonce-one')
+        second = self._get('nonce-two')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertIn(b'nonce="nonce-one"', first.content)
+        self.assertIn(b'nonce="nonce-two"', second.content)
+        self.assertNotIn(page_cache.CSP_NONCE_PLACEHOLDER.encode(), second.content)
+
+    def test_purging_a_tag_only_drops_dependent_pages(self):
+        self._get('n1')
+        page_cache.purge_tags('industry:7', 'content_block:about')
+        self.assertEqual(self._get('n2')['X-Page-Cache'], 'HIT')
+
+        page_cache.purge_tags('service:7')
+        response = self._get('n3')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertIn(b'render-2', response.content)
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = AnonymousUser()
+        user_patch = patch.object(AnonymousUser, 'is_authenticated', True)
+        with user_patch:
+            self._get('n1', user=user)
+            response = self._get('n2', user=user)
+
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(response.has_header('X-Page-Cache'))
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from public import related_content
+from public.virtual_services import SERVICE_ORDERING
+
+
+def _service(id, title, service_type, sort_order):
+    return SimpleNamespace(
+        id=id,
+        slug=title.lower().replace(' ', '-'),
+        title=title,
+        description=f'{title} for growing teams. ' * 10,
+        icon_class='',
+        service_type=service_type,
+        sort_order=sort_order,
+    )
+
+
+SERVICES = [
+    _service(1, 'Managed IT', 'professional', 1),
+    _service(2, 'Cloud Backup', 'professional', 2),
+    _service(3, 'Laptop Repair', 'repair', 3),
+]
+POSTS = [
+    SimpleNamespace(id=30, slug='latest', title='Latest news', excerpt='', content='<p>Latest body</p>'),
+    SimpleNamespace(id=20, slug='backup', title='Why Cloud Backup matters', excerpt='Backups.', content=''),
+    SimpleNamespace(id=10, slug='older', title='Older news', excerpt='Older.', content=''),
+]
+
+
+def _post_filter(*args, **kwargs):
+    published = MagicMock()
+    ordered = published.filter.return_value.order_by.return_value
+    ordered.values_list.return_value = [(post.id, post.title) for post in POSTS]
+    ordered.filter.return_value.only.return_value = POSTS
+    return published
+
+
+class RelatedContentTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        related_content.invalidate_related_services()
+        patches = [
+            patch('public.related_content._service_rows', return_value=(SERVICES, SERVICES)),
+            patch('public.related_content.Industry.objects.filter'),
+            patch('public.related_content.Post.objects.filter', side_effect=_post_filter),
+        ]
+        self.service_rows, industry_filter, self.post_filter = [item.start() for item in patches]
+        for item in patches:
+            self.addCleanup(item.stop)
+        industry_filter.return_value.filter.return_value.order_by.return_value.__getitem__.return_value = [
+            SimpleNamespace(id=7, slug='healthcare', title='Healthcare', description='Clinics.', icon_class=''),
+        ]
+
+    def test_single_lookup_returns_cards_without_rebuilding(self):
+        services, industries, posts = related_content.related_content(SERVICES[1])
+
+        self.assertEqual([item['id'] for item in services], [1, 3])
+        self.assertEqual(services[0]['icon_class'], 'fa-solid fa-gear')
+        self.assertEqual(services[1]['icon_class'], 'fa-solid fa-wrench')
+        self.assertLessEqual(len(services[0]['description']), 141)
+        self.assertEqual([item['slug'] for item in industries], ['healthcare'])
+        self.assertEqual(industries[0]['icon_class'], 'fa-solid fa-building')
+        self.assertEqual([item['id'] for item in posts], [20, 30, 10])
+        self.assertEqual(posts[1]['excerpt'], 'Latest body')
+
+        related_content.related_content(SERVICES[0])
+        self.assertEqual(self.service_rows.call_count, 1)
+        self.assertEqual(self.post_filter.call_count, 1)
+
+    def test_post_invalidation_keeps_service_part(self):
+        related_content.related_content(SERVICES[0])
+        related_content.invalidate_related_posts()
+        related_content.related_content(SERVICES[0])
+
+        self.assertEqual(self.service_rows.call_count, 1)
+        self.assertEqual(self.post_filter.call_count, 2)
+
+
+class ServiceRowTests(SimpleTestCase):
+    @patch('public.related_content._active')
+    def test_service_rows_are_read_in_merge_order(self, active):
+        rows = [
+            SimpleNamespace(id=4, slug='a', sort_order=-1, workflow_status='published'),
+            SimpleNamespace(id=2, slug='b', sort_order=None, workflow_status='published'),
+            SimpleNamespace(id=7, slug='c', sort_order=20, workflow_status='draft'),
+        ]
+        ordered = active.return_value.only.return_value.order_by
+        ordered.return_value = rows
+
+        published, everything = related_content._service_rows()
+
+        ordered.assert_called_once_with(*SERVICE_ORDERING)
+        self.assertEqual([item.slug for item in everything], ['a', 'b', 'laptop-repair', 'c'])
+        self.assertEqual([item.slug for item in published], ['a', 'b', 'laptop-repair'])
@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+
+from public import search
+from public.models import Post
+
+
+class SearchQueryTests(SimpleTestCase):
+    def test_user_input_becomes_quoted_prefix_terms(self):
+        terms = search.search_terms('Battery "swap" OR NEAR(x*')
+
+        self.assertEqual(terms, ['battery', 'swap', 'or', 'near', 'x'])
+        self.assertEqual(search._fts5_query(terms[:2]), '"battery"* "swap"*')
+
+    def test_blank_query_matches_nothing_without_touching_the_database(self):
+        results = search.SearchResults(Post.objects.all(), '  ?! ')
+
+        self.assertEqual(results.count(), 0)
+        self.assertEqual(results[:6], [])
+
+    def test_sqlite_setup_keeps_the_fts_table_in_sync_with_triggers(self):
+        statements = search._sqlite_setup_sql(search.SEARCH_INDEXES[Post])
+
+        self.assertIn("content='post', content_rowid='id'", statements[0])
+        self.assertEqual(
+            [statement.split()[7] for statement in statements[1:4]], ['INSERT', 'DELETE', 'UPDATE']
+        )
+        self.assertIn("VALUES ('rebuild')", statements[-1])
+
+    def test_postgres_setup_weights_title_over_body(self):
+        statements = search._pg_setup_sql(search.SEARCH_INDEXES[Post])
+
+        self.assertIn("coalesce(title, '')), 'A')", statements[0])
+        self.assertIn("coalesce(content, '')), 'C')", statements[0])
+        self.assertIn('USING GIN (search_vector)', statements[1])
+
+
+class SnippetTests(SimpleTestCase):
+    def test_snippet_escapes_content_and_marks_matches(self):
+        raw = f'<p>Swap a {search._MARK_START}battery{search._MARK_END} & <script>x</script></p>'
+
+        self.assertEqual(str(search.render_snippet(raw)), 'Swap a <mark>battery</mark> &amp; x')
+
+    def test_python_snippet_centres_on_the_first_match(self):
+        text = ' '.join(['filler'] * 40 + ['Battery', 'health'] + ['tail'] * 40)
+
+        snippet = str(search._python_snippet(text, ['battery']))
+
+        self.assertTrue(snippet.startswith('… '))
+        self.assertTrue(snippet.endswith(' …'))
+        self.assertIn('<mark>Battery</mark> health', snippet)
@@ -1,9 +1,22 @@
+import gzip
+from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import patch
 
+from django.http import Http404
 from django.test import RequestFactory, SimpleTestCase, override_settings
 
 from public.views import seo
 
+STAMPS = {
+    'pages': (10, None),
+    'services': (3, datetime(2026, 1, 15, 8, 0)),
+    'industries': (2, datetime(2026, 1, 10, 8, 0)),
+    'posts': (5, datetime(2026, 2, 1, 9, 30)),
+    'cms-pages': (1, datetime(2025, 12, 1, 8, 0)),
+    'cms-articles': (0, None),
+}
+
 
 class SeoViewTests(SimpleTestCase):
     def setUp(self):
@@ -21,6 +34,10 @@ class SeoViewTests(SimpleTestCase):
         self.assertIn('Disallow: /admin/', body)
         self.assertIn('Disallow: /api/', body)
         self.assertIn('Sitemap: http://example.com/sitemap.xml', body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        revalidate = self.factory.get('/robots.txt', HTTP_HOST='example.com', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(seo.robots_txt(revalidate).status_code, 304)
 
     @override_settings(APP_BASE_URL='https://prod.example.com', ROBOTS_DISALLOW_ALL=True, SEO_CACHE_VERSION='test-b')
     def test_robots_txt_can_disallow_all(self):
@@ -34,30 +51,96 @@ class SeoViewTests(SimpleTestCase):
         self.assertIn('Sitemap: https://prod.example.com/sitemap.xml', body)
         self.assertEqual(response['X-Robots-Tag'], 'noindex, nofollow')
 
-    @override_settings(APP_BASE_URL='https://prod.example.com', SEO_CACHE_VERSION='test-c')
-    @patch('public.views.seo._cms_article_urls', return_value=[('https://prod.example.com/article/1', '2026-02-01')])
-    @patch('public.views.seo._cms_page_urls', return_value=[('https://prod.example.com/page/test', '2026-02-01')])
-    @patch('public.views.seo._post_urls', return_value=[('https://prod.example.com/blog/post', '2026-02-01')])
-    @patch('public.views.seo._industry_urls', return_value=[('https://prod.example.com/industries/a', '2026-02-01')])
-    @patch('public.views.seo._service_urls', return_value=[('https://prod.example.com/services/a', '2026-02-01')])
-    @patch('public.views.seo._static_urls', return_value=[('https://prod.example.com/', '')])
-    def test_sitemap_xml_contains_urls(
-        self,
-        _static_urls_mock,
-        _service_urls_mock,
-        _industry_urls_mock,
-        _post_urls_mock,
-        _cms_page_urls_mock,
-        _cms_article_urls_mock,
-    ):
+    @override_settings(APP_BASE_URL='https://prod.example.com', SEO_CACHE_VERSION='test-c', SITEMAP_SHARD_SIZE=2)
+    @patch('public.views.seo._section_stamps', return_value=STAMPS)
+    def test_sitemap_xml_is_an_index_of_section_shards(self, _stamps_mock):
         request = self.factory.get('/sitemap.xml', HTTP_HOST='example.com')
 
         response = seo.sitemap_xml(request)
         body = response.content.decode('utf-8')
 
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('<sitemapindex', body)
+        self.assertIn('<loc>https://prod.example.com/sitemap-pages-1.xml</loc>', body)
+        self.assertIn('<loc>https://prod.example.com/sitemap-posts-3.xml</loc>', body)
+        self.assertNotIn('sitemap-posts-4.xml', body)
+        self.assertNotIn('sitemap-cms-articles', body)
+        self.assertIn('<lastmod>2026-02-01</lastmod>', body)
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertTrue(response['ETag'])
+
+    @override_settings(APP_BASE_URL='https://prod.example.com', SEO_CACHE_VERSION='test-d', SITEMAP_SHARD_SIZE=2)
+    @patch('public.views.seo._section_stamps', return_value=STAMPS)
+    @patch('public.views.seo._post_urls', return_value=[('https://prod.example.com/blog/post', '2026-02-01')])
+    def test_sitemap_shard_contains_urls_and_revalidates(self, post_urls_mock, _stamps_mock):
+        request = self.factory.get('/sitemap-posts-2.xml', HTTP_HOST='example.com')
+
+        response = seo.sitemap_shard(request, 'posts', 2)
+        body = response.content.decode('utf-8')
+
         self.assertEqual(response.status_code, 200)
         self.assertIn('<urlset', body)
-        self.assertIn('<loc>https://prod.example.com/</loc>', body)
-        self.assertIn('<loc>https://prod.example.com/services/a</loc>', body)
         self.assertIn('<loc>https://prod.example.com/blog/post</loc>', body)
-        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        post_urls_mock.assert_called_once_with('https://prod.example.com', 2, 4)
+        self.assertEqual(response['Last-Modified'], 'Sun, 01 Feb 2026 09:30:00 GMT')
+
+        revalidate = self.factory.get(
+            '/sitemap-posts-2.xml', HTTP_HOST='example.com', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(seo.sitemap_shard(revalidate, 'posts', 2).status_code, 304)
+        # The body is cached under the section stamp: a full request does not rebuild it either.
+        self.assertEqual(seo.sitemap_shard(request, 'posts', 2).content, response.content)
+        self.assertEqual(post_urls_mock.call_count, 1)
+
+        with self.assertRaises(Http404):
+            seo.sitemap_shard(request, 'posts', 4)
+        with self.assertRaises(Http404):
+            seo.sitemap_shard(request, 'cms-articles', 1)
+
+    @override_settings(APP_BASE_URL='https://prod.example.com', SEO_CACHE_VERSION='test-e')
+    @patch('public.views.seo._section_stamps', return_value=STAMPS)
+    @patch(
+        'public.views.seo._post_urls',
+        return_value=[(f'https://prod.example.com/blog/post-{index}', '2026-02-01') for index in range(5)],
+    )
+    def test_sitemap_shard_serves_precompressed_gzip_when_accepted(self, _post_urls_mock, _stamps_mock):
+        request = self.factory.get('/sitemap-posts-1.xml', HTTP_HOST='example.com', HTTP_ACCEPT_ENCODING='gzip')
+
+        response = seo.sitemap_shard(request, 'posts', 1)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = gzip.decompress(response.content).decode('utf-8')
+        self.assertIn('<loc>https://prod.example.com/blog/post-4</loc>', body)
+
+    @override_settings(APP_BASE_URL='https://prod.example.com', SEO_CACHE_VERSION='test-f')
+    @patch('public.views.seo._section_stamps', return_value=STAMPS)
+    @patch('public.views.seo._get_site_settings', return_value={'company_name': 'Right On Repair'})
+    @patch('public.views.seo._feed_posts')
+    def test_blog_feeds_stream_latest_posts(self, feed_posts_mock, _settings_mock, _stamps_mock):
+        post = SimpleNamespace(
+            slug='backup-basics',
+            title='Backup <basics>',
+            excerpt='',
+            content='<p>Keep three copies.</p>',
+            published_at=datetime(2026, 2, 1, 9, 30),
+            created_at=datetime(2026, 1, 30, 9, 30),
+            updated_at=None,
+            category_id=None,
+            category=None,
+        )
+        feed_posts_mock.side_effect = lambda: iter([post])
+
+        rss = seo.blog_feed(self.factory.get('/blog/feed.xml', HTTP_HOST='example.com'))
+        body = b''.join(rss.streaming_content).decode('utf-8')
+        self.assertTrue(rss['Content-Type'].startswith('application/rss+xml'))
+        self.assertIn('<title>Backup &lt;basics&gt;</title>', body)
+        self.assertIn('<link>https://prod.example.com/blog/backup-basics</link>', body)
+        self.assertIn('<pubDate>Sun, 01 Feb 2026 09:30:00 GMT</pubDate>', body)
+        self.assertIn('<description>Keep three copies.</description>', body)
+
+        atom = seo.blog_atom(self.factory.get('/blog/atom.xml', HTTP_HOST='example.com'))
+        body = b''.join(atom.streaming_content).decode('utf-8')
+        self.assertIn('<feed xmlns="http://www.w3.org/2005/Atom">', body)
+        self.assertIn('<published>2026-02-01T09:30:00Z</published>', body)
+        self.assertNotEqual(rss['ETag'], atom['ETag'])
@@ -0,0 +1,45 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from public.service_profiles import get_service_profile, refresh_service_profile
+
+
+def _service(updated_at, description='Managed endpoint, identity, and backup operations.'):
+    return SimpleNamespace(
+        id=41,
+        slug='managed-it-services',
+        title='Managed IT Services',
+        description=description,
+        service_type='professional',
+        profile_json='',
+        updated_at=updated_at,
+    )
+
+
+class ServiceProfileCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_profile_is_reused_until_service_version_changes(self):
+        first_version = _service(datetime(2026, 3, 1, 9, 0))
+        profile = get_service_profile(first_version)
+
+        self.assertIs(get_service_profile(first_version), profile)
+        with self.assertRaises(TypeError):
+            profile['meta_title'] = 'changed'
+
+        edited = _service(datetime(2026, 3, 2, 9, 0), description='Fully rewritten description for the edited service.')
+        self.assertIsNot(get_service_profile(edited), profile)
+
+    def test_refresh_replaces_cached_entry(self):
+        service = _service(datetime(2026, 3, 1, 9, 0))
+        get_service_profile(service)
+        service.profile_json = '{"meta_title": "Refreshed title"}'
+
+        refreshed = refresh_service_profile(service)
+
+        self.assertEqual(refreshed['meta_title'], 'Refreshed title')
+        self.assertEqual(get_service_profile(service)['meta_title'], 'Refreshed title')
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from public import slug_index
+
+SERVICE_ROWS = [
+    (5, 'managed-it-services', 'draft'),
+    (9, 'managed-it-services', 'published'),
+    (12, 'web-development', 'draft'),
+]
+
+
+def _queryset(rows):
+    queryset = MagicMock()
+    queryset.order_by.return_value.values_list.return_value = rows
+    return queryset
+
+
+class SlugIndexTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        slug_index.invalidate_slug_index()
+        patcher = patch('public.slug_index.Service.objects.filter', return_value=_queryset(SERVICE_ROWS))
+        self.filter_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resolves_rows_virtual_services_and_aliases(self):
+        self.assertEqual(slug_index.resolve_service_slug('managed-it-services'), ('row', 9))
+        self.assertEqual(slug_index.resolve_service_slug('web-development'), ('row', 12))
+        self.assertEqual(slug_index.resolve_service_slug('laptop-repair'), ('virtual', 'laptop-repair'))
+        self.assertEqual(slug_index.resolve_service_slug('data-analytics-bi'), ('redirect', 'web-development'))
+        self.assertEqual(slug_index.resolve_service_slug('computer-laptop-repair'), ('redirect', 'laptop-repair'))
+        # Alias whose target does not exist is a plain 404.
+        self.assertIsNone(slug_index.resolve_service_slug('server-network-repair'))
+        self.assertEqual(self.filter_mock.call_count, 1)
+
+    def test_unknown_slugs_are_negative_hits_until_invalidated(self):
+        for probe in ('wp-login', 'phpmyadmin', '.env'):
+            self.assertIsNone(slug_index.resolve_service_slug(probe))
+        self.assertEqual(self.filter_mock.call_count, 1)
+
+        slug_index.invalidate_slug_index()
+        slug_index.resolve_service_slug('wp-login')
+        self.assertEqual(self.filter_mock.call_count, 2)
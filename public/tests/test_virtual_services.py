@@ -0,0 +1,46 @@
+import pickle
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from public import virtual_services
+from public.views import pages
+
+
+def _row(id, slug, sort_order, service_type='repair', is_featured=False):
+    return SimpleNamespace(id=id, slug=slug, sort_order=sort_order, service_type=service_type, is_featured=is_featured)
+
+
+class VirtualServiceCatalogTests(SimpleTestCase):
+    def test_catalog_entries_are_shared_and_read_only(self):
+        laptop = virtual_services.virtual_service_by_slug('laptop-repair')
+
+        self.assertIs(virtual_services.virtual_service_by_slug('laptop-repair'), laptop)
+        self.assertIsNone(virtual_services.virtual_service_by_slug('unknown'))
+        with self.assertRaises(AttributeError):
+            laptop.title = 'Changed'
+        pages.normalize_icon_attr([laptop], 'fa-solid fa-gear')
+        self.assertEqual(pickle.loads(pickle.dumps(laptop)).slug, 'laptop-repair')
+
+    def test_service_rows_order_null_sort_order_like_the_merge_key(self):
+        sql = str(pages._service_queryset().query)
+
+        self.assertIn('ORDER BY COALESCE(', sql)
+        self.assertEqual(virtual_services.service_sort_key(_row(4, 'a', None)), (0, 4))
+
+    def test_inject_merges_into_sorted_rows(self):
+        rows = [_row(3, 'phone-repair', 5), _row(8, 'tv-repair', 12), _row(9, 'console-repair', 20)]
+
+        merged = virtual_services.inject_virtual_services(rows)
+        self.assertEqual([item.slug for item in merged], ['phone-repair', 'laptop-repair', 'tv-repair', 'console-repair'])
+        # sort_order ties fall back to id; the virtual id is negative.
+        merged = virtual_services.inject_virtual_services([_row(-9500, 'a', 12), _row(1, 'b', 12)])
+        self.assertEqual([item.slug for item in merged], ['a', 'laptop-repair', 'b'])
+
+    def test_inject_respects_filters_and_existing_slugs(self):
+        self.assertEqual(virtual_services.inject_virtual_services([], service_type='professional'), [])
+        self.assertEqual(virtual_services.inject_virtual_services([], is_featured=False), [])
+        self.assertEqual(virtual_services.inject_virtual_services([], exclude_id=-9001), [])
+        row = _row(4, 'laptop-repair', 1)
+        self.assertEqual(virtual_services.inject_virtual_services([row]), [row])
+        self.assertEqual(len(virtual_services.inject_virtual_services([], service_type='repair', is_featured=True)), 1)
@@ -12,6 +12,8 @@ urlpatterns = [
     path('services/repair-services', pages.services_repair_track, name='services_repair_track'),
     path('services/<slug:slug>', pages.service_detail, name='service_detail'),
     path('blog', pages.blog, name='blog'),
+    path('blog/feed.xml', seo.blog_feed, name='blog_feed'),
+    path('blog/atom.xml', seo.blog_atom, name='blog_atom'),
     path('blog/<slug:slug>', pages.post, name='post'),
     path('contact', contact.contact, name='contact'),
     path('request-quote', contact.request_quote, name='request_quote'),
@@ -23,5 +25,6 @@ urlpatterns = [
     path('industries', pages.industries, name='industries'),
     path('industries/<slug:slug>', pages.industry_detail, name='industry_detail'),
     path('sitemap.xml', seo.sitemap_xml, name='sitemap_xml'),
+    path('sitemap-<slug:section>-<int:page>.xml', seo.sitemap_shard, name='sitemap_shard'),
     path('robots.txt', seo.robots_txt, name='robots_txt'),
 ]
@@ -5,6 +5,7 @@ from django.db.models import Q
 from django.shortcuts import redirect, render
 
 from admin_panel.models import ContactSubmission
+from admin_panel.stats import invalidate_admin_stats
 from core.constants import WORKFLOW_PUBLISHED
 from core.utils import clean_text, get_page_content, is_valid_email, utc_now_naive
 from public.models import Service
@@ -51,10 +52,10 @@ def _service_lists():
     return professional, repair
 
 
-def _ctx(page):
+def _ctx(page, request=None):
     professional_services, repair_services = _service_lists()
     return {
-        'cb': get_page_content(page),
+        'cb': get_page_content(page, request=request),
         'turnstile_enabled': False,
         'turnstile_site_key': '',
         'professional_services': professional_services,
@@ -87,9 +88,10 @@ def _create_submission(name, email, phone, subject, message_text, request):
             created_at=utc_now_naive(),
             **payload,
         )
-        return True
     except Exception:
         return False
+    invalidate_admin_stats()
+    return True
 
 
 def _require(values):
@@ -156,17 +158,17 @@ def contact(request):
         )
         if missing:
             messages.error(request, f"Please complete the required fields: {', '.join(missing)}.")
-            return render(request, 'contact.html', _ctx('contact'))
+            return render(request, 'contact.html', _ctx('contact', request))
         if not is_valid_email(email):
             messages.error(request, 'Please enter a valid email address.')
-            return render(request, 'contact.html', _ctx('contact'))
+            return render(request, 'contact.html', _ctx('contact', request))
 
         if _create_submission(name, email, phone, subject, message_text, request):
             messages.success(request, 'Thank you. Your message was submitted and our team will follow up shortly.')
             return redirect('public:contact')
         messages.error(request, 'We could not submit your message right now. Please try again in a few minutes.')
 
-    return render(request, 'contact.html', _ctx('contact'))
+    return render(request, 'contact.html', _ctx('contact', request))
 
 
 def request_quote(request):
@@ -193,10 +195,10 @@ def request_quote(request):
         )
         if missing:
             messages.error(request, f"Please complete the required fields: {', '.join(missing)}.")
-            return render(request, 'request_quote.html', _ctx('request_quote'))
+            return render(request, 'request_quote.html', _ctx('request_quote', request))
         if not is_valid_email(email):
             messages.error(request, 'Please enter a valid email address.')
-            return render(request, 'request_quote.html', _ctx('request_quote'))
+            return render(request, 'request_quote.html', _ctx('request_quote', request))
 
         project_title = clean_text(request.POST.get('project_title', ''), 300)
         subject_parts = ['Business Quote Request']
@@ -211,7 +213,7 @@ def request_quote(request):
             return redirect('public:request_quote')
         messages.error(request, 'We could not submit your quote request right now. Please try again in a few minutes.')
 
-    ctx = _ctx('request_quote')
+    ctx = _ctx('request_quote', request)
     ctx.update(
         {
             'budget_options': QUOTE_BUDGET_OPTIONS,
@@ -245,10 +247,10 @@ def request_quote_personal(request):
         )
         if missing:
             messages.error(request, f"Please complete the required fields: {', '.join(missing)}.")
-            return render(request, 'request_quote_personal.html', _ctx('request_quote_personal'))
+            return render(request, 'request_quote_personal.html', _ctx('request_quote_personal', request))
         if not is_valid_email(email):
             messages.error(request, 'Please enter a valid email address.')
-            return render(request, 'request_quote_personal.html', _ctx('request_quote_personal'))
+            return render(request, 'request_quote_personal.html', _ctx('request_quote_personal', request))
 
         subject = f'Personal Quote Request | {service_slug}'
         message_text = _build_personal_quote_message(request)
@@ -257,4 +259,4 @@ def request_quote_personal(request):
             return redirect('public:request_quote_personal')
         messages.error(request, 'We could not submit your quote request right now. Please try again in a few minutes.')
 
-    return render(request, 'request_quote_personal.html', _ctx('request_quote_personal'))
+    return render(request, 'request_quote_personal.html', _ctx('request_quote_personal', request))
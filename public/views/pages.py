@@ -2,17 +2,22 @@ from __future__ import annotations
 
 import json
 import re
-from types import SimpleNamespace
 
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import redirect, render
 
 from core.constants import ORANGE_COUNTY_CA_CITIES, WORKFLOW_PUBLISHED
+from core.keyset import keyset_page, offset_page
+from core.page_cache import cache_public_page, tag_page
 from core.service_seo_overrides import SERVICE_RESEARCH_OVERRIDES
 from core.utils import clean_text, get_page_content
 from public.models import Category, CmsArticle, CmsPage, Industry, Post, Service, TeamMember, Testimonial
+from public.related_content import related_content
+from public.search import SearchResults
+from public.service_profiles import get_service_profile
+from public.slug_index import resolve_industry_slug, resolve_service_slug
+from public.virtual_services import SERVICE_ORDERING, inject_virtual_services, virtual_service_by_slug
 
 SERVICE_SLUG_ALIASES = {
     'computer-laptop-repair': 'laptop-repair',
@@ -24,22 +29,6 @@ SERVICE_SLUG_ALIASES = {
     'it-consulting-strategy': 'managed-it-services',
 }
 
-VIRTUAL_SERVICE_DEFINITIONS = (
-    {
-        'id': -9001,
-        'slug': 'laptop-repair',
-        'title': 'Laptop Repair',
-        'description': (
-            'Fast laptop diagnostics and repair in Orange County: screen replacement, battery swap, '
-            'charging-port repair, keyboard and hinge fixes, thermal cleanup, and SSD performance recovery.'
-        ),
-        'icon_class': 'fa-solid fa-laptop-medical',
-        'service_type': 'repair',
-        'sort_order': 12,
-        'is_featured': True,
-    },
-)
-
 INDUSTRY_SLUG_ALIASES = {
     'healthcare': 'healthcare-clinics',
     'finance-banking': 'law-firms',
@@ -61,47 +50,6 @@ ICON_CLASS_ALIASES = {
 VALID_ICON_STYLES = {'fa-solid', 'fa-regular', 'fa-brands'}
 
 
-class PaginationAdapter:
-    def __init__(self, page_obj):
-        self._page = page_obj
-        self.page = page_obj.number
-        self.pages = page_obj.paginator.num_pages
-        self.total = page_obj.paginator.count
-
-    @property
-    def items(self):
-        return list(self._page.object_list)
-
-    @property
-    def has_prev(self):
-        return self._page.has_previous()
-
-    @property
-    def has_next(self):
-        return self._page.has_next()
-
-    @property
-    def prev_num(self):
-        return self._page.previous_page_number() if self.has_prev else None
-
-    @property
-    def next_num(self):
-        return self._page.next_page_number() if self.has_next else None
-
-    def iter_pages(self, left_edge=1, right_edge=1, left_current=1, right_current=2):
-        last = 0
-        for num in self._page.paginator.page_range:
-            if (
-                num <= left_edge
-                or (self.page - left_current - 1 < num < self.page + right_current)
-                or num > self.pages - right_edge
-            ):
-                if last + 1 != num:
-                    yield None
-                yield num
-                last = num
-
-
 def normalize_icon_class(icon_class, fallback='fa-solid fa-circle'):
     fallback = fallback if ICON_CLASS_RE.match(fallback) else 'fa-solid fa-circle'
     raw = clean_text(str(icon_class or ''), 120)
@@ -127,7 +75,10 @@ def normalize_icon_class(icon_class, fallback='fa-solid fa-circle'):
 
 def normalize_icon_attr(items, fallback):
     for item in items:
-        item.icon_class = normalize_icon_class(getattr(item, 'icon_class', ''), fallback)
+        icon_class = getattr(item, 'icon_class', '')
+        normalized = normalize_icon_class(icon_class, fallback)
+        if normalized != icon_class:
+            item.icon_class = normalized
     return items
 
 
@@ -144,74 +95,15 @@ def _published_queryset(model):
 
 
 def _service_base_queryset():
-    return _active_queryset(Service).order_by('sort_order', 'id')
+    return _active_queryset(Service).order_by(*SERVICE_ORDERING)
 
 
 def _service_queryset(only_published=True):
     if only_published:
-        return _published_queryset(Service).order_by('sort_order', 'id')
+        return _published_queryset(Service).order_by(*SERVICE_ORDERING)
     return _service_base_queryset()
 
 
-def _virtual_services():
-    items = []
-    for definition in VIRTUAL_SERVICE_DEFINITIONS:
-        items.append(
-            SimpleNamespace(
-                id=definition.get('id', 0),
-                slug=definition.get('slug', ''),
-                title=definition.get('title', ''),
-                description=definition.get('description', ''),
-                icon_class=definition.get('icon_class', 'fa-solid fa-circle'),
-                service_type=definition.get('service_type', 'repair'),
-                sort_order=definition.get('sort_order', 0),
-                is_featured=bool(definition.get('is_featured', False)),
-                profile_json='',
-                seo_title='',
-                seo_description='',
-                og_image='',
-                workflow_status=WORKFLOW_PUBLISHED,
-                image='',
-                scheduled_publish_at=None,
-                published_at=None,
-                created_at=None,
-                updated_at=None,
-            )
-        )
-    return items
-
-
-def _virtual_service_by_slug(slug):
-    normalized = clean_text(slug, 180)
-    for item in _virtual_services():
-        if item.slug == normalized:
-            return item
-    return None
-
-
-def _inject_virtual_services(items, *, service_type=None, is_featured=None, exclude_id=None):
-    merged = list(items)
-    existing_slugs = {clean_text(getattr(item, 'slug', ''), 200) for item in merged}
-    for candidate in _virtual_services():
-        if candidate.slug in existing_slugs:
-            continue
-        if service_type and candidate.service_type != service_type:
-            continue
-        if is_featured is not None and bool(candidate.is_featured) != bool(is_featured):
-            continue
-        if exclude_id is not None and candidate.id == exclude_id:
-            continue
-        merged.append(candidate)
-        existing_slugs.add(candidate.slug)
-    return sorted(
-        merged,
-        key=lambda item: (
-            int(getattr(item, 'sort_order', 0) or 0),
-            int(getattr(item, 'id', 0) or 0),
-        ),
-    )
-
-
 def _industry_base_queryset():
     return _active_queryset(Industry).order_by('sort_order', 'id')
 
@@ -233,14 +125,14 @@ def _service_list(service_type=None, is_featured=None, exclude_id=None, limit=No
             q = q.exclude(id=exclude_id)
         return list(q)
 
-    items = _inject_virtual_services(
+    items = inject_virtual_services(
         _apply(_service_queryset(only_published=True)),
         service_type=service_type,
         is_featured=is_featured,
         exclude_id=exclude_id,
     )
     if not items and allow_fallback:
-        items = _inject_virtual_services(
+        items = inject_virtual_services(
             _apply(_service_queryset(only_published=False)),
             service_type=service_type,
             is_featured=is_featured,
@@ -837,6 +729,7 @@ def _build_home_hero_cards(cb, all_services):
     ]
 
 
+@cache_public_page('content_block:home', 'testimonials')
 def index(request):
     ctx = _base_context()
     pro_services = normalize_icon_attr(
@@ -862,7 +755,8 @@ def index(request):
     all_services = _service_list()
 
     testimonials = list(_active_queryset(Testimonial).filter(is_featured=True).order_by('id'))
-    cb = get_page_content('home')
+    # Content blocks are shared read-only data; build a page-local copy.
+    cb = get_page_content('home', request=request).copy()
 
     # Normalize icon payloads coming from content blocks.
     trust = cb.get('trust_signals') if isinstance(cb.get('trust_signals'), dict) else {}
@@ -874,18 +768,20 @@ def index(request):
                 label = clean_text(item.get('label', ''), 90)
                 if not label:
                     continue
-                item['icon'] = normalize_icon_class(item.get('icon', ''), 'fa-solid fa-circle-check')
-                item['label'] = label
-                normalized_trust_items.append(item)
+                normalized_trust_items.append(
+                    {
+                        **item,
+                        'icon': normalize_icon_class(item.get('icon', ''), 'fa-solid fa-circle-check'),
+                        'label': label,
+                    }
+                )
         if normalized_trust_items:
-            trust['items'] = normalized_trust_items[:10]
-            cb['trust_signals'] = trust
+            cb['trust_signals'] = {**trust, 'items': normalized_trust_items[:10]}
 
     service_area = cb.get('service_area', {})
     if not isinstance(service_area, dict):
         service_area = {}
-    service_area['cities'] = list(ORANGE_COUNTY_CA_CITIES)
-    cb['service_area'] = service_area
+    cb['service_area'] = {**service_area, 'cities': list(ORANGE_COUNTY_CA_CITIES)}
 
     ctx.update(
         {
@@ -902,10 +798,11 @@ def index(request):
 def about(request):
     ctx = _base_context()
     team = list(_active_queryset(TeamMember).order_by('sort_order', 'id'))
-    ctx.update({'team': team, 'cb': get_page_content('about')})
+    ctx.update({'team': team, 'cb': get_page_content('about', request=request)})
     return render(request, 'about.html', ctx)
 
 
+@cache_public_page('content_block:services')
 def services(request):
     ctx = _base_context()
     service_type = request.GET.get('type', '')
@@ -917,7 +814,7 @@ def services(request):
         _service_list(service_type='repair'),
         'fa-solid fa-wrench',
     )
-    cb = get_page_content('services')
+    cb = get_page_content('services', request=request)
     if not isinstance(cb, dict):
         cb = {}
     ctx.update(
@@ -941,11 +838,7 @@ def services_repair_track(request):
 
 def blog(request):
     ctx = _base_context()
-    try:
-        page = int(request.GET.get('page', 1) or 1)
-    except (TypeError, ValueError):
-        page = 1
-    page = max(1, min(page, 1000))
+    cursor = clean_text(request.GET.get('cursor', ''), 200)
     category_slug = clean_text(request.GET.get('category', ''), 120)
     search = clean_text(request.GET.get('q', ''), 120)
 
@@ -957,11 +850,9 @@ def blog(request):
             query = query.filter(category_id=cat.id)
 
     if search:
-        query = query.filter(title__icontains=search)
-
-    paginator = Paginator(query.order_by('-created_at', '-id'), 6)
-    page_obj = paginator.get_page(page)
-    posts = PaginationAdapter(page_obj)
+        posts = offset_page(SearchResults(query, search), cursor, per_page=6)
+    else:
+        posts = keyset_page(query, cursor, per_page=6, field='created_at')
     categories = list(Category.objects.only('id', 'name', 'slug').order_by('name', 'id'))
 
     ctx.update({'posts': posts, 'categories': categories, 'current_category': category_slug, 'search': search})
@@ -985,15 +876,14 @@ def post(request, slug):
     return render(request, 'post.html', ctx)
 
 
+@cache_public_page('content_block:industries')
 def industries(request):
     ctx = _base_context()
     all_industries = normalize_icon_attr(
         _industry_list(),
         'fa-solid fa-building',
     )
-    cb = get_page_content('industries')
-    if not isinstance(cb, dict):
-        cb = {}
+    cb = get_page_content('industries', request=request).copy()
     expertise = cb.get('expertise', {})
     if isinstance(expertise, dict) and isinstance(expertise.get('items'), list):
         normalized_items = []
@@ -1012,24 +902,23 @@ def industries(request):
                 }
             )
         if normalized_items:
-            expertise['items'] = normalized_items[:8]
-            cb['expertise'] = expertise
+            cb['expertise'] = {**expertise, 'items': normalized_items[:8]}
     ctx.update({'industries': all_industries, 'cb': cb})
     return render(request, 'industries.html', ctx)
 
 
+@cache_public_page()
 def industry_detail(request, slug):
-    industry = _industry_queryset(only_published=True).filter(slug=slug).first()
-    if not industry:
-        industry = _industry_queryset(only_published=False).filter(slug=slug).first()
-    if industry is None and slug in INDUSTRY_SLUG_ALIASES:
-        aliased = _industry_queryset(only_published=True).filter(slug=INDUSTRY_SLUG_ALIASES[slug]).first()
-        if not aliased:
-            aliased = _industry_queryset(only_published=False).filter(slug=INDUSTRY_SLUG_ALIASES[slug]).first()
-        if aliased:
-            return redirect('public:industry_detail', slug=INDUSTRY_SLUG_ALIASES[slug], permanent=True)
+    resolved = resolve_industry_slug(slug)
+    if resolved is None:
+        raise Http404
+    action, target = resolved
+    if action == 'redirect':
+        return redirect('public:industry_detail', slug=target, permanent=True)
+    industry = _industry_base_queryset().filter(id=target).first()
     if industry is None:
         raise Http404
+    tag_page(request, f'industry:{industry.id}')
 
     industry.icon_class = normalize_icon_class(industry.icon_class, 'fa-solid fa-building')
     normalized_industry = _normalize_industry_content(industry)
@@ -1069,65 +958,26 @@ def industry_detail(request, slug):
     return render(request, 'industry_detail.html', ctx)
 
 
+@cache_public_page('posts')
 def service_detail(request, slug):
-    service = _service_queryset(only_published=True).filter(slug=slug).first()
-    if not service:
-        service = _service_queryset(only_published=False).filter(slug=slug).first()
-    if service is None:
-        service = _virtual_service_by_slug(slug)
-    if service is None and slug in SERVICE_SLUG_ALIASES:
-        aliased = _service_queryset(only_published=True).filter(slug=SERVICE_SLUG_ALIASES[slug]).first()
-        if not aliased:
-            aliased = _service_queryset(only_published=False).filter(slug=SERVICE_SLUG_ALIASES[slug]).first()
-        if not aliased:
-            aliased = _virtual_service_by_slug(SERVICE_SLUG_ALIASES[slug])
-        if aliased:
-            return redirect('public:service_detail', slug=SERVICE_SLUG_ALIASES[slug], permanent=True)
+    resolved = resolve_service_slug(slug)
+    if resolved is None:
+        raise Http404
+    action, target = resolved
+    if action == 'redirect':
+        return redirect('public:service_detail', slug=target, permanent=True)
+    if action == 'virtual':
+        service = virtual_service_by_slug(target)
+    else:
+        service = _service_base_queryset().filter(id=target).first()
     if service is None:
         raise Http404
+    tag_page(request, f'service:{service.id}')
 
-    service.icon_class = normalize_icon_class(service.icon_class, 'fa-solid fa-gear')
-    service_profile = _normalize_service_profile(service)
-
-    related_services_same_type = normalize_icon_attr(
-        _service_list(service_type=service.service_type, exclude_id=service.id, limit=4),
-        'fa-solid fa-gear',
-    )
-    related_services_other_type = normalize_icon_attr(
-        _service_list(exclude_id=service.id, limit=8),
-        'fa-solid fa-wrench',
-    )
-    related_ids = {item.id for item in related_services_same_type}
-    related_services = list(related_services_same_type)
-    for item in related_services_other_type:
-        if item.id in related_ids or item.service_type == service.service_type:
-            continue
-        related_services.append(item)
-        related_ids.add(item.id)
-        if len(related_services) >= 6:
-            break
-
-    featured_industries = normalize_icon_attr(
-        _industry_list(limit=6),
-        'fa-solid fa-building',
-    )
+    normalize_icon_attr([service], 'fa-solid fa-gear')
+    service_profile = get_service_profile(service)
 
-    related_posts = list(
-        _published_queryset(Post)
-        .select_related('category')
-        .filter(title__icontains=service.title)
-        .order_by('-created_at', '-id')[:3]
-    )
-    if len(related_posts) < 3:
-        existing_ids = {p.id for p in related_posts}
-        fallback_posts = list(_published_queryset(Post).select_related('category').order_by('-created_at', '-id')[:6])
-        for item in fallback_posts:
-            if item.id in existing_ids:
-                continue
-            related_posts.append(item)
-            existing_ids.add(item.id)
-            if len(related_posts) >= 3:
-                break
+    related_services, featured_industries, related_posts = related_content(service)
 
     ctx = _base_context()
     ctx.update(
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
-from datetime import datetime
-from xml.sax.saxutils import escape
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
 
 from django.conf import settings
-from django.core.cache import cache
-from django.db.models import Q
-from django.http import HttpResponse
+from django.db.models import Count, Max, Q
+from django.http import Http404
 from django.urls import reverse
 from django.utils import timezone
-
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.html import strip_tags
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from core.cache_build import get_or_build
+from core.cache_namespaces import NAMESPACE_SEO, NAMESPACE_SITEMAP, namespaced_key
+from core.compressed_responses import cached_response_variants, http_timestamp, negotiate_encoding, variant_response
 from core.constants import WORKFLOW_PUBLISHED
+from core.context_processors import _get_site_settings
+from core.utils import utc_now_naive
+from core.xml_stream import XML_CONTENT_TYPE, XML_DECLARATION, streaming_xml_response, xml_element
 from public.models import CmsArticle, CmsPage, Industry, Post, Service
 
 STATIC_ROUTE_NAMES = (
@@ -30,6 +40,13 @@ VIRTUAL_SERVICE_SLUGS = (
     'laptop-repair',
 )
 
+SITEMAP_SECTIONS = ('pages', 'services', 'industries', 'posts', 'cms-pages', 'cms-articles')
+# Protocol limit per sitemap file; SITEMAP_SHARD_SIZE can only lower it.
+SITEMAP_MAX_URLS = 50000
+# Shard keys embed the section stamp, so entries never go stale; the TTL only bounds memory.
+SITEMAP_SHARD_TTL = 24 * 60 * 60
+FEED_SUMMARY_CHARS = 300
+
 
 def _public_base_url(request):
     configured = (getattr(settings, 'APP_BASE_URL', '') or '').strip().rstrip('/')
@@ -44,7 +61,7 @@ def _cache_ttl():
 
 def _cache_key(request, suffix):
     version = str(getattr(settings, 'SEO_CACHE_VERSION', 'v1'))
-    return f'seo:{version}:{suffix}:{request.scheme}:{request.get_host()}'
+    return namespaced_key(NAMESPACE_SEO, f'{version}:{suffix}:{request.scheme}:{request.get_host()}')
 
 
 def _join_url(base_url, path):
@@ -56,7 +73,7 @@ def _iso_lastmod(value):
     if not isinstance(value, datetime):
         return ''
     if timezone.is_aware(value):
-        value = timezone.localtime(value, timezone.utc)
+        value = timezone.localtime(value, dt_timezone.utc)
     return value.date().isoformat()
 
 
@@ -64,7 +81,18 @@ def _lastmod(updated_at, created_at):
     return _iso_lastmod(updated_at) or _iso_lastmod(created_at)
 
 
-def _static_urls(base_url):
+def _section_queryset(section):
+    if section == 'cms-pages':
+        return CmsPage.objects.filter(is_published=True)
+    if section == 'cms-articles':
+        return CmsArticle.objects.filter(is_published=True)
+    model = {'services': Service, 'industries': Industry, 'posts': Post}[section]
+    return model.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
+        Q(is_trashed=False) | Q(is_trashed__isnull=True)
+    )
+
+
+def _static_urls(base_url, start=0, stop=None):
     urls = []
     for route_name in STATIC_ROUTE_NAMES:
         try:
@@ -72,125 +100,299 @@ def _static_urls(base_url):
         except Exception:
             continue
         urls.append((_join_url(base_url, path), ''))
-    return urls
+    return urls[start:stop]
 
 
-def _service_urls(base_url):
-    rows = list(
-        Service.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-        Q(is_trashed=False) | Q(is_trashed__isnull=True)
-    ).only('slug', 'updated_at', 'created_at')
-    )
-    urls = [
-        (
+def _iter_service_urls(base_url):
+    existing_slugs = set()
+    rows = _section_queryset('services').order_by('id').only('slug', 'updated_at', 'created_at')
+    for row in rows.iterator():
+        existing_slugs.add(row.slug)
+        yield (
             _join_url(base_url, reverse('public:service_detail', kwargs={'slug': row.slug})),
             _lastmod(row.updated_at, row.created_at),
         )
-        for row in rows
-    ]
-    existing_slugs = {row.slug for row in rows}
     for slug in VIRTUAL_SERVICE_SLUGS:
-        if slug in existing_slugs:
-            continue
-        urls.append((_join_url(base_url, reverse('public:service_detail', kwargs={'slug': slug})), ''))
-    return urls
+        if slug not in existing_slugs:
+            yield _join_url(base_url, reverse('public:service_detail', kwargs={'slug': slug})), ''
 
 
-def _industry_urls(base_url):
-    rows = Industry.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-        Q(is_trashed=False) | Q(is_trashed__isnull=True)
-    ).only('slug', 'updated_at', 'created_at')
-    return [
-        (
-            _join_url(base_url, reverse('public:industry_detail', kwargs={'slug': row.slug})),
-            _lastmod(row.updated_at, row.created_at),
-        )
-        for row in rows
-    ]
+def _service_urls(base_url, start=0, stop=None):
+    # Virtual services trail the rows, so the section is sliced after the merge.
+    return islice(_iter_service_urls(base_url), start, stop)
 
 
-def _post_urls(base_url):
-    rows = Post.objects.filter(workflow_status=WORKFLOW_PUBLISHED).filter(
-        Q(is_trashed=False) | Q(is_trashed__isnull=True)
-    ).only('slug', 'updated_at', 'created_at')
-    return [
-        (
-            _join_url(base_url, reverse('public:post', kwargs={'slug': row.slug})),
+def _row_urls(section, base_url, start, stop, route_name, kwarg, field):
+    rows = _section_queryset(section).order_by('id').only(field, 'updated_at', 'created_at')[start:stop]
+    for row in rows.iterator():
+        yield (
+            _join_url(base_url, reverse(route_name, kwargs={kwarg: getattr(row, field)})),
             _lastmod(row.updated_at, row.created_at),
         )
-        for row in rows
-    ]
 
 
-def _cms_page_urls(base_url):
-    rows = CmsPage.objects.filter(is_published=True).only('slug', 'updated_at', 'created_at')
-    return [
-        (
-            _join_url(base_url, reverse('public:cms_page', kwargs={'slug': row.slug})),
-            _lastmod(row.updated_at, row.created_at),
-        )
-        for row in rows
-    ]
+def _industry_urls(base_url, start=0, stop=None):
+    return _row_urls('industries', base_url, start, stop, 'public:industry_detail', 'slug', 'slug')
 
 
-def _cms_article_urls(base_url):
-    rows = CmsArticle.objects.filter(is_published=True).only('id', 'updated_at', 'created_at')
-    return [
-        (
-            _join_url(base_url, reverse('public:cms_article', kwargs={'article_id': row.id})),
-            _lastmod(row.updated_at, row.created_at),
-        )
-        for row in rows
-    ]
+def _post_urls(base_url, start=0, stop=None):
+    return _row_urls('posts', base_url, start, stop, 'public:post', 'slug', 'slug')
+
+
+def _cms_page_urls(base_url, start=0, stop=None):
+    return _row_urls('cms-pages', base_url, start, stop, 'public:cms_page', 'slug', 'slug')
+
+
+def _cms_article_urls(base_url, start=0, stop=None):
+    return _row_urls('cms-articles', base_url, start, stop, 'public:cms_article', 'article_id', 'id')
+
+
+def _section_urls(section, base_url, start, stop):
+    builder = {
+        'pages': _static_urls,
+        'services': _service_urls,
+        'industries': _industry_urls,
+        'posts': _post_urls,
+        'cms-pages': _cms_page_urls,
+        'cms-articles': _cms_article_urls,
+    }[section]
+    return builder(base_url, start, stop)
+
+
+def _shard_size():
+    return min(SITEMAP_MAX_URLS, max(1, int(getattr(settings, 'SITEMAP_SHARD_SIZE', SITEMAP_MAX_URLS))))
+
+
+def _compute_section_stamp(section):
+    """Return ``(url_count, last_modified)`` for a sitemap section."""
+    if section == 'pages':
+        return len(STATIC_ROUTE_NAMES), None
+    queryset = _section_queryset(section)
+    totals = queryset.aggregate(count=Count('id'), updated=Max('updated_at'), created=Max('created_at'))
+    count = totals['count'] or 0
+    if section == 'services':
+        existing = set(queryset.filter(slug__in=VIRTUAL_SERVICE_SLUGS).values_list('slug', flat=True))
+        count += len([slug for slug in VIRTUAL_SERVICE_SLUGS if slug not in existing])
+    candidates = [value for value in (totals['updated'], totals['created']) if isinstance(value, datetime)]
+    return count, max(candidates) if candidates else None
+
+
+def _section_stamps():
+    """Per-section ``(count, last_modified)``; cheap aggregates, refreshed on content saves."""
+    version = str(getattr(settings, 'SEO_CACHE_VERSION', 'v1'))
+    ttl = max(30, int(getattr(settings, 'SITEMAP_STAMP_TTL', 300)))
+    return get_or_build(
+        namespaced_key(NAMESPACE_SITEMAP, f'{version}:stamps'),
+        lambda: {section: _compute_section_stamp(section) for section in SITEMAP_SECTIONS},
+        ttl,
+        name='sitemap_stamps',
+    )
+
+
+def _stamp_token(stamp):
+    count, last_modified = stamp
+    return f'{count}-{last_modified.isoformat() if last_modified else "static"}'
+
 
+def _page_count(count):
+    return (count + _shard_size() - 1) // _shard_size()
 
-def _build_sitemap_xml(urls):
-    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
-    for location, lastmod in urls:
-        lines.append('  <url>')
-        lines.append(f'    <loc>{escape(location)}</loc>')
+
+def _conditional_xml_response(request, make_response, *, etag_source, last_modified=None):
+    """
+    Answer revalidations with 304 before any XML is produced; otherwise call
+    ``make_response(gzip)``. Gzip and identity variants get distinct ETags.
+    """
+    use_gzip = negotiate_encoding(request, encodings=('gzip',)) == 'gzip'
+    if use_gzip:
+        etag_source = f'{etag_source}|gzip'
+    etag = quote_etag(hashlib.sha1(etag_source.encode('utf-8')).hexdigest())
+    last_modified = http_timestamp(last_modified)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = make_response(use_gzip)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['X-Content-Type-Options'] = 'nosniff'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _iter_sitemap_xml(root, item_tag, entries):
+    yield XML_DECLARATION
+    yield f'<{root} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for location, lastmod in entries:
+        yield f'  <{item_tag}>\n    {xml_element("loc", location)}\n'
         if lastmod:
-            lines.append(f'    <lastmod>{escape(lastmod)}</lastmod>')
-        lines.append('  </url>')
-    lines.append('</urlset>')
-    return '\n'.join(lines)
+            yield f'    {xml_element("lastmod", lastmod)}\n'
+        yield f'  </{item_tag}>\n'
+    yield f'</{root}>\n'
 
 
 def sitemap_xml(request):
-    cache_key = _cache_key(request, 'sitemap')
-    cached_body = cache.get(cache_key)
-    if isinstance(cached_body, str) and cached_body:
-        response = HttpResponse(cached_body, content_type='application/xml; charset=utf-8')
-        response['X-Content-Type-Options'] = 'nosniff'
-        return response
-
+    """Sitemap index pointing at the per-section shards."""
     base_url = _public_base_url(request)
-    urls = []
-    urls.extend(_static_urls(base_url))
-    urls.extend(_service_urls(base_url))
-    urls.extend(_industry_urls(base_url))
-    urls.extend(_post_urls(base_url))
-    urls.extend(_cms_page_urls(base_url))
-    urls.extend(_cms_article_urls(base_url))
+    stamps = _section_stamps()
+    tokens = ','.join(f'{section}={_stamp_token(stamps[section])}' for section in SITEMAP_SECTIONS)
+    dates = [stamps[section][1] for section in SITEMAP_SECTIONS if stamps[section][1]]
+
+    def build_body():
+        shards = []
+        for section in SITEMAP_SECTIONS:
+            count, last_modified = stamps[section]
+            for page in range(1, _page_count(count) + 1):
+                path = reverse('public:sitemap_shard', kwargs={'section': section, 'page': page})
+                shards.append((_join_url(base_url, path), _iso_lastmod(last_modified)))
+        return ''.join(_iter_sitemap_xml('sitemapindex', 'sitemap', shards))
+
+    digest = hashlib.sha1(f'{base_url}|{tokens}'.encode('utf-8')).hexdigest()[:16]
+    variants = cached_response_variants(
+        _cache_key(request, f'sitemap-index:{_shard_size()}:{digest}'),
+        build_body,
+        SITEMAP_SHARD_TTL,
+        content_type=XML_CONTENT_TYPE,
+        last_modified=http_timestamp(max(dates)) if dates else None,
+        name='sitemap',
+    )
+    response = variant_response(request, variants)
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
 
-    body = _build_sitemap_xml(urls)
-    cache.set(cache_key, body, _cache_ttl())
 
-    response = HttpResponse(body, content_type='application/xml; charset=utf-8')
+def sitemap_shard(request, section, page):
+    """One section shard, built (and precompressed) only when its section's stamp changes."""
+    if section not in SITEMAP_SECTIONS:
+        raise Http404
+    count, last_modified = _section_stamps()[section]
+    if page < 1 or page > _page_count(count):
+        raise Http404
+    base_url = _public_base_url(request)
+    start = (page - 1) * _shard_size()
+
+    def build_body():
+        urls = _section_urls(section, base_url, start, start + _shard_size())
+        return ''.join(_iter_sitemap_xml('urlset', 'url', urls))
+
+    token = _stamp_token((count, last_modified))
+    digest = hashlib.sha1(f'{base_url}|{token}'.encode('utf-8')).hexdigest()[:16]
+    variants = cached_response_variants(
+        _cache_key(request, f'sitemap-shard:{section}:{page}:{_shard_size()}:{digest}'),
+        build_body,
+        SITEMAP_SHARD_TTL,
+        content_type=XML_CONTENT_TYPE,
+        last_modified=http_timestamp(last_modified),
+        name='sitemap',
+    )
+    response = variant_response(request, variants)
     response['X-Content-Type-Options'] = 'nosniff'
     return response
 
 
-def robots_txt(request):
-    cache_key = _cache_key(request, 'robots')
-    cached_body = cache.get(cache_key)
-    if isinstance(cached_body, str) and cached_body:
-        response = HttpResponse(cached_body, content_type='text/plain; charset=utf-8')
-        response['X-Robots-Tag'] = 'noindex, nofollow' if getattr(settings, 'ROBOTS_DISALLOW_ALL', False) else 'all'
-        return response
+def _feed_limit():
+    return min(100, max(1, int(getattr(settings, 'BLOG_FEED_LIMIT', 20))))
 
-    disallow_all = bool(getattr(settings, 'ROBOTS_DISALLOW_ALL', False))
+
+def _feed_posts():
+    rows = (
+        _section_queryset('posts')
+        .select_related('category')
+        .order_by('-created_at', '-id')
+        .only('slug', 'title', 'excerpt', 'content', 'published_at', 'created_at', 'updated_at', 'category__name')
+    )
+    return rows[: _feed_limit()].iterator()
+
+
+def _feed_summary(post):
+    return post.excerpt or Truncator(strip_tags(post.content or '')).chars(FEED_SUMMARY_CHARS)
+
+
+def _atom_date(value):
+    timestamp = http_timestamp(value)
+    if timestamp is None:
+        return ''
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _iter_rss(base_url, site_name, posts, last_modified):
+    blog_url = _join_url(base_url, reverse('public:blog'))
+    yield XML_DECLARATION
+    yield '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n'
+    yield f'  {xml_element("title", f"{site_name} Blog")}\n'
+    yield f'  {xml_element("link", blog_url)}\n'
+    yield f'  {xml_element("description", f"Latest articles from {site_name}")}\n'
+    self_url = _join_url(base_url, reverse('public:blog_feed'))
+    yield f'  {xml_element("atom:link", href=self_url, rel="self", type="application/rss+xml")}\n'
+    if last_modified is not None:
+        yield f'  {xml_element("lastBuildDate", http_date(http_timestamp(last_modified)))}\n'
+    for post in posts:
+        url = _join_url(base_url, reverse('public:post', kwargs={'slug': post.slug}))
+        yield '  <item>\n'
+        yield f'    {xml_element("title", post.title)}\n'
+        yield f'    {xml_element("link", url)}\n'
+        yield f'    {xml_element("guid", url, isPermaLink="true")}\n'
+        published = http_timestamp(post.published_at or post.created_at)
+        if published is not None:
+            yield f'    {xml_element("pubDate", http_date(published))}\n'
+        if post.category_id and post.category:
+            yield f'    {xml_element("category", post.category.name)}\n'
+        yield f'    {xml_element("description", _feed_summary(post))}\n'
+        yield '  </item>\n'
+    yield '</channel>\n</rss>\n'
+
+
+def _iter_atom(base_url, site_name, posts, last_modified):
+    self_url = _join_url(base_url, reverse('public:blog_atom'))
+    yield XML_DECLARATION
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f'  {xml_element("title", f"{site_name} Blog")}\n'
+    yield f'  {xml_element("id", self_url)}\n'
+    yield f'  {xml_element("link", href=self_url, rel="self", type="application/atom+xml")}\n'
+    yield f'  {xml_element("link", href=_join_url(base_url, reverse("public:blog")))}\n'
+    yield f'  {xml_element("updated", _atom_date(last_modified or utc_now_naive()))}\n'
+    for post in posts:
+        url = _join_url(base_url, reverse('public:post', kwargs={'slug': post.slug}))
+        published = post.published_at or post.created_at
+        yield '  <entry>\n'
+        yield f'    {xml_element("title", post.title)}\n'
+        yield f'    {xml_element("link", href=url)}\n'
+        yield f'    {xml_element("id", url)}\n'
+        yield f'    {xml_element("updated", _atom_date(post.updated_at or published or last_modified or utc_now_naive()))}\n'
+        if published:
+            yield f'    {xml_element("published", _atom_date(published))}\n'
+        if post.category_id and post.category:
+            yield f'    {xml_element("category", term=post.category.name)}\n'
+        yield f'    {xml_element("summary", _feed_summary(post))}\n'
+        yield '  </entry>\n'
+    yield '</feed>\n'
+
+
+def _feed_response(request, iter_feed, content_type, kind):
     base_url = _public_base_url(request)
+    count, last_modified = _section_stamps()['posts']
+    site_name = _get_site_settings().get('company_name') or 'Blog'
+
+    def make_response(use_gzip):
+        feed = iter_feed(base_url, site_name, _feed_posts(), last_modified)
+        return streaming_xml_response(feed, gzip=use_gzip, content_type=content_type)
+
+    return _conditional_xml_response(
+        request,
+        make_response,
+        etag_source=f'{base_url}|{kind}|{_feed_limit()}|{site_name}|{_stamp_token((count, last_modified))}',
+        last_modified=last_modified,
+    )
+
+
+def blog_feed(request):
+    return _feed_response(request, _iter_rss, 'application/rss+xml; charset=utf-8', 'rss')
+
+
+def blog_atom(request):
+    return _feed_response(request, _iter_atom, 'application/atom+xml; charset=utf-8', 'atom')
+
+
+def _build_robots_txt(base_url, disallow_all):
     lines = ['User-agent: *']
     if disallow_all:
         lines.append('Disallow: /')
@@ -199,9 +401,19 @@ def robots_txt(request):
         lines.append('Disallow: /admin/')
         lines.append('Disallow: /api/')
     lines.append(f'Sitemap: {base_url}/sitemap.xml')
-    body = '\n'.join(lines) + '\n'
+    return '\n'.join(lines) + '\n'
+
 
-    cache.set(cache_key, body, _cache_ttl())
-    response = HttpResponse(body, content_type='text/plain; charset=utf-8')
+def robots_txt(request):
+    disallow_all = bool(getattr(settings, 'ROBOTS_DISALLOW_ALL', False))
+    base_url = _public_base_url(request)
+    variants = cached_response_variants(
+        _cache_key(request, f'robots:{int(disallow_all)}'),
+        lambda: _build_robots_txt(base_url, disallow_all),
+        _cache_ttl(),
+        content_type='text/plain; charset=utf-8',
+        name='robots',
+    )
+    response = variant_response(request, variants)
     response['X-Robots-Tag'] = 'noindex, nofollow' if disallow_all else 'all'
     return response
@@ -7,6 +7,7 @@ from django.db.models import Q
 from django.shortcuts import redirect, render
 
 from admin_panel.models import SupportClient, SupportTicket, SupportTicketEvent
+from admin_panel.stats import invalidate_admin_stats
 from core.constants import (
     SUPPORT_TICKET_EVENT_CREATED,
     SUPPORT_TICKET_STAGE_LABELS,
@@ -228,6 +229,7 @@ def remote_support_create_ticket(request):
         messages.error(request, 'We could not create your ticket right now. Please try again shortly.')
         return redirect('public:remote_support')
 
+    invalidate_admin_stats()
     messages.success(request, f'Ticket {ticket.ticket_number} created successfully.')
     return redirect('public:remote_support')
 
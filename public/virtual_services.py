@@ -0,0 +1,151 @@
+"""
+Services that exist only in code (``VIRTUAL_SERVICE_DEFINITIONS``) and are
+merged into the ``Service`` rows wherever services are listed.
+
+Rows must come in ``SERVICE_ORDERING`` so ``inject_virtual_services`` can merge
+instead of re-sorting; ``service_sort_key`` is the same order in Python.
+"""
+from __future__ import annotations
+
+import heapq
+
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from core.constants import WORKFLOW_PUBLISHED
+from core.context_processors import normalize_icon_class
+from core.utils import clean_text
+
+VIRTUAL_SERVICE_DEFINITIONS = (
+    {
+        'id': -9001,
+        'slug': 'laptop-repair',
+        'title': 'Laptop Repair',
+        'description': (
+            'Fast laptop diagnostics and repair in Orange County: screen replacement, battery swap, '
+            'charging-port repair, keyboard and hinge fixes, thermal cleanup, and SSD performance recovery.'
+        ),
+        'icon_class': 'fa-solid fa-laptop-medical',
+        'service_type': 'repair',
+        'sort_order': 12,
+        'is_featured': True,
+    },
+)
+
+# Matches service_sort_key, which treats a NULL sort_order as 0, so virtual
+# services merge into the rows at the same place on every database.
+SERVICE_ORDERING = (Coalesce('sort_order', Value(0)), 'id')
+
+
+class VirtualService:
+    """Read-only stand-in for a ``Service`` row defined in ``VIRTUAL_SERVICE_DEFINITIONS``."""
+
+    __slots__ = (
+        'id',
+        'slug',
+        'title',
+        'description',
+        'icon_class',
+        'service_type',
+        'sort_order',
+        'is_featured',
+        'profile_json',
+        'seo_title',
+        'seo_description',
+        'og_image',
+        'workflow_status',
+        'image',
+        'scheduled_publish_at',
+        'published_at',
+        'created_at',
+        'updated_at',
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __reduce__(self):
+        return (_virtual_service_from_state, ({name: getattr(self, name) for name in self.__slots__},))
+
+    def __repr__(self):
+        return f'VirtualService(id={self.id!r}, slug={self.slug!r})'
+
+
+def _virtual_service_from_state(state):
+    return VirtualService(**state)
+
+
+def service_sort_key(item):
+    return int(getattr(item, 'sort_order', 0) or 0), int(getattr(item, 'id', 0) or 0)
+
+
+def _build_virtual_catalog():
+    """Return ``(items, by_slug, partitions)`` for the virtual services, each sorted like the querysets."""
+    by_slug = {}
+    for definition in VIRTUAL_SERVICE_DEFINITIONS:
+        slug = definition.get('slug', '')
+        if slug in by_slug:
+            continue
+        by_slug[slug] = VirtualService(
+            id=definition.get('id', 0),
+            slug=slug,
+            title=definition.get('title', ''),
+            description=definition.get('description', ''),
+            icon_class=normalize_icon_class(definition.get('icon_class', 'fa-solid fa-circle')),
+            service_type=definition.get('service_type', 'repair'),
+            sort_order=definition.get('sort_order', 0),
+            is_featured=bool(definition.get('is_featured', False)),
+            profile_json='',
+            seo_title='',
+            seo_description='',
+            og_image='',
+            workflow_status=WORKFLOW_PUBLISHED,
+            image='',
+        )
+    items = tuple(sorted(by_slug.values(), key=service_sort_key))
+
+    # Partitions keyed by (service_type, is_featured); None means "any".
+    partitions = {}
+    for service_type in (None, *sorted({item.service_type for item in items})):
+        for is_featured in (None, True, False):
+            partitions[(service_type, is_featured)] = tuple(
+                item
+                for item in items
+                if (service_type is None or item.service_type == service_type)
+                and (is_featured is None or item.is_featured == is_featured)
+            )
+    return items, by_slug, partitions
+
+
+VIRTUAL_SERVICES, VIRTUAL_SERVICES_BY_SLUG, _VIRTUAL_SERVICE_PARTITIONS = _build_virtual_catalog()
+
+
+def virtual_services():
+    return list(VIRTUAL_SERVICES)
+
+
+def virtual_service_by_slug(slug):
+    return VIRTUAL_SERVICES_BY_SLUG.get(clean_text(slug, 180))
+
+
+def inject_virtual_services(items, *, service_type=None, is_featured=None, exclude_id=None):
+    """Merge matching virtual services into *items*, which must already be in ``(sort_order, id)`` order."""
+    partition_key = (service_type or None, None if is_featured is None else bool(is_featured))
+    candidates = _VIRTUAL_SERVICE_PARTITIONS.get(partition_key, ())
+    items = list(items)
+    if not candidates:
+        return items
+    existing_slugs = {clean_text(getattr(item, 'slug', ''), 200) for item in items}
+    candidates = [
+        candidate
+        for candidate in candidates
+        if candidate.slug not in existing_slugs and (exclude_id is None or candidate.id != exclude_id)
+    ]
+    return list(heapq.merge(items, candidates, key=service_sort_key))